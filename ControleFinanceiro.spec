@@ -1,9 +1,11 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('models', 'models'), ('views', 'views'), ('controllers', 'controllers'), ('utils', 'utils')]
+datas = [('models', 'models'), ('views', 'views'), ('controllers', 'controllers'), ('utils', 'utils'), ('importers', 'importers'), ('exporters', 'exporters'), ('analytics', 'analytics')]
 binaries = []
-hiddenimports = ['sqlalchemy', 'customtkinter', 'matplotlib', 'pydantic', 'PIL', 'tkcalendar']
+hiddenimports = ['sqlalchemy', 'customtkinter', 'matplotlib', 'pydantic', 'PIL', 'tkcalendar', 'openpyxl', 'numpy', 'analytics.columnar']
+# Views importadas sob demanda via importlib (invisíveis para a análise)
+hiddenimports += ['views.main_window', 'views.dashboard_view', 'views.transactions_view', 'views.reports_view', 'views.budgets_view']
 tmp_ret = collect_all('customtkinter')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
@@ -0,0 +1,61 @@
+from models.database import ENGINE_CONFIG
+from utils.events import event_bus, TRANSACTION
+from typing import Optional
+import threading
+
+# Backends aceitos em database.json / CONTROLE_FINANCEIRO_ANALYTICS
+ANALYTICS_BACKENDS = ('sql', 'numpy')
+
+_ledger = None
+_ledger_lock = threading.Lock()
+_backend: Optional[str] = None
+
+def analytics_backend() -> str:
+    """Backend configurado para os relatórios ('sql' ou 'numpy')
+    
+    Sem o NumPy instalado, 'numpy' recai em 'sql' com um aviso.
+    """
+    global _backend
+    if _backend is None:
+        backend = ENGINE_CONFIG.get('analytics', 'sql')
+        if backend not in ANALYTICS_BACKENDS:
+            print(f"Aviso: backend de relatórios desconhecido '{backend}', usando 'sql'")
+            backend = 'sql'
+        if backend == 'numpy':
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                print("Aviso: NumPy não instalado, relatórios usarão consultas SQL")
+                backend = 'sql'
+        _backend = backend
+    return _backend
+
+def get_ledger(session):
+    """Ledger colunar compartilhado e atualizado, ou None no backend SQL
+    
+    A primeira chamada lê todas as transações; as seguintes só buscam o
+    que mudou desde a última leitura (veja ColumnarLedger.refresh).
+    """
+    global _ledger
+    if analytics_backend() != 'numpy':
+        return None
+    with _ledger_lock:
+        if _ledger is None:
+            from .columnar import ColumnarLedger
+            _ledger = ColumnarLedger()
+    _ledger.refresh(session)
+    return _ledger
+
+def save_snapshot():
+    """Grava o snapshot do ledger, se ele foi carregado e mudou (ao fechar a aplicação)"""
+    if _ledger is not None:
+        _ledger.save_snapshot()
+
+def _on_change(event):
+    if event.entity == TRANSACTION and _ledger is not None:
+        _ledger.stale = True
+
+# Antes do cache de relatórios, que pode recalcular a partir do ledger
+event_bus.subscribe(_on_change, first=True)
+
+__all__ = ['ANALYTICS_BACKENDS', 'analytics_backend', 'get_ledger', 'save_snapshot']
@@ -0,0 +1,389 @@
+from models import Transaction, TransactionType
+from models.types import from_cents
+from models.rollups import rollup_type_code
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import String, func, select, type_coerce
+from .snapshot import open_snapshot, write_snapshot
+import itertools
+import numpy as np
+import threading
+
+EPOCH = date(1970, 1, 1)
+DAY_MICROSECONDS = 86_400_000_000
+
+# Código de transactions.type para receitas e despesas
+INCOME = rollup_type_code(TransactionType.INCOME)
+EXPENSE = rollup_type_code(TransactionType.EXPENSE)
+
+class PeriodTotals(NamedTuple):
+    income: object
+    expenses: object
+    count: int
+    expense_count: int
+
+class GroupTotal(NamedTuple):
+    key: int  # category_id ou código do método de pagamento
+    total: object
+    count: int
+
+# Colunas lidas do banco, na ordem de _fetch: valores crus (centavos e
+# códigos inteiros), data como microssegundos desde 1970-01-01 (o texto
+# 'YYYY-MM-DD HH:MM:SS.ffffff' gravado pelo SQLAlchemy)
+FETCH_SQL = ("SELECT id, CAST(strftime('%s', transaction_date) AS INTEGER) * 1000000 "
+             "+ CAST(substr(transaction_date, 21, 6) AS INTEGER), amount, "
+             "category_id, type, COALESCE(payment_method, 0) FROM transactions")
+
+def day_number(value) -> int:
+    """Dias desde 1970-01-01 (a hora é ignorada)"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - EPOCH).days
+
+def stamp_number(value) -> int:
+    """Microssegundos desde 1970-01-01 (datas sem hora contam como meia-noite)"""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    delta = value - datetime(1970, 1, 1)
+    return delta.days * DAY_MICROSECONDS + delta.seconds * 1_000_000 + delta.microseconds
+
+def month_number(month: int, year: int) -> int:
+    """Meses desde janeiro de 1970"""
+    return (year - 1970) * 12 + month - 1
+
+def _month_start(number: int) -> datetime:
+    return datetime(1970 + number // 12, number % 12 + 1, 1)
+
+def _cents(value) -> object:
+    return from_cents(int(round(float(value))))
+
+class ColumnarLedger:
+    """Transações em arrays NumPy, uma coluna por campo
+    
+    Colunas (mesmo tamanho, ordenadas por id): ids, stamps (data e hora em
+    microssegundos desde 1970-01-01), days (dias desde 1970-01-01), months
+    (meses desde 1970-01), amounts (centavos),
+    categories (category_id), types e methods (códigos de CodedEnum, 0 para
+    método desconhecido). As consultas são agrupamentos vetorizados
+    (bincount, argpartition, cumsum) sobre máscaras dessas colunas.
+    
+    refresh() só relê do banco as linhas com updated_at ou id acima da
+    última marca lida e descarta as que foram excluídas; `stale` é ligado
+    pelos eventos de transação (analytics._on_change) e gravações de outros
+    processos são percebidas pela contagem, maior id e maior updated_at da
+    tabela, conferidos a cada refresh(). Os filtros por
+    intervalo comparam stamps, como o SQL compara transaction_date.
+    
+    A primeira carga parte do snapshot em disco (analytics.snapshot), aberto
+    com np.memmap, quando ele confere com o banco; só as linhas mais novas
+    são lidas. Sem snapshot válido, tudo é lido e um novo snapshot é gravado.
+    """
+    
+    COLUMNS = ('ids', 'stamps', 'days', 'months', 'amounts', 'categories', 'types', 'methods')
+    
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.stamps = np.empty(0, dtype=np.int64)
+        self.days = np.empty(0, dtype=np.int32)
+        self.months = np.empty(0, dtype=np.int32)
+        self.amounts = np.empty(0, dtype=np.int64)
+        self.categories = np.empty(0, dtype=np.int32)
+        self.types = np.empty(0, dtype=np.int8)
+        self.methods = np.empty(0, dtype=np.int8)
+        self.max_id = 0
+        self.max_updated: Optional[str] = None
+        self.db_mark: Optional[Tuple] = None
+        self.loaded = False
+        self.stale = True
+        self.snapshot_outdated = False
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    # Carga do banco
+    
+    def refresh(self, session):
+        """Carrega tudo na primeira vez; depois, só as mudanças desde a marca
+        
+        Sem evento de transação neste processo, as colunas só são relidas se
+        _db_mark mudou (por exemplo, com `python -m importers` rodando à parte).
+        """
+        with self._lock:
+            # Lida antes da carga: uma gravação concorrente só antecipa a próxima
+            mark = self._db_mark(session)
+            if not self.stale and mark == self.db_mark:
+                return
+            self.stale = False
+            self.db_mark = mark
+            if self.loaded:
+                loaded = self._load_changes(session)
+            else:
+                self.loaded = True
+                loaded = self._open_snapshot(session) and self._load_changes(session)
+            if not loaded:
+                self._load_all(session)
+    
+    def _load_all(self, session):
+        self.max_updated = self._max_updated(session)
+        self._set_columns(self._fetch(session))
+        self.max_id = int(self.ids[-1]) if len(self.ids) else 0
+        self.snapshot_outdated = True
+        self.save_snapshot()
+    
+    def _open_snapshot(self, session) -> bool:
+        """Usa as colunas do snapshot se ele for compatível com o banco
+        
+        O banco não pode ter um updated_at máximo anterior ao do snapshot
+        (banco restaurado de uma cópia antiga); exclusões e o que mudou
+        depois são tratados por _load_changes.
+        """
+        snapshot = open_snapshot()
+        if snapshot is None:
+            return False
+        columns, meta = snapshot
+        if set(columns) != set(self.COLUMNS) or any(len(column) != meta['rows'] for column in columns.values()):
+            return False
+        
+        updated = self._max_updated(session)
+        if meta['max_updated'] is not None and (updated is None or updated < meta['max_updated']):
+            return False
+        
+        self._set_columns(columns)
+        self.max_id = meta['max_id']
+        self.max_updated = meta['max_updated']
+        return True
+    
+    def save_snapshot(self):
+        """Grava as colunas no snapshot em disco, se mudaram desde a última gravação"""
+        with self._lock:
+            if not self.loaded or not self.snapshot_outdated:
+                return
+            # Cópias em memória liberam o arquivo mapeado antes de substituí-lo
+            self._set_columns({name: np.array(getattr(self, name)) for name in self.COLUMNS})
+            try:
+                write_snapshot({name: getattr(self, name) for name in self.COLUMNS}, {
+                    'rows': len(self.ids),
+                    'max_id': self.max_id,
+                    'max_updated': self.max_updated
+                })
+                self.snapshot_outdated = False
+            except (OSError, ValueError) as e:
+                print(f"Aviso: snapshot do ledger não gravado: {e}")
+    
+    def _load_changes(self, session) -> bool:
+        """Aplica exclusões e linhas novas ou alteradas desde a marca
+        
+        Retorna False se o banco tiver linhas até max_id que as colunas não
+        conhecem (só possível com um banco trocado); nesse caso nada muda.
+        """
+        count = self._count_up_to(session, self.max_id)
+        if count > len(self.ids):
+            return False
+        # Exclusões: menos linhas no banco até max_id do que nas colunas
+        if count < len(self.ids):
+            db_ids = self._query_array(session, "SELECT id FROM transactions WHERE id <= ?", (self.max_id,))
+            keep = np.isin(self.ids, db_ids)
+            self._set_columns({name: getattr(self, name)[keep] for name in self.COLUMNS})
+            self.snapshot_outdated = True
+        
+        updated = self._max_updated(session)
+        if self.max_updated is None:
+            changes = self._fetch(session, "id > ?", (self.max_id,))
+        else:
+            changes = self._fetch(session, "id > ? OR updated_at > ?", (self.max_id, self.max_updated))
+        self.max_updated = updated
+        if not len(changes['ids']):
+            return True
+        
+        position = np.searchsorted(self.ids, changes['ids'])
+        position = np.minimum(position, max(len(self.ids) - 1, 0))
+        existing = (self.ids[position] == changes['ids']) if len(self.ids) else \
+            np.zeros(len(changes['ids']), dtype=bool)
+        
+        # Linhas alteradas são sobrescritas; ids novos vão para o fim
+        for name in self.COLUMNS:
+            getattr(self, name)[position[existing]] = changes[name][existing]
+        if not existing.all():
+            columns = {name: np.concatenate([getattr(self, name), changes[name][~existing]])
+                       for name in self.COLUMNS}
+            if (changes['ids'][~existing] < self.max_id).any():
+                order = np.argsort(columns['ids'], kind='stable')
+                columns = {name: column[order] for name, column in columns.items()}
+            self._set_columns(columns)
+        self.max_id = max(self.max_id, int(changes['ids'].max()))
+        self.snapshot_outdated = True
+        return True
+    
+    def _fetch(self, session, where: Optional[str] = None, params: Tuple = ()) -> Dict[str, np.ndarray]:
+        # Com filtro, ORDER BY levaria o SQLite a varrer a tabela em vez de
+        # usar os índices de id e updated_at; a ordenação fica com o NumPy
+        sql = FETCH_SQL + (f" WHERE {where}" if where else " ORDER BY id")
+        rows = self._query_array(session, sql, params).reshape(-1, 6)
+        if where:
+            rows = rows[np.argsort(rows[:, 0], kind='stable')]
+        stamps = rows[:, 1].copy()
+        days = (stamps // DAY_MICROSECONDS).astype(np.int32)
+        return {
+            'ids': rows[:, 0].copy(),
+            'stamps': stamps,
+            'days': days,
+            'months': days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int32),
+            'amounts': rows[:, 2].copy(),
+            'categories': rows[:, 3].astype(np.int32),
+            'types': rows[:, 4].astype(np.int8),
+            'methods': rows[:, 5].astype(np.int8),
+        }
+    
+    @staticmethod
+    def _query_array(session, sql: str, params: Tuple = ()) -> np.ndarray:
+        """Executa `sql` no cursor do sqlite3 e achata as linhas (inteiras) em um array
+        
+        Evita criar um objeto Row do SQLAlchemy por linha, o que domina o
+        tempo de leitura de um histórico grande.
+        """
+        cursor = session.connection().connection.driver_connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            return np.fromiter(itertools.chain.from_iterable(cursor), dtype=np.int64)
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _count_up_to(session, max_id: int) -> int:
+        table = Transaction.__table__
+        return session.execute(select(func.count(table.c.id)).where(table.c.id <= max_id)).scalar()
+    
+    @classmethod
+    def _db_mark(cls, session) -> Tuple:
+        """(contagem, maior id, maior updated_at) de transactions
+        
+        Consultas separadas: sozinhos, o maior id e o maior updated_at vêm
+        direto dos índices e a contagem só soma as páginas da árvore.
+        """
+        table = Transaction.__table__
+        count = session.execute(select(func.count()).select_from(table)).scalar()
+        max_id = session.execute(select(func.max(table.c.id))).scalar()
+        return count, max_id, cls._max_updated(session)
+    
+    @staticmethod
+    def _max_updated(session) -> Optional[str]:
+        column = type_coerce(Transaction.__table__.c.updated_at, String)
+        return session.execute(select(func.max(column))).scalar()
+    
+    def _set_columns(self, columns: Dict[str, np.ndarray]):
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+    
+    # Consultas
+    
+    def _range_mask(self, start, end) -> np.ndarray:
+        return (self.stamps >= stamp_number(start)) & (self.stamps < stamp_number(end))
+    
+    def period_totals(self, periods: Sequence[Tuple[int, int]]) -> Dict[Tuple[int, int], PeriodTotals]:
+        """Entradas, saídas e contagens por (ano, mês); `periods` em (mês, ano)"""
+        with self._lock:
+            wanted = np.array([month_number(month, year) for month, year in periods], dtype=np.int32)
+            mask = np.isin(self.months, wanted)
+            keys, inverse = np.unique(self.months[mask], return_inverse=True)
+            amounts, types = self.amounts[mask], self.types[mask]
+            is_income, is_expense = types == INCOME, types == EXPENSE
+            
+            income = np.bincount(inverse, weights=amounts * is_income, minlength=len(keys))
+            expenses = np.bincount(inverse, weights=amounts * is_expense, minlength=len(keys))
+            counts = np.bincount(inverse, minlength=len(keys))
+            expense_counts = np.bincount(inverse, weights=is_expense, minlength=len(keys))
+        
+        result = {}
+        for i, key in enumerate(keys.tolist()):
+            start = _month_start(key)
+            result[(start.year, start.month)] = PeriodTotals(
+                _cents(income[i]), _cents(expenses[i]), int(counts[i]), int(expense_counts[i]))
+        return result
+    
+    def expense_groups(self, month: int, year: int, by: str = 'categories') -> List[GroupTotal]:
+        """Despesas do mês somadas por categoria ('categories') ou método ('methods')"""
+        with self._lock:
+            mask = (self.months == month_number(month, year)) & (self.types == EXPENSE)
+            keys = getattr(self, by)[mask].astype(np.int64)
+            if not len(keys):
+                return []
+            totals = np.bincount(keys, weights=self.amounts[mask])
+            counts = np.bincount(keys)
+        return [GroupTotal(key, _cents(totals[key]), int(counts[key]))
+                for key in np.flatnonzero(counts).tolist()]
+    
+    def top_expense_ids(self, month: int, year: int, limit: int) -> List[int]:
+        """Ids das `limit` maiores despesas do mês, da maior para a menor"""
+        with self._lock:
+            mask = (self.months == month_number(month, year)) & (self.types == EXPENSE)
+            ids, amounts = self.ids[mask], self.amounts[mask]
+            if limit < len(amounts):
+                top = np.argpartition(-amounts, limit - 1)[:limit]
+                ids, amounts = ids[top], amounts[top]
+            order = np.lexsort((ids, -amounts))
+            return ids[order].tolist()
+    
+    def bucket_totals(self, start, end, granularity: str,
+                      by_category: bool = False) -> Iterator[Tuple[datetime, Optional[int], object, object]]:
+        """(início do intervalo, categoria, entradas, saídas) de [start, end)
+        
+        Mesmo formato das linhas de ReportController._transaction_buckets:
+        trimestres e anos vêm agrupados por mês.
+        """
+        with self._lock:
+            mask = self._range_mask(start, end)
+            if granularity == 'day':
+                buckets = self.days[mask].astype(np.int64)
+            elif granularity == 'week':
+                days = self.days[mask].astype(np.int64)
+                buckets = days - (days + 3) % 7  # segunda-feira (1970-01-01 foi quinta)
+            else:
+                buckets = self.months[mask].astype(np.int64)
+            
+            if by_category:
+                categories = self.categories[mask].astype(np.int64)
+                width = int(categories.max()) + 1 if len(categories) else 1
+                buckets = buckets * width + categories
+            
+            keys, inverse = np.unique(buckets, return_inverse=True)
+            amounts, types = self.amounts[mask], self.types[mask]
+            income = np.bincount(inverse, weights=amounts * (types == INCOME), minlength=len(keys))
+            expenses = np.bincount(inverse, weights=amounts * (types == EXPENSE), minlength=len(keys))
+        
+        for i, key in enumerate(keys.tolist()):
+            category_id = None
+            if by_category:
+                key, category_id = divmod(key, width)
+            if granularity in ('day', 'week'):
+                period_start = datetime.combine(EPOCH + timedelta(days=key), datetime.min.time())
+            else:
+                period_start = _month_start(key)
+            yield period_start, category_id, _cents(income[i]), _cents(expenses[i])
+    
+    def percentiles(self, start, end, percentiles: Sequence[float], trans_type: str = 'expense') -> List[object]:
+        """Percentis (interpolação linear) dos valores das transações em [start, end)"""
+        with self._lock:
+            mask = self._range_mask(start, end) & (self.types == rollup_type_code(trans_type))
+            amounts = self.amounts[mask]
+            if not len(amounts):
+                return [None for _ in percentiles]
+            values = np.percentile(amounts, list(percentiles))
+        return [_cents(value) for value in values]
+    
+    def rolling_daily_sums(self, start, end, window: int, trans_type: str = 'expense') -> List[int]:
+        """Soma em centavos dos `window` dias terminados em cada dia de [start, end)
+        
+        Como em iter_buckets, um `end` no meio do dia inclui esse dia, só
+        com as transações anteriores a `end`.
+        """
+        end_stamp = stamp_number(end)
+        first, last = day_number(start), -(-end_stamp // DAY_MICROSECONDS)
+        with self._lock:
+            origin = first - (window - 1)
+            mask = (self.days >= origin) & (self.stamps < end_stamp) & (self.types == rollup_type_code(trans_type))
+            daily = np.bincount(self.days[mask] - origin, weights=self.amounts[mask],
+                                minlength=max(last - origin, 0))
+        cumulative = np.concatenate([[0], np.cumsum(daily)])
+        sums = cumulative[window:] - cumulative[:-window]
+        return [int(round(value)) for value in sums.tolist()]
@@ -0,0 +1,186 @@
+from models import TransactionType
+from models.types import from_cents
+from models.rollups import rollup_type_code
+from models.periods import add_months, month_bounds
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from .columnar import ColumnarLedger, month_number
+import calendar
+import numpy as np
+
+INCOME = rollup_type_code(TransactionType.INCOME)
+EXPENSE = rollup_type_code(TransactionType.EXPENSE)
+
+# Meses completos mais recentes que definem o ritmo de cada categoria
+BASELINE_MONTHS = 6
+
+# Meses (dentro de BASELINE_MONTHS) em que um lançamento precisa aparecer,
+# uma vez por mês, com valor e dia estáveis, para ser tratado como recorrente
+RECURRING_MIN_MONTHS = 3
+RECURRING_TOLERANCE = 0.1  # variação máxima do valor, em fração da média
+RECURRING_DAY_SPREAD = 5  # variação máxima do dia do mês
+
+# Anos de histórico em que a sazonalidade passa a valer pela metade; com
+# menos dados o fator fica mais perto de 1
+SEASONALITY_PRIOR_YEARS = 2
+SEASONALITY_LIMITS = (0.25, 4.0)
+
+# Totais mensais crus (centavos) do rollup por categoria e tipo
+MONTHLY_SQL = ("SELECT (year - 1970) * 12 + month - 1, category_id, type, SUM(total) "
+               "FROM monthly_rollup WHERE type IN (?, ?) AND (year - 1970) * 12 + month - 1 <= ? "
+               "GROUP BY year, month, category_id, type")
+
+# Lançamentos recorrentes: mesma descrição, categoria e tipo uma vez por mês,
+# com valor e dia estáveis; a última coluna diz se ele já ocorreu no mês projetado
+RECURRING_SQL = ("SELECT category_id, type, CAST(ROUND(AVG(amount)) AS INTEGER), "
+                 "MAX(transaction_date) >= ? "
+                 "FROM transactions "
+                 "WHERE transaction_date >= ? AND transaction_date < ? AND type IN (?, ?) "
+                 "GROUP BY lower(trim(description)), category_id, type "
+                 "HAVING COUNT(DISTINCT strftime('%Y-%m', transaction_date)) >= ? "
+                 "AND COUNT(*) = COUNT(DISTINCT strftime('%Y-%m', transaction_date)) "
+                 "AND MAX(amount) - MIN(amount) <= ? * AVG(amount) "
+                 "AND MAX(strftime('%d', transaction_date)) - MIN(strftime('%d', transaction_date)) <= ?")
+
+class CashFlowForecast:
+    """Projeção de entradas, saídas e saldo do mês corrente e dos próximos meses
+    
+    Cada categoria é projetada como a soma de duas partes:
+    
+    - lançamentos recorrentes (mesma descrição uma vez por mês, com valor
+      e dia estáveis nos últimos BASELINE_MONTHS meses), que entram pelo
+      valor médio nos meses em que ainda não ocorreram;
+    - o gasto variável restante, com o ritmo diário médio dos últimos
+      BASELINE_MONTHS meses (sem o efeito sazonal) multiplicado pelo fator
+      sazonal do mês do calendário, estimado em todo o histórico.
+    
+    O histórico vem do rollup mensal como uma matriz (mês, categoria, tipo)
+    e todas as contas são operações NumPy sobre ela; são duas consultas
+    agregadas, independente do tamanho do histórico.
+    """
+    
+    def __init__(self, session):
+        self.session = session
+    
+    def project(self, month: int, year: int, months_ahead: int = 3,
+                today: Optional[datetime] = None) -> Dict[str, Any]:
+        """Projeta o fim de month/year e os `months_ahead` meses seguintes
+        
+        O mês de referência soma o realizado ao que falta: o gasto variável
+        dos dias restantes e os recorrentes ainda não lançados. Meses
+        passados ficam só com o realizado.
+        """
+        today = today or datetime.now()
+        reference = month_number(month, year)
+        days_in_month = calendar.monthrange(year, month)[1]
+        current = month_number(today.month, today.year)
+        if reference < current:
+            elapsed = days_in_month
+        elif reference > current:
+            elapsed = 0
+        else:
+            elapsed = today.day
+        
+        months, categories, types, totals = self._monthly_totals(reference)
+        recurring = self._recurring_items(month, year)
+        
+        # Matriz de totais (mês, categoria, tipo) do início do histórico ao mês de referência
+        keys, inverse = np.unique(np.concatenate([categories, recurring[:, 0]]), return_inverse=True)
+        first = int(months.min()) if len(months) else reference
+        history = np.zeros((reference - first + 1, len(keys), 2))
+        np.add.at(history, (months - first, inverse[:len(categories)], (types == EXPENSE).astype(np.intp)), totals)
+        actual = history[-1].sum(axis=0)
+        past = history[:-1]
+        
+        factors = self._seasonal_factors(past, first)
+        base = self._baseline(past, first, factors)
+        
+        # Recorrentes por categoria e tipo; a parte variável é o resto do ritmo
+        recurring_index = (inverse[len(categories):], (recurring[:, 1] == EXPENSE).astype(np.intp))
+        fixed = np.zeros((len(keys), 2))
+        np.add.at(fixed, recurring_index, recurring[:, 2])
+        variable = np.clip(base - fixed, 0, None)
+        
+        calendar_month = month - 1
+        remaining = np.zeros(2)
+        if elapsed < days_in_month:
+            share = (days_in_month - elapsed) / days_in_month
+            remaining += (variable * factors[calendar_month]).sum(axis=0) * share
+            pending = np.zeros((len(keys), 2))
+            np.add.at(pending, recurring_index, np.where(recurring[:, 3] == 0, recurring[:, 2], 0))
+            remaining += pending.sum(axis=0)
+        month_end = actual + remaining
+        
+        # Próximos meses: fatores sazonais de cada mês do calendário de uma vez
+        ahead = (reference + 1 + np.arange(max(0, months_ahead))) % 12
+        projected = (variable[None] * factors[ahead] + fixed[None]).sum(axis=1)
+        
+        result = self._period(month, year, month_end)
+        result.update({
+            'actual_income': from_cents(int(round(actual[0]))),
+            'actual_expenses': from_cents(int(round(actual[1]))),
+            'actual_balance': from_cents(int(round(actual[0] - actual[1]))),
+            'recurring_count': len(recurring),
+            'months': [self._period(start.month, start.year, totals)
+                       for start, totals in zip(self._following_months(month, year, len(ahead)), projected)],
+        })
+        return result
+    
+    @staticmethod
+    def _period(month: int, year: int, totals: np.ndarray) -> Dict[str, Any]:
+        income, expenses = (from_cents(int(round(value))) for value in totals)
+        return {
+            'month': month,
+            'year': year,
+            'income': income,
+            'expenses': expenses,
+            'balance': income - expenses,
+            'projected': True,
+        }
+    
+    @staticmethod
+    def _following_months(month: int, year: int, count: int) -> List[datetime]:
+        start = month_bounds(month, year)[1]
+        return [add_months(start, i) for i in range(count)]
+    
+    def _monthly_totals(self, reference: int):
+        """Colunas (mês, categoria, tipo, total) do rollup até o mês `reference`"""
+        rows = ColumnarLedger._query_array(self.session, MONTHLY_SQL,
+                                           (INCOME, EXPENSE, reference)).reshape(-1, 4)
+        return rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3].astype(np.float64)
+    
+    def _recurring_items(self, month: int, year: int) -> np.ndarray:
+        """Linhas (categoria, tipo, valor médio, já ocorreu no mês) dos recorrentes"""
+        start, end = month_bounds(month, year)
+        params = (str(start), str(add_months(start, -BASELINE_MONTHS)), str(end), INCOME, EXPENSE,
+                  RECURRING_MIN_MONTHS, RECURRING_TOLERANCE, RECURRING_DAY_SPREAD)
+        return ColumnarLedger._query_array(self.session, RECURRING_SQL, params).reshape(-1, 4)
+    
+    @staticmethod
+    def _seasonal_factors(past: np.ndarray, first: int) -> np.ndarray:
+        """Fator (mês do calendário, categoria, tipo): média do mês sobre a média geral
+        
+        O desvio de 1 é encolhido por anos / (anos + SEASONALITY_PRIOR_YEARS),
+        de modo que um único ano atípico não domina a projeção.
+        """
+        factors = np.ones((12,) + past.shape[1:])
+        if len(past) < 12:
+            return factors
+        calendar_months = (first + np.arange(len(past))) % 12
+        sums = np.zeros_like(factors)
+        np.add.at(sums, calendar_months, past)
+        years = np.bincount(calendar_months, minlength=12).astype(np.float64)[:, None, None]
+        overall = past.mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(overall > 0, sums / years / overall, 1.0)
+        weight = years / (years + SEASONALITY_PRIOR_YEARS)
+        return np.clip(1 + weight * (ratio - 1), *SEASONALITY_LIMITS)
+    
+    @staticmethod
+    def _baseline(past: np.ndarray, first: int, factors: np.ndarray) -> np.ndarray:
+        """Total mensal típico (categoria, tipo) dos últimos meses, sem o efeito sazonal"""
+        recent = past[-BASELINE_MONTHS:]
+        if not len(recent):
+            return np.zeros(past.shape[1:])
+        calendar_months = (first + len(past) - len(recent) + np.arange(len(recent))) % 12
+        return (recent / factors[calendar_months]).mean(axis=0)
@@ -0,0 +1,73 @@
+from models.database import DATABASE_PATH
+from typing import Any, Dict, Optional, Tuple
+import json
+import os
+import struct
+import numpy as np
+
+# Arquivo com as colunas do ledger, ao lado do banco
+SNAPSHOT_PATH = DATABASE_PATH + '.columns'
+
+MAGIC = b'CFLEDGER'
+SNAPSHOT_VERSION = 2
+
+# Espaço reservado ao cabeçalho; as colunas começam logo depois
+HEADER_SIZE = 4096
+
+# Alinhamento (bytes) de cada coluna no arquivo
+ALIGNMENT = 64
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def write_snapshot(columns: Dict[str, np.ndarray], meta: Dict[str, Any], path: str = SNAPSHOT_PATH):
+    """Grava as colunas em `path` (escrita em arquivo temporário e troca atômica)
+    
+    Formato: MAGIC, tamanho do cabeçalho (uint32 little-endian), cabeçalho
+    JSON (versão, `meta` e, por coluna, dtype, tamanho e posição) e, a
+    partir de HEADER_SIZE, os buffers crus das colunas, cada um alinhado a
+    ALIGNMENT bytes.
+    """
+    layout = []
+    offset = HEADER_SIZE
+    for name, column in columns.items():
+        layout.append({'name': name, 'dtype': column.dtype.str, 'length': len(column), 'offset': offset})
+        offset = _align(offset + column.nbytes)
+    encoded = json.dumps({'version': SNAPSHOT_VERSION, 'meta': meta, 'columns': layout}).encode('utf-8')
+    if len(MAGIC) + 4 + len(encoded) > HEADER_SIZE:
+        raise ValueError("Cabeçalho do snapshot maior que HEADER_SIZE")
+    
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as snapshot:
+        snapshot.write(MAGIC + struct.pack('<I', len(encoded)) + encoded)
+        for entry, column in zip(layout, columns.values()):
+            snapshot.seek(entry['offset'])
+            snapshot.write(np.ascontiguousarray(column).tobytes())
+    os.replace(temp_path, path)
+
+def open_snapshot(path: str = SNAPSHOT_PATH) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+    """Abre as colunas de `path` com np.memmap, sem copiá-las
+    
+    As colunas usam mapeamento copy-on-write: podem ser alteradas em memória
+    sem tocar no arquivo. Retorna None se o arquivo não existir ou for de
+    outro formato/versão.
+    """
+    try:
+        with open(path, 'rb') as snapshot:
+            if snapshot.read(len(MAGIC)) != MAGIC:
+                return None
+            size, = struct.unpack('<I', snapshot.read(4))
+            header = json.loads(snapshot.read(size).decode('utf-8'))
+    except (OSError, ValueError, struct.error):
+        return None
+    if header.get('version') != SNAPSHOT_VERSION:
+        return None
+    
+    columns = {}
+    for entry in header['columns']:
+        if entry['length'] == 0:
+            columns[entry['name']] = np.empty(0, dtype=entry['dtype'])
+            continue
+        columns[entry['name']] = np.memmap(path, dtype=entry['dtype'], mode='c',
+                                           offset=entry['offset'], shape=(entry['length'],))
+    return columns, header['meta']
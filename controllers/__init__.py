@@ -1,6 +1,9 @@
+from .category_registry import CategoryRegistry, CategoryInfo
+from .budget_alerts import BudgetAlerts
+from .report_cache import ReportCache, report_cache
 from .main_controller import MainController
 from .transaction_controller import TransactionController
 from .report_controller import ReportController
 from .budget_controller import BudgetController
 
-__all__ = ['MainController', 'TransactionController', 'ReportController', 'BudgetController']
+__all__ = ['CategoryRegistry', 'CategoryInfo', 'BudgetAlerts', 'ReportCache', 'report_cache', 'MainController', 'TransactionController', 'ReportController', 'BudgetController']
@@ -0,0 +1,100 @@
+from utils.events import publish_change, ALERT, THRESHOLD_REACHED, EXCEEDED
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+import threading
+
+# Níveis de um orçamento, em ordem crescente de gravidade
+OK = 0
+ALERTING = 1
+OVER_BUDGET = 2
+
+_LEVEL_ACTIONS = {ALERTING: THRESHOLD_REACHED, OVER_BUDGET: EXCEEDED}
+
+class BudgetAlerts:
+    """Acompanha o gasto dos orçamentos ativos e avisa quando mudam de nível
+    
+    Mantém em memória, por (categoria, ano, mês), o valor orçado, o limite de
+    alerta e o gasto acumulado. O TransactionController chama record() após
+    cada gravação com a variação de despesa de cada categoria/mês; o gasto é
+    atualizado por essa diferença, sem reagregar nada. Cada período é lido do
+    banco (uma consulta) só no primeiro registro que o toca, e volta a ser
+    lido após invalidate(), chamado pelo BudgetController quando um
+    orçamento muda.
+    
+    Ao atingir o limite de alerta ou passar do orçado é publicado um evento
+    ALERT (THRESHOLD_REACHED ou EXCEEDED) com o período e a categoria.
+    """
+    
+    _budgets: Dict[Tuple[int, int, int], Dict[str, Any]] = {}  # (categoria, ano, mês) -> estado
+    _loaded: Set[Tuple[int, int]] = set()  # (ano, mês) já lidos
+    _lock = threading.RLock()
+    
+    @classmethod
+    def record(cls, session: Session, deltas: Iterable[Optional[Tuple[int, int, int, Any]]]):
+        """Aplica variações de despesa já gravadas: (categoria, ano, mês, valor)"""
+        totals: Dict[Tuple[int, int, int], Any] = {}
+        for delta in deltas:
+            if delta is not None:
+                category_id, year, month, amount = delta
+                key = (category_id, year, month)
+                totals[key] = totals.get(key, 0) + amount
+        
+        alerts = []
+        with cls._lock:
+            # Períodos lidos agora já incluem as variações desta gravação
+            fresh = {(year, month) for _, year, month in totals} - cls._loaded
+            for year, month in fresh:
+                cls._load(session, year, month)
+            
+            for key, amount in totals.items():
+                state = cls._budgets.get(key)
+                if state is None or not amount:
+                    continue
+                if (key[1], key[2]) in fresh:
+                    before, after = state['spent'] - amount, state['spent']
+                else:
+                    before, after = state['spent'], state['spent'] + amount
+                    state['spent'] = after
+                
+                level = cls._level(state, after)
+                if level > cls._level(state, before):
+                    alerts.append((_LEVEL_ACTIONS[level], key))
+        
+        for action, (category_id, year, month) in alerts:
+            publish_change(ALERT, action, periods=[(year, month)], category_ids=[category_id])
+    
+    @classmethod
+    def invalidate(cls, periods: Optional[Iterable[Tuple[int, int]]] = None):
+        """Descarta os períodos (ano, mês) informados, ou todos"""
+        with cls._lock:
+            if periods is None:
+                cls._budgets.clear()
+                cls._loaded.clear()
+                return
+            periods = set(periods)
+            cls._loaded -= periods
+            for key in [key for key in cls._budgets if (key[1], key[2]) in periods]:
+                del cls._budgets[key]
+    
+    @classmethod
+    def _load(cls, session: Session, year: int, month: int):
+        """Lê os orçamentos do período e o gasto atual de cada um"""
+        from .budget_controller import BudgetController
+        for status in BudgetController(session).get_budget_status_for_periods([(month, year)]):
+            cls._budgets[(status['category_id'], year, month)] = {
+                'amount': status['budgeted'],
+                'threshold': status['threshold'],
+                'spent': status['spent']
+            }
+        cls._loaded.add((year, month))
+    
+    @staticmethod
+    def _level(state: Dict[str, Any], spent) -> int:
+        amount = state['amount']
+        if amount <= 0:
+            return OK
+        if spent > amount:
+            return OVER_BUDGET
+        if spent / amount * 100 >= state['threshold']:
+            return ALERTING
+        return OK
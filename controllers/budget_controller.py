@@ -1,12 +1,16 @@
-from models import get_session, Budget, Transaction, TransactionType
-from typing import List, Optional, Dict, Any
-from sqlalchemy import extract, func
+from models import get_session, Budget, Category, TransactionType, MonthlyRollup
+from models.rollups import rollup_period_filter, rollup_type_code
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_, tuple_
+from utils.events import publish_change, BUDGET, ADDED, UPDATED, DELETED
+from .budget_alerts import BudgetAlerts
 
 class BudgetController:
     """Controlador de orçamentos"""
     
-    def __init__(self):
-        self.session = get_session()
+    def __init__(self, session: Optional[Session] = None):
+        self.session = session or get_session()
     
     def add_budget(self, category_id: int, amount: float, month: int, year: int, alert_threshold: float = 0.8) -> Budget:
         """Adiciona um novo orçamento"""
@@ -19,6 +23,8 @@ class BudgetController:
             existing.is_active = True
             self.session.commit()
             self.session.refresh(existing)
+            BudgetAlerts.invalidate([(year, month)])
+            publish_change(BUDGET, UPDATED, periods=[(year, month)], category_ids=[category_id])
             return existing
         
         budget = Budget(
@@ -32,6 +38,8 @@ class BudgetController:
         self.session.add(budget)
         self.session.commit()
         self.session.refresh(budget)
+        BudgetAlerts.invalidate([(year, month)])
+        publish_change(BUDGET, ADDED, periods=[(year, month)], category_ids=[category_id])
         return budget
     
     def get_budget(self, category_id: int, month: int, year: int) -> Optional[Budget]:
@@ -66,11 +74,10 @@ class BudgetController:
             }
         
         # Calcular gasto real
-        spent = self.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.category_id == category_id,
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year,
-            Transaction.type == 'expense'
+        spent = self.session.query(func.sum(MonthlyRollup.total)).filter(
+            MonthlyRollup.category_id == category_id,
+            rollup_period_filter(month, year),
+            MonthlyRollup.type == rollup_type_code(TransactionType.EXPENSE)
         ).scalar() or 0
         
         remaining = budget.amount - spent
@@ -89,28 +96,95 @@ class BudgetController:
     
     def get_all_budget_status(self, month: int, year: int) -> List[Dict[str, Any]]:
         """Retorna status de todos os orçamentos do período"""
-        budgets = self.get_all_budgets(month, year)
+        return self.get_budget_status_for_periods([(month, year)])
+    
+    def get_year_budget_status(self, year: int) -> List[Dict[str, Any]]:
+        """Retorna status de todos os orçamentos dos doze meses de um ano"""
+        return self.get_budget_status_for_periods([(month, year) for month in range(1, 13)])
+    
+    def get_budget_status_for_periods(self, periods: Sequence[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """Retorna status dos orçamentos de vários meses em uma única consulta
         
-        result = []
-        for budget in budgets:
-            status = self.get_budget_status(budget.category_id, month, year)
-            status['category_id'] = budget.category_id
-            status['category_name'] = budget.category.name if budget.category else 'Desconhecida'
-            status['category_icon'] = budget.category.icon if budget.category else '📁'
-            status['category_color'] = budget.category.color if budget.category else '#2E86AB'
-            result.append(status)
+        `periods` é uma sequência de (mês, ano). Orçamentos, categorias e o
+        gasto de cada categoria/mês (subconsulta agrupada sobre o rollup) são
+        lidos juntos; o resultado vem ordenado por ano, mês e orçamento, e
+        cada item inclui 'month' e 'year' além dos campos de
+        get_budget_status.
+        """
+        if not periods:
+            return []
+        wanted = {(year, month) for month, year in periods}
         
+        spent = self.session.query(
+            MonthlyRollup.year,
+            MonthlyRollup.month,
+            MonthlyRollup.category_id,
+            func.sum(MonthlyRollup.total).label('spent')
+        ).filter(
+            MonthlyRollup.type == rollup_type_code(TransactionType.EXPENSE),
+            tuple_(MonthlyRollup.year, MonthlyRollup.month).in_(wanted)
+        ).group_by(
+            MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.category_id
+        ).subquery()
+        
+        rows = self.session.query(
+            Budget.id,
+            Budget.category_id,
+            Budget.month,
+            Budget.year,
+            Budget.amount,
+            Budget.alert_threshold,
+            Category.name,
+            Category.icon,
+            Category.color,
+            spent.c.spent
+        ).join(
+            Category, Category.id == Budget.category_id
+        ).outerjoin(spent, and_(
+            spent.c.year == Budget.year,
+            spent.c.month == Budget.month,
+            spent.c.category_id == Budget.category_id
+        )).filter(
+            Budget.is_active == True,
+            tuple_(Budget.year, Budget.month).in_(wanted)
+        ).order_by(Budget.year, Budget.month, Budget.id).all()
+        
+        result = []
+        for row in rows:
+            amount = row.amount
+            total_spent = row.spent or 0
+            percentage = (total_spent / amount * 100) if amount > 0 else 0
+            result.append({
+                'has_budget': True,
+                'budget_id': row.id,
+                'month': row.month,
+                'year': row.year,
+                'budgeted': amount,
+                'spent': total_spent,
+                'remaining': amount - total_spent,
+                'percentage': percentage,
+                'alert': percentage >= (row.alert_threshold * 100),
+                'threshold': row.alert_threshold * 100,
+                'category_id': row.category_id,
+                'category_name': row.name,
+                'category_icon': row.icon,
+                'category_color': row.color
+            })
         return result
     
     def update_budget(self, budget_id: int, **kwargs) -> Optional[Budget]:
         """Atualiza um orçamento"""
         budget = self.session.query(Budget).filter(Budget.id == budget_id).first()
         if budget:
+            old_period, old_category_id = (budget.year, budget.month), budget.category_id
             for key, value in kwargs.items():
                 if hasattr(budget, key):
                     setattr(budget, key, value)
             self.session.commit()
             self.session.refresh(budget)
+            BudgetAlerts.invalidate([old_period, (budget.year, budget.month)])
+            publish_change(BUDGET, UPDATED, periods=[old_period, (budget.year, budget.month)],
+                           category_ids=[old_category_id, budget.category_id])
         return budget
     
     def delete_budget(self, budget_id: int) -> bool:
@@ -119,6 +193,9 @@ class BudgetController:
         if budget:
             budget.is_active = False
             self.session.commit()
+            BudgetAlerts.invalidate([(budget.year, budget.month)])
+            publish_change(BUDGET, DELETED, periods=[(budget.year, budget.month)],
+                           category_ids=[budget.category_id])
             return True
         return False
     
@@ -0,0 +1,71 @@
+from models import get_session, Category
+from typing import Dict, List, NamedTuple, Optional
+import threading
+
+class CategoryInfo(NamedTuple):
+    """Dados de exibição de uma categoria (imutável, seguro entre threads)"""
+    id: int
+    name: str
+    icon: str
+    color: str
+    is_active: bool
+
+# Usado quando a transação aponta para uma categoria inexistente
+UNKNOWN_CATEGORY = CategoryInfo(id=0, name='Sem categoria', icon='📁', color='#2E86AB', is_active=False)
+
+class CategoryRegistry:
+    """Cache de categorias compartilhado por todas as views e controladores
+    
+    A tabela de categorias é pequena: é lida uma vez em um mapa
+    id -> CategoryInfo e recarregada apenas após invalidate(), chamado pelo
+    MainController quando uma categoria é criada, alterada ou desativada.
+    """
+    
+    _categories: Optional[Dict[int, CategoryInfo]] = None
+    _lock = threading.RLock()
+    
+    @classmethod
+    def _ensure_loaded(cls) -> Dict[int, CategoryInfo]:
+        """Carrega as categorias do banco se o cache estiver vazio"""
+        with cls._lock:
+            if cls._categories is None:
+                session = get_session()
+                try:
+                    rows = session.query(
+                        Category.id, Category.name, Category.icon, Category.color, Category.is_active
+                    ).all()
+                finally:
+                    session.close()
+                cls._categories = {
+                    row.id: CategoryInfo(row.id, row.name, row.icon or '📁', row.color or '#2E86AB', bool(row.is_active))
+                    for row in rows
+                }
+            return cls._categories
+    
+    @classmethod
+    def get(cls, category_id: Optional[int]) -> CategoryInfo:
+        """Retorna os dados da categoria (ou UNKNOWN_CATEGORY)"""
+        return cls._ensure_loaded().get(category_id, UNKNOWN_CATEGORY)
+    
+    @classmethod
+    def get_all(cls, active_only: bool = True) -> List[CategoryInfo]:
+        """Retorna as categorias ordenadas por nome"""
+        categories = cls._ensure_loaded().values()
+        if active_only:
+            categories = [cat for cat in categories if cat.is_active]
+        return sorted(categories, key=lambda cat: cat.name)
+    
+    @classmethod
+    def find_by_name(cls, name: str) -> Optional[CategoryInfo]:
+        """Retorna a categoria pelo nome (sem diferenciar maiúsculas)"""
+        wanted = name.strip().lower()
+        for cat in cls._ensure_loaded().values():
+            if cat.name.lower() == wanted:
+                return cat
+        return None
+    
+    @classmethod
+    def invalidate(cls):
+        """Descarta o cache; a próxima consulta recarrega do banco"""
+        with cls._lock:
+            cls._categories = None
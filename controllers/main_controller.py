@@ -1,11 +1,14 @@
 from models import get_session, Category
+from utils.events import publish_change, CATEGORY, ADDED, UPDATED, DELETED
+from .category_registry import CategoryRegistry
 from typing import List, Optional
+from sqlalchemy.orm import Session
 
 class MainController:
     """Controlador principal da aplicação"""
     
-    def __init__(self):
-        self.session = get_session()
+    def __init__(self, session: Optional[Session] = None):
+        self.session = session or get_session()
     
     def get_all_categories(self, active_only: bool = True) -> List[Category]:
         """Retorna todas as categorias"""
@@ -23,7 +26,9 @@ class MainController:
         category = Category(name=name, icon=icon, color=color)
         self.session.add(category)
         self.session.commit()
+        CategoryRegistry.invalidate()
         self.session.refresh(category)
+        publish_change(CATEGORY, ADDED, category_ids=[category.id])
         return category
     
     def update_category(self, category_id: int, **kwargs) -> Optional[Category]:
@@ -34,7 +39,9 @@ class MainController:
                 if hasattr(category, key):
                     setattr(category, key, value)
             self.session.commit()
+            CategoryRegistry.invalidate()
             self.session.refresh(category)
+            publish_change(CATEGORY, UPDATED, category_ids=[category_id])
         return category
     
     def delete_category(self, category_id: int) -> bool:
@@ -43,6 +50,8 @@ class MainController:
         if category:
             category.is_active = False
             self.session.commit()
+            CategoryRegistry.invalidate()
+            publish_change(CATEGORY, DELETED, category_ids=[category_id])
             return True
         return False
     
@@ -0,0 +1,135 @@
+from utils.events import event_bus, TRANSACTION, CATEGORY
+from utils.helpers import get_previous_month_year
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Set, Tuple
+import copy
+import functools
+import inspect
+import threading
+
+# Máximo de resultados guardados (os menos usados saem primeiro)
+REPORT_CACHE_MAX_ENTRIES = 256
+
+class ReportCache:
+    """Cache LRU de resultados de relatórios com invalidação por período
+    
+    Cada resultado guarda os meses (ano, mês) de que depende. Um evento de
+    transação descarta só os resultados dos meses afetados; um evento de
+    categoria (nomes, cores e ícones aparecem nos resultados) descarta
+    tudo. Resultados calculados enquanto um de seus meses era invalidado
+    não são guardados. Os valores são copiados ao entrar e ao sair, então
+    quem recebe pode alterá-los.
+    """
+    
+    def __init__(self, max_entries: int = REPORT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Tuple, Tuple[Any, Tuple[Tuple[int, int], ...]]]' = OrderedDict()
+        self._by_period: Dict[Tuple[int, int], Set[Tuple]] = {}
+        self._generations: Dict[Tuple[int, int], int] = {}
+        self._epoch = 0  # incrementado por clear()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key: Tuple, periods: Iterable[Tuple[int, int]], compute: Callable[[], Any]) -> Any:
+        """Retorna o resultado de `key`, calculando com `compute()` se necessário"""
+        periods = tuple(periods)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+            version = self._version(periods)
+        
+        value = compute()
+        
+        with self._lock:
+            if self._version(periods) == version:
+                self._store(key, copy.deepcopy(value), periods)
+        return value
+    
+    def invalidate(self, periods: Iterable[Tuple[int, int]]):
+        """Descarta os resultados que dependem de algum dos meses (ano, mês)"""
+        with self._lock:
+            for period in periods:
+                self._generations[period] = self._generations.get(period, 0) + 1
+                for key in self._by_period.pop(period, ()):
+                    self._remove(key)
+    
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._by_period.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Contadores de acertos, faltas e descartes por falta de espaço"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries)
+            }
+    
+    def on_change(self, event):
+        """Assinante do event_bus"""
+        if event.entity == CATEGORY:
+            self.clear()
+        elif event.entity == TRANSACTION:
+            self.invalidate(event.periods)
+    
+    def _version(self, periods: Tuple[Tuple[int, int], ...]) -> Tuple[int, ...]:
+        return (self._epoch,) + tuple(self._generations.get(period, 0) for period in periods)
+    
+    def _store(self, key: Tuple, value: Any, periods: Tuple[Tuple[int, int], ...]):
+        self._remove(key)
+        self._entries[key] = (value, periods)
+        for period in periods:
+            self._by_period.setdefault(period, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for period in entry[1]:
+            keys = self._by_period.get(period)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_period[period]
+
+report_cache = ReportCache()
+event_bus.subscribe(report_cache.on_change)
+
+def cached_report(include_previous: bool = False):
+    """Guarda em report_cache o resultado de um método (self, month, year, ...)
+    
+    A chave é o nome do método com os argumentos já completados pelos
+    valores padrão. O resultado depende do mês informado e, com
+    `include_previous`, também do mês anterior (comparativos).
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())[1:]
+            month, year = bound.arguments['month'], bound.arguments['year']
+            periods = [(year, month)]
+            if include_previous:
+                prev_month, prev_year = get_previous_month_year(month, year)
+                periods.append((prev_year, prev_month))
+            
+            key = (method.__name__,) + tuple(value for _, value in arguments)
+            return report_cache.get_or_compute(key, periods, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
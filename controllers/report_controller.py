@@ -1,132 +1,416 @@
-from models import get_session, Transaction, TransactionType, Category
-from datetime import datetime
-from typing import Dict, List, Any
-from sqlalchemy import extract, func
+from models import (get_session, Transaction, TransactionType, MonthlyRollup, Tag, transaction_tags,
+                    period_filter, date_range_filter, month_bounds, add_months, bucket_start, next_bucket,
+                    iter_buckets, GRANULARITIES)
+from models.periods import is_month_start
+from models.rollups import rollup_period_filter, rollup_month_index, rollup_type_code, rollup_method_value
+from utils.helpers import get_previous_month_year, get_month_name
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, cast, tuple_, Integer
+from sqlalchemy.orm import selectinload
+from .category_registry import CategoryRegistry
+from .report_cache import cached_report
+from analytics import get_ledger
+from decimal import Decimal
 import calendar
+import math
 
 class ReportController:
-    """Controlador de relatórios e análises"""
+    """Controlador de relatórios e análises
     
-    def __init__(self):
-        self.session = get_session()
+    Com o backend 'numpy' (veja analytics), os totais vêm do ledger colunar
+    em memória em vez de consultas SQL; os resultados são os mesmos.
+    """
     
+    def __init__(self, session: Optional[Session] = None):
+        self.session = session or get_session()
+    
+    def _ledger(self):
+        """Ledger colunar atualizado, ou None no backend SQL"""
+        return get_ledger(self.session)
+    
+    @cached_report(include_previous=True)
     def get_dashboard_metrics(self, month: int, year: int) -> Dict[str, Any]:
         """Retorna métricas do dashboard para o período"""
-        transactions = self.session.query(Transaction).filter(
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year
-        ).all()
+        prev_month, prev_year = get_previous_month_year(month, year)
         
-        income = sum(t.amount for t in transactions if t.type == 'income')
-        expenses = sum(t.amount for t in transactions if t.type == 'expense')
-        balance = income - expenses
+        # Mês atual e anterior em uma única consulta agregada
+        current, previous = self.get_period_metrics([(month, year), (prev_month, prev_year)])
         
         # Comparação com mês anterior
-        prev_month = month - 1 if month > 1 else 12
-        prev_year = year if month > 1 else year - 1
-        
-        prev_transactions = self.session.query(Transaction).filter(
-            extract('month', Transaction.transaction_date) == prev_month,
-            extract('year', Transaction.transaction_date) == prev_year
-        ).all()
-        
-        prev_expenses = sum(t.amount for t in prev_transactions if t.type == 'expense')
+        expenses, prev_expenses = current['expenses'], previous['expenses']
         expense_variation = ((expenses - prev_expenses) / prev_expenses * 100) if prev_expenses > 0 else 0
         
         return {
-            'income': income,
+            'income': current['income'],
             'expenses': expenses,
-            'balance': balance,
-            'transaction_count': len(transactions),
+            'balance': current['balance'],
+            'transaction_count': current['transaction_count'],
             'expense_variation': expense_variation,
-            'avg_transaction': expenses / len([t for t in transactions if t.type == 'expense']) if expenses > 0 else 0
+            'avg_transaction': current['avg_transaction']
         }
     
-    def get_category_breakdown(self, month: int, year: int) -> List[Dict[str, Any]]:
-        """Retorna distribuição de gastos por categoria"""
-        result = self.session.query(
-            Category.name,
-            Category.color,
-            Category.icon,
-            func.sum(Transaction.amount).label('total'),
-            func.count(Transaction.id).label('count')
-        ).join(Transaction).filter(
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year,
-            Transaction.type == 'expense'
-        ).group_by(Category.id).all()
+    def get_period_metrics(self, periods: Sequence[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """Retorna entradas, saídas, saldo e contagens de vários meses
         
-        total_expenses = sum(r.total for r in result)
+        `periods` é uma sequência de (mês, ano). Todos os meses são somados
+        em uma única consulta ao rollup, com SUM(CASE ...) por tipo; o
+        resultado segue a ordem de `periods`, com zeros nos meses sem
+        movimento.
+        """
+        if not periods:
+            return []
         
-        return [{
-            'name': r.name,
-            'color': r.color,
-            'icon': r.icon,
-            'total': r.total,
-            'count': r.count,
-            'percentage': (r.total / total_expenses * 100) if total_expenses > 0 else 0
-        } for r in result]
-    
-    def get_monthly_evolution(self, year: int, months: int = 6) -> List[Dict[str, Any]]:
-        """Retorna evolução mensal dos últimos N meses"""
-        evolution = []
-        current_date = datetime.now()
-        
-        for i in range(months - 1, -1, -1):
-            target_month = current_date.month - i
-            target_year = current_date.year
-            
-            if target_month <= 0:
-                target_month += 12
-                target_year -= 1
-            
-            transactions = self.session.query(Transaction).filter(
-                extract('month', Transaction.transaction_date) == target_month,
-                extract('year', Transaction.transaction_date) == target_year
-            ).all()
-            
-            income = sum(t.amount for t in transactions if t.type == 'income')
-            expenses = sum(t.amount for t in transactions if t.type == 'expense')
-            
-            evolution.append({
-                'month': target_month,
-                'year': target_year,
-                'month_name': calendar.month_abbr[target_month],
+        ledger = self._ledger()
+        by_period = ledger.period_totals(periods) if ledger is not None else self._rollup_period_totals(periods)
+        metrics = []
+        for month, year in periods:
+            row = by_period.get((year, month))
+            income = (row.income or 0) if row else 0
+            expenses = (row.expenses or 0) if row else 0
+            expense_count = (row.expense_count or 0) if row else 0
+            metrics.append({
+                'month': month,
+                'year': year,
                 'income': income,
                 'expenses': expenses,
-                'balance': income - expenses
+                'balance': income - expenses,
+                'transaction_count': (row.count or 0) if row else 0,
+                'expense_count': expense_count,
+                'avg_transaction': expenses / expense_count if expense_count > 0 else 0
+            })
+        return metrics
+    
+    def _rollup_period_totals(self, periods: Sequence[Tuple[int, int]]):
+        """Totais de cada (ano, mês) lidos do rollup em uma consulta"""
+        income_code = rollup_type_code(TransactionType.INCOME)
+        expense_code = rollup_type_code(TransactionType.EXPENSE)
+        is_income = MonthlyRollup.type == income_code
+        is_expense = MonthlyRollup.type == expense_code
+        
+        rows = self.session.query(
+            MonthlyRollup.year,
+            MonthlyRollup.month,
+            func.sum(case((is_income, MonthlyRollup.total), else_=0)).label('income'),
+            func.sum(case((is_expense, MonthlyRollup.total), else_=0)).label('expenses'),
+            func.sum(MonthlyRollup.count).label('count'),
+            func.sum(case((is_expense, MonthlyRollup.count), else_=0)).label('expense_count')
+        ).filter(
+            tuple_(MonthlyRollup.year, MonthlyRollup.month).in_({(year, month) for month, year in periods})
+        ).group_by(MonthlyRollup.year, MonthlyRollup.month).all()
+        
+        return {(r.year, r.month): r for r in rows}
+    
+    @cached_report()
+    def get_category_breakdown(self, month: int, year: int) -> List[Dict[str, Any]]:
+        """Retorna distribuição de gastos por categoria"""
+        ledger = self._ledger()
+        if ledger is not None:
+            result = ledger.expense_groups(month, year, 'categories')
+        else:
+            result = self.session.query(
+                MonthlyRollup.category_id,
+                func.sum(MonthlyRollup.total).label('total'),
+                func.sum(MonthlyRollup.count).label('count')
+            ).filter(
+                rollup_period_filter(month, year),
+                MonthlyRollup.type == rollup_type_code(TransactionType.EXPENSE)
+            ).group_by(MonthlyRollup.category_id).all()
+        
+        total_expenses = sum(total for _, total, _ in result)
+        
+        breakdown = []
+        for category_id, total, count in result:
+            category = CategoryRegistry.get(category_id)
+            breakdown.append({
+                'category_id': category_id,
+                'name': category.name,
+                'color': category.color,
+                'icon': category.icon,
+                'total': total,
+                'count': count,
+                'percentage': (total / total_expenses * 100) if total_expenses > 0 else 0
             })
+        return breakdown
+    
+    def get_monthly_evolution(self, year: int, months: int = 6, month: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retorna evolução mensal dos N meses que terminam em month/year
         
-        return evolution
+        Sem `month`, a série termina no mês atual se `year` for o ano
+        corrente, ou em dezembro de `year` caso contrário.
+        """
+        if month is None:
+            now = datetime.now()
+            month = now.month if year == now.year else 12
+        end = month_bounds(month, year)[1]
+        return self.get_time_series(add_months(end, -months), end, 'month')
     
+    def get_time_series(self, start: datetime, end: datetime, granularity: str = 'month',
+                        by_category: bool = False) -> List[Dict[str, Any]]:
+        """Retorna entradas, saídas e saldo de [start, end) em intervalos de tempo
+        
+        `granularity` é 'day', 'week' (semana ISO), 'month', 'quarter' ou
+        'year'. Os totais vêm de uma única consulta agrupada: do
+        monthly_rollup quando o intervalo é de meses inteiros e a
+        granularidade é mensal ou maior, e de transactions nos demais casos.
+        Intervalos sem movimento aparecem zerados. Com `by_category`, cada
+        item traz também 'categories': {category_id: {'income', 'expenses'}}.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularidade inválida: {granularity}")
+        if start >= end:
+            return []
+        
+        series = {bucket: {'income': 0, 'expenses': 0, 'categories': {}}
+                  for bucket in iter_buckets(start, end, granularity)}
+        
+        ledger = self._ledger()
+        if ledger is not None:
+            rows = ledger.bucket_totals(start, end, granularity, by_category)
+        elif granularity in ('month', 'quarter', 'year') and is_month_start(start) and is_month_start(end):
+            rows = self._rollup_buckets(start, end, by_category)
+        else:
+            rows = self._transaction_buckets(start, end, granularity, by_category)
+        
+        for period_start, category_id, income, expenses in rows:
+            entry = series[bucket_start(period_start, granularity)]
+            entry['income'] += income or 0
+            entry['expenses'] += expenses or 0
+            if by_category:
+                split = entry['categories'].setdefault(category_id, {'income': 0, 'expenses': 0})
+                split['income'] += income or 0
+                split['expenses'] += expenses or 0
+        
+        result = []
+        for bucket, entry in series.items():
+            item = {
+                'start': bucket,
+                'end': next_bucket(bucket, granularity),
+                'label': self._bucket_label(bucket, granularity),
+                'month': bucket.month,
+                'year': bucket.year,
+                'month_name': calendar.month_abbr[bucket.month],
+                'income': entry['income'],
+                'expenses': entry['expenses'],
+                'balance': entry['income'] - entry['expenses']
+            }
+            if by_category:
+                item['categories'] = entry['categories']
+            result.append(item)
+        return result
+    
+    def _rollup_buckets(self, start: datetime, end: datetime, by_category: bool):
+        """Totais por mês (e categoria) do rollup em [start, end) de meses inteiros"""
+        income_code = rollup_type_code(TransactionType.INCOME)
+        expense_code = rollup_type_code(TransactionType.EXPENSE)
+        columns = [MonthlyRollup.year, MonthlyRollup.month]
+        if by_category:
+            columns.append(MonthlyRollup.category_id)
+        
+        month_index = rollup_month_index()
+        rows = self.session.query(
+            *columns,
+            func.sum(case((MonthlyRollup.type == income_code, MonthlyRollup.total), else_=0)).label('income'),
+            func.sum(case((MonthlyRollup.type == expense_code, MonthlyRollup.total), else_=0)).label('expenses')
+        ).filter(
+            month_index >= start.year * 12 + start.month - 1,
+            month_index < end.year * 12 + end.month - 1
+        ).group_by(*columns).all()
+        
+        for r in rows:
+            yield datetime(r.year, r.month, 1), r.category_id if by_category else None, r.income, r.expenses
+    
+    def _transaction_buckets(self, start: datetime, end: datetime, granularity: str, by_category: bool):
+        """Totais por intervalo (e categoria) lidos de transactions em [start, end)"""
+        date = Transaction.transaction_date
+        # Trimestres e anos são agrupados por mês no SQL e somados no intervalo
+        bucket = {
+            'day': func.date(date),
+            'week': func.date(date, 'weekday 0', '-6 days'),
+        }.get(granularity, func.date(date, 'start of month')).label('bucket')
+        columns = [bucket]
+        if by_category:
+            columns.append(Transaction.category_id)
+        
+        rows = self.session.query(
+            *columns,
+            func.sum(case((Transaction.type == TransactionType.INCOME, Transaction.amount), else_=0)).label('income'),
+            func.sum(case((Transaction.type == TransactionType.EXPENSE, Transaction.amount), else_=0)).label('expenses')
+        ).filter(date_range_filter(start, end)).group_by(*columns).all()
+        
+        for r in rows:
+            yield (datetime.strptime(r.bucket, '%Y-%m-%d'), r.category_id if by_category else None,
+                   r.income, r.expenses)
+    
+    @staticmethod
+    def _bucket_label(bucket: datetime, granularity: str) -> str:
+        """Rótulo curto do intervalo para eixos de gráficos"""
+        if granularity in ('day', 'week'):
+            return bucket.strftime('%d/%m')
+        if granularity == 'month':
+            return f"{get_month_name(bucket.month)[:3]}/{bucket.year % 100:02d}"
+        if granularity == 'quarter':
+            return f"{(bucket.month - 1) // 3 + 1}T/{bucket.year % 100:02d}"
+        return str(bucket.year)
+    
+    @cached_report()
     def get_top_expenses(self, month: int, year: int, limit: int = 5) -> List[Dict[str, Any]]:
         """Retorna as maiores despesas do período"""
-        transactions = self.session.query(Transaction).filter(
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year,
-            Transaction.type == 'expense'
-        ).order_by(Transaction.amount.desc()).limit(limit).all()
+        ledger = self._ledger()
+        if ledger is not None:
+            ids = ledger.top_expense_ids(month, year, limit)
+            by_id = {t.id: t for t in self.session.query(Transaction).options(
+                selectinload(Transaction.tags)
+            ).filter(Transaction.id.in_(ids)).all()}
+            transactions = [by_id[i] for i in ids if i in by_id]
+        else:
+            transactions = self.session.query(Transaction).options(
+                selectinload(Transaction.tags)
+            ).filter(
+                period_filter(month, year),
+                Transaction.type == 'expense'
+            ).order_by(Transaction.amount.desc()).limit(limit).all()
         
-        return [t.to_dict() for t in transactions]
+        return [self._transaction_to_dict(t) for t in transactions]
     
+    @cached_report()
     def get_payment_method_breakdown(self, month: int, year: int) -> List[Dict[str, Any]]:
         """Retorna distribuição por método de pagamento"""
+        ledger = self._ledger()
+        if ledger is not None:
+            result = ledger.expense_groups(month, year, 'methods')
+        else:
+            result = self.session.query(
+                MonthlyRollup.payment_method,
+                func.sum(MonthlyRollup.total).label('total'),
+                func.sum(MonthlyRollup.count).label('count')
+            ).filter(
+                rollup_period_filter(month, year),
+                MonthlyRollup.type == rollup_type_code(TransactionType.EXPENSE)
+            ).group_by(MonthlyRollup.payment_method).all()
+        
+        return [{
+            'method': rollup_method_value(method) or 'Desconhecido',
+            'total': total,
+            'count': count
+        } for method, total, count in result]
+    
+    def get_amount_percentiles(self, start: datetime, end: datetime,
+                               percentiles: Sequence[float] = (50, 90, 99),
+                               trans_type: str = 'expense') -> Dict[float, Optional[Decimal]]:
+        """Retorna percentis (interpolação linear) dos valores das transações em [start, end)
+        
+        Sem transações no intervalo, todos os percentis são None.
+        """
+        ledger = self._ledger()
+        if ledger is not None:
+            return dict(zip(percentiles, ledger.percentiles(start, end, percentiles, trans_type)))
+        
+        amounts = [amount for amount, in self.session.query(Transaction.amount).filter(
+            date_range_filter(start, end),
+            Transaction.type == trans_type
+        ).order_by(Transaction.amount)]
+        
+        result = {}
+        for p in percentiles:
+            if not amounts:
+                result[p] = None
+                continue
+            position = (len(amounts) - 1) * Decimal(str(p)) / 100
+            lower, upper = amounts[math.floor(position)], amounts[math.ceil(position)]
+            result[p] = (lower + (upper - lower) * (position - math.floor(position))).quantize(Decimal('0.01'))
+        return result
+    
+    def get_moving_average(self, start: datetime, end: datetime, window: int = 7,
+                           trans_type: str = 'expense') -> List[Dict[str, Any]]:
+        """Retorna a média móvel diária de `window` dias para cada dia de [start, end)"""
+        window = max(1, int(window))
+        start = datetime(start.year, start.month, start.day)
+        ledger = self._ledger()
+        if ledger is not None:
+            sums = [Decimal(cents) / 100 for cents in ledger.rolling_daily_sums(start, end, window, trans_type)]
+        else:
+            key = 'expenses' if trans_type == 'expense' else 'income'
+            daily = [item[key] for item in self.get_time_series(start - timedelta(days=window - 1), end, 'day')]
+            sums = [sum(daily[i:i + window]) for i in range(len(daily) - window + 1)]
+        
+        return [{
+            'date': start + timedelta(days=i),
+            'average': (Decimal(total) / window).quantize(Decimal('0.01'))
+        } for i, total in enumerate(sums)]
+    
+    def get_cash_flow_forecast(self, month: int, year: int, months_ahead: int = 3) -> Optional[Dict[str, Any]]:
+        """Retorna a projeção do fim de month/year e dos `months_ahead` meses seguintes
+        
+        Combina lançamentos recorrentes, ritmo de gastos por categoria e
+        sazonalidade (veja analytics.forecast). Usa o NumPy com qualquer
+        backend de relatórios; sem ele instalado, retorna None.
+        """
+        try:
+            from analytics.forecast import CashFlowForecast
+        except ImportError:
+            return None
+        forecast = CashFlowForecast(self.session).project(month, year, months_ahead)
+        # Meses projetados no mesmo formato dos itens de get_time_series
+        for item in forecast['months']:
+            start, end = month_bounds(item['month'], item['year'])
+            item.update({
+                'start': start,
+                'end': end,
+                'label': self._bucket_label(start, 'month'),
+                'month_name': calendar.month_abbr[item['month']],
+            })
+        return forecast
+    
+    def get_tag_monthly_totals(self, start: datetime, end: datetime,
+                               trans_type: str = 'expense') -> List[Dict[str, Any]]:
+        """Retorna totais por tag por mês no intervalo [start, end)"""
+        year = cast(func.strftime('%Y', Transaction.transaction_date), Integer).label('year')
+        month = cast(func.strftime('%m', Transaction.transaction_date), Integer).label('month')
+        
         result = self.session.query(
-            Transaction.payment_method,
+            Tag.name,
+            year,
+            month,
             func.sum(Transaction.amount).label('total'),
             func.count(Transaction.id).label('count')
+        ).select_from(Transaction).join(
+            transaction_tags, transaction_tags.c.transaction_id == Transaction.id
+        ).join(
+            Tag, Tag.id == transaction_tags.c.tag_id
         ).filter(
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year,
-            Transaction.type == 'expense'
-        ).group_by(Transaction.payment_method).all()
+            date_range_filter(start, end),
+            Transaction.type == trans_type
+        ).group_by(Tag.name, year, month).order_by(year, month, Tag.name).all()
         
         return [{
-            'method': r.payment_method if r.payment_method else 'Desconhecido',
+            'tag': r.name,
+            'year': r.year,
+            'month': r.month,
             'total': r.total,
             'count': r.count
         } for r in result]
     
+    def _transaction_to_dict(self, transaction: Transaction) -> Dict[str, Any]:
+        """Converte transação para dict resolvendo a categoria pelo cache"""
+        category = CategoryRegistry.get(transaction.category_id)
+        return {
+            'id': transaction.id,
+            'amount': transaction.amount,
+            'description': transaction.description,
+            'category_id': transaction.category_id,
+            'category_name': category.name,
+            'category_icon': category.icon,
+            'category_color': category.color,
+            'transaction_date': transaction.transaction_date.isoformat() if transaction.transaction_date else None,
+            'type': transaction.type,
+            'payment_method': transaction.payment_method,
+            'tags': transaction.tag_names,
+            'notes': transaction.notes,
+            'created_at': transaction.created_at.isoformat() if transaction.created_at else None
+        }
+    
     def close(self):
         """Fecha a sessão do banco de dados"""
         self.session.close()
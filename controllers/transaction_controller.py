@@ -1,22 +1,143 @@
-from models import get_session, Transaction, TransactionType, PaymentMethod
-from utils import FinancialValidators
-from typing import List, Optional, Dict, Any
+from models import (get_session, Transaction, TransactionType, PaymentMethod, MonthlyRollup, Tag, transaction_tags,
+                    period_filter, date_range_filter)
+from models.rollups import apply_rollup_delta, apply_rollup_deltas, rollup_period_filter, rollup_type_code
+from models.search import fts5_available, search_transaction_ids
+from utils import FinancialValidators, encode_cursor, decode_cursor
+from utils.events import publish_change, TRANSACTION, ADDED, UPDATED, DELETED
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
+from sqlalchemy.orm import Session
 from datetime import datetime
-from sqlalchemy import extract, func, and_
+from sqlalchemy import func, case, or_, insert, select, tuple_
+from .category_registry import CategoryRegistry, UNKNOWN_CATEGORY
+from .budget_alerts import BudgetAlerts
+import re
 
 class TransactionController:
     """Controlador de transações"""
     
-    def __init__(self):
-        self.session = get_session()
+    def __init__(self, session: Optional[Session] = None):
+        self.session = session or get_session()
     
     def add_transaction(self, transaction_data: Dict[str, Any]) -> Transaction:
         """Adiciona uma nova transação com validação"""
+        values, tag_names = self._prepare_transaction(transaction_data)
+        
+        # Criação da transação
+        transaction = Transaction(**values)
+        
+        try:
+            transaction.tags = self._resolve_tags(tag_names)
+            self.session.add(transaction)
+            self._update_rollup(transaction, 1)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        self.session.refresh(transaction)
+        publish_change(TRANSACTION, ADDED, dates=[transaction.transaction_date],
+                       category_ids=[transaction.category_id])
+        BudgetAlerts.record(self.session, [self._expense_delta(transaction, 1)])
+        return transaction
+    
+    def add_transactions_bulk(self, transactions: Iterable[Dict[str, Any]],
+                              batch_size: int = 500) -> Dict[str, Any]:
+        """Adiciona muitas transações de uma vez (importação, carga inicial)
+        
+        Cada lote é validado, inserido com um único executemany e gravado em
+        um só commit, junto com as tags e os deltas agregados do rollup.
+        Linhas inválidas não interrompem a carga: são devolvidas em 'failed'
+        como {'index': posição na entrada, 'error': mensagem}.
+        
+        Retorna {'inserted': int, 'failed': [...]}.
+        """
+        batch_size = max(1, int(batch_size))
+        result = {'inserted': 0, 'failed': []}
+        batch = []
+        
+        for index, transaction_data in enumerate(transactions):
+            try:
+                values, tag_names = self._prepare_transaction(transaction_data)
+                if values['type'] not in [t.value for t in TransactionType]:
+                    raise ValueError(f"Tipo inválido: {values['type']}")
+                if CategoryRegistry.get(values['category_id']) is UNKNOWN_CATEGORY:
+                    raise ValueError(f"Categoria inexistente: {values['category_id']}")
+            except (KeyError, TypeError, ValueError) as e:
+                result['failed'].append({'index': index, 'error': str(e)})
+                continue
+            
+            batch.append((index, values, tag_names))
+            if len(batch) >= batch_size:
+                self._insert_batch(batch, result)
+                batch = []
+        
+        if batch:
+            self._insert_batch(batch, result)
+        return result
+    
+    def _insert_batch(self, batch: List[Tuple[int, Dict[str, Any], List[str]]], result: Dict[str, Any]):
+        """Grava um lote já validado em uma única transação do banco"""
+        try:
+            now = datetime.now()
+            rows = []
+            rollup = {}
+            
+            for _, values, _ in batch:
+                row = dict(values, created_at=now, updated_at=now)
+                rows.append(row)
+                
+                key = (row['transaction_date'].year, row['transaction_date'].month,
+                       row['category_id'], row['type'], row['payment_method'])
+                total, count = rollup.get(key, (0, 0))
+                rollup[key] = (total + row['amount'], count + 1)
+            
+            # O SQLite atribui os IDs; RETURNING na ordem das linhas liga as tags
+            # sem reler a tabela e sem disputar IDs com outras conexões
+            table = Transaction.__table__
+            ids = self.session.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+            tag_links = [(transaction_id, tag_names)
+                         for transaction_id, (_, _, tag_names) in zip(ids, batch) if tag_names]
+            
+            if tag_links:
+                tags = {tag.name: tag for tag in self._resolve_tags(
+                    sorted({name for _, names in tag_links for name in names})
+                )}
+                self.session.flush()
+                self.session.execute(insert(transaction_tags), [
+                    {'transaction_id': transaction_id, 'tag_id': tags[name].id}
+                    for transaction_id, names in tag_links for name in names
+                ])
+            
+            apply_rollup_deltas(self.session, [
+                (datetime(year, month, 1), category_id, trans_type, payment_method, total, count)
+                for (year, month, category_id, trans_type, payment_method), (total, count) in rollup.items()
+            ])
+            
+            self.session.commit()
+            result['inserted'] += len(rows)
+        except Exception as e:
+            self.session.rollback()
+            result['failed'].extend({'index': index, 'error': str(e)} for index, _, _ in batch)
+            return
+        
+        publish_change(TRANSACTION, ADDED,
+                       periods=[(year, month) for year, month, _, _, _ in rollup],
+                       category_ids=[category_id for _, _, category_id, _, _ in rollup])
+        BudgetAlerts.record(self.session, [
+            (category_id, year, month, total)
+            for (year, month, category_id, trans_type, _), (total, _) in rollup.items()
+            if trans_type == TransactionType.EXPENSE.value
+        ])
+    
+    def _prepare_transaction(self, transaction_data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """Valida os dados de entrada e retorna (valores das colunas, nomes das tags)"""
         # Validações
         amount = FinancialValidators.validate_amount(transaction_data['amount'])
         description = FinancialValidators.validate_description(transaction_data['description'])
         category_id = FinancialValidators.validate_category_id(transaction_data['category_id'])
         transaction_date = FinancialValidators.validate_date(transaction_data.get('transaction_date', datetime.now()))
+        tag_names = FinancialValidators.validate_tags(transaction_data.get('tags', []))
         
         # Conversão de enums
         trans_type = transaction_data.get('type', 'expense')
@@ -36,22 +157,16 @@ class TransactionController:
                 if payment_method not in [pm.value for pm in PaymentMethod]:
                     payment_method = 'Dinheiro'
         
-        # Criação da transação
-        transaction = Transaction(
-            amount=amount,
-            description=description,
-            category_id=category_id,
-            transaction_date=transaction_date,
-            type=trans_type,
-            payment_method=payment_method,
-            tags=transaction_data.get('tags', []),
-            notes=transaction_data.get('notes', '')
-        )
-        
-        self.session.add(transaction)
-        self.session.commit()
-        self.session.refresh(transaction)
-        return transaction
+        values = {
+            'amount': amount,
+            'description': description,
+            'category_id': category_id,
+            'transaction_date': transaction_date,
+            'type': trans_type,
+            'payment_method': payment_method,
+            'notes': transaction_data.get('notes', '')
+        }
+        return values, tag_names
     
     def get_all_transactions(self, limit: Optional[int] = None) -> List[Transaction]:
         """Retorna todas as transações"""
@@ -60,11 +175,143 @@ class TransactionController:
             query = query.limit(limit)
         return query.all()
     
+    def list_transactions(self, filters: Optional[Dict[str, Any]] = None, cursor: Optional[str] = None,
+                          page_size: int = 50) -> Dict[str, Any]:
+        """Lista transações (mais recentes primeiro) com paginação por chave
+        
+        A página é localizada por (transaction_date, id) no índice
+        ix_transactions_date_id, então páginas profundas custam o mesmo que a
+        primeira. Filtros aceitos: start, end (intervalo semiaberto), month e
+        year, category_id, type, payment_method, min_amount, max_amount e tag.
+        
+        Retorna {'items': [...], 'next_cursor': str ou None,
+        'prev_cursor': str ou None}; passe um dos cursores para navegar.
+        """
+        page_size = max(1, int(page_size))
+        direction, after = 'next', None
+        if cursor:
+            key = decode_cursor(cursor)
+            try:
+                direction, after = key[0], (datetime.fromisoformat(key[1]), int(key[2]))
+            except (IndexError, TypeError, ValueError) as e:
+                raise ValueError(f"Cursor inválido: {cursor}") from e
+        
+        position = tuple_(Transaction.transaction_date, Transaction.id)
+        query = self.session.query(Transaction).filter(*self._filter_conditions(filters))
+        
+        if direction == 'prev':
+            # Página anterior: percorre em ordem crescente e inverte o resultado
+            if after:
+                query = query.filter(position > tuple_(*after))
+            query = query.order_by(Transaction.transaction_date.asc(), Transaction.id.asc())
+        else:
+            if after:
+                query = query.filter(position < tuple_(*after))
+            query = query.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+        
+        items = query.limit(page_size + 1).all()
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if direction == 'prev':
+            items.reverse()
+        
+        if not items:
+            return {'items': [], 'next_cursor': None, 'prev_cursor': None}
+        
+        has_next = has_more if direction == 'next' else True
+        has_prev = after is not None if direction == 'next' else has_more
+        return {
+            'items': items,
+            'next_cursor': self._page_cursor('next', items[-1]) if has_next else None,
+            'prev_cursor': self._page_cursor('prev', items[0]) if has_prev else None
+        }
+    
+    def seek_transactions(self, index: int, filters: Optional[Dict[str, Any]] = None,
+                          page_size: int = 50, total: Optional[int] = None) -> Dict[str, Any]:
+        """Retorna a página de list_transactions que começa na linha `index` (0 = mais recente)
+        
+        Usado nos saltos da barra de rolagem: a chave (transaction_date, id)
+        da linha é lida com OFFSET a partir da ponta mais próxima do índice
+        (mais recentes ou mais antigas) e a página vem por chave a partir
+        dela, em vez de percorrer todas as páginas até lá. `total` evita a
+        contagem quando já é conhecido. Além dos campos de list_transactions,
+        retorna 'offset', a posição da primeira linha (menor que `index`
+        quando ele passa da última página).
+        """
+        page_size = max(1, int(page_size))
+        if total is None:
+            total = self.count_transactions(filters)
+        offset = max(0, min(int(index), total - page_size))
+        conditions = self._filter_conditions(filters)
+        
+        key = self.session.query(Transaction.transaction_date, Transaction.id).filter(*conditions)
+        if offset < total // 2:
+            key = key.order_by(Transaction.transaction_date.desc(), Transaction.id.desc()).offset(offset)
+        else:
+            key = key.order_by(Transaction.transaction_date.asc(), Transaction.id.asc()).offset(total - offset - 1)
+        key = key.limit(1).first()
+        if key is None:
+            return {'items': [], 'next_cursor': None, 'prev_cursor': None, 'offset': offset}
+        
+        items = self.session.query(Transaction).filter(
+            *conditions,
+            tuple_(Transaction.transaction_date, Transaction.id) <= tuple_(*key)
+        ).order_by(Transaction.transaction_date.desc(), Transaction.id.desc()).limit(page_size).all()
+        return {
+            'items': items,
+            'next_cursor': self._page_cursor('next', items[-1]) if offset + len(items) < total else None,
+            'prev_cursor': self._page_cursor('prev', items[0]) if offset > 0 else None,
+            'offset': offset
+        }
+    
+    def count_transactions(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Conta as transações que atendem aos filtros de list_transactions"""
+        return self.session.query(func.count(Transaction.id)).filter(
+            *self._filter_conditions(filters)
+        ).scalar() or 0
+    
+    def _page_cursor(self, direction: str, transaction: Transaction) -> str:
+        """Cursor opaco apontando para a transação de borda de uma página"""
+        return encode_cursor([direction, transaction.transaction_date.isoformat(), transaction.id])
+    
+    def _filter_conditions(self, filters: Optional[Dict[str, Any]]) -> List[Any]:
+        """Converte o dicionário de filtros em condições SQL"""
+        filters = {key: value for key, value in (filters or {}).items() if value is not None and value != ''}
+        conditions = []
+        
+        if 'month' in filters and 'year' in filters:
+            conditions.append(period_filter(filters['month'], filters['year']))
+        if 'start' in filters or 'end' in filters:
+            conditions.append(date_range_filter(filters.get('start'), filters.get('end')))
+        if 'category_id' in filters:
+            conditions.append(Transaction.category_id == filters['category_id'])
+        if 'type' in filters:
+            conditions.append(Transaction.type == filters['type'])
+        if 'payment_method' in filters:
+            conditions.append(Transaction.payment_method == filters['payment_method'])
+        if 'min_amount' in filters:
+            conditions.append(Transaction.amount >= filters['min_amount'])
+        if 'max_amount' in filters:
+            conditions.append(Transaction.amount <= filters['max_amount'])
+        if 'tag' in filters:
+            names = FinancialValidators.validate_tags([filters['tag']])
+            conditions.append(Transaction.id.in_(
+                select(transaction_tags.c.transaction_id).join(
+                    Tag, Tag.id == transaction_tags.c.tag_id
+                ).where(Tag.name.in_(names))
+            ))
+        return conditions
+    
     def get_transactions_by_period(self, month: int, year: int) -> List[Transaction]:
         """Retorna transações de um período específico"""
         return self.session.query(Transaction).filter(
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year
+            period_filter(month, year)
+        ).order_by(Transaction.transaction_date.desc()).all()
+    
+    def get_transactions_by_range(self, start: datetime, end: datetime) -> List[Transaction]:
+        """Retorna transações no intervalo semiaberto [start, end)"""
+        return self.session.query(Transaction).filter(
+            date_range_filter(start, end)
         ).order_by(Transaction.transaction_date.desc()).all()
     
     def get_transactions_by_category(self, category_id: int, month: Optional[int] = None, year: Optional[int] = None) -> List[Transaction]:
@@ -72,13 +319,122 @@ class TransactionController:
         query = self.session.query(Transaction).filter(Transaction.category_id == category_id)
         
         if month and year:
-            query = query.filter(
-                extract('month', Transaction.transaction_date) == month,
-                extract('year', Transaction.transaction_date) == year
-            )
+            query = query.filter(period_filter(month, year))
         
         return query.order_by(Transaction.transaction_date.desc()).all()
     
+    def get_transactions_by_tag(self, tag: str, start: Optional[datetime] = None,
+                                end: Optional[datetime] = None) -> List[Transaction]:
+        """Retorna transações com a tag no intervalo [start, end) via índice invertido"""
+        names = FinancialValidators.validate_tags([tag])
+        if not names:
+            return []
+        return self.session.query(Transaction).join(
+            transaction_tags, transaction_tags.c.transaction_id == Transaction.id
+        ).join(
+            Tag, Tag.id == transaction_tags.c.tag_id
+        ).filter(
+            Tag.name == names[0],
+            date_range_filter(start, end)
+        ).order_by(Transaction.transaction_date.desc()).all()
+    
+    def iter_transactions(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                          trans_type: Optional[str] = None, category_id: Optional[int] = None,
+                          payment_method: Optional[str] = None, tag: Optional[str] = None,
+                          batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Percorre as transações do intervalo [start, end) sem carregá-las todas
+        
+        Lê colunas (não entidades) em lotes de `batch_size` com yield_per e
+        resolve a categoria pelo CategoryRegistry; usado pelas exportações.
+        """
+        tag_list = select(func.group_concat(Tag.name, ', ')).select_from(Tag).join(
+            transaction_tags, transaction_tags.c.tag_id == Tag.id
+        ).where(transaction_tags.c.transaction_id == Transaction.id).scalar_subquery()
+        
+        stmt = select(
+            Transaction.id,
+            Transaction.transaction_date,
+            Transaction.description,
+            Transaction.amount,
+            Transaction.type,
+            Transaction.payment_method,
+            Transaction.category_id,
+            Transaction.notes,
+            tag_list.label('tags')
+        ).where(*self._filter_conditions({
+            'start': start,
+            'end': end,
+            'type': trans_type,
+            'category_id': category_id,
+            'payment_method': payment_method,
+            'tag': tag
+        }))
+        
+        stmt = stmt.order_by(Transaction.transaction_date, Transaction.id).execution_options(yield_per=batch_size)
+        for row in self.session.execute(stmt):
+            category = CategoryRegistry.get(row.category_id)
+            yield {
+                'id': row.id,
+                'transaction_date': row.transaction_date,
+                'description': row.description,
+                'amount': row.amount,
+                'type': row.type,
+                'payment_method': row.payment_method,
+                'category_name': category.name,
+                'tags': row.tags or '',
+                'notes': row.notes or ''
+            }
+    
+    def get_all_tags(self) -> List[Tag]:
+        """Retorna todas as tags cadastradas"""
+        return self.session.query(Tag).order_by(Tag.name).all()
+    
+    def search(self, query: str, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Busca textual em descrição, notas e categoria
+        
+        Usa o índice FTS5 com prefixos e ranking BM25. Retorna
+        {'items': [...], 'next_cursor': str ou None}; passe o cursor para
+        obter a próxima página.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        connection = self.session.connection()
+        
+        if not fts5_available(connection):
+            return self._search_like(query, limit, after)
+        
+        hits = search_transaction_ids(connection, query, limit + 1, tuple(after) if after else None)
+        has_more = len(hits) > limit
+        hits = hits[:limit]
+        
+        ids = [transaction_id for transaction_id, _ in hits]
+        found = {t.id: t for t in self.session.query(Transaction).filter(Transaction.id.in_(ids)).all()} if ids else {}
+        
+        return {
+            'items': [found[transaction_id] for transaction_id in ids if transaction_id in found],
+            'next_cursor': encode_cursor([hits[-1][1], hits[-1][0]]) if has_more else None
+        }
+    
+    def _search_like(self, query: str, limit: int, after: Optional[List[Any]]) -> Dict[str, Any]:
+        """Busca alternativa com LIKE para SQLite sem FTS5 (mais recentes primeiro)"""
+        terms = re.findall(r'\w+', query or '', re.UNICODE)
+        if not terms:
+            return {'items': [], 'next_cursor': None}
+        
+        q = self.session.query(Transaction)
+        for term in terms:
+            pattern = f"%{term}%"
+            q = q.filter(or_(Transaction.description.ilike(pattern), Transaction.notes.ilike(pattern)))
+        if after:
+            q = q.filter(Transaction.id < after[0])
+        
+        items = q.order_by(Transaction.id.desc()).limit(limit + 1).all()
+        has_more = len(items) > limit
+        items = items[:limit]
+        return {
+            'items': items,
+            'next_cursor': encode_cursor([items[-1].id]) if has_more else None
+        }
+    
     def get_transaction_by_id(self, transaction_id: int) -> Optional[Transaction]:
         """Retorna uma transação por ID"""
         return self.session.query(Transaction).filter(Transaction.id == transaction_id).first()
@@ -94,51 +450,114 @@ class TransactionController:
                 kwargs['description'] = FinancialValidators.validate_description(kwargs['description'])
             if 'transaction_date' in kwargs:
                 kwargs['transaction_date'] = FinancialValidators.validate_date(kwargs['transaction_date'])
+            if 'tags' in kwargs:
+                kwargs['tags'] = FinancialValidators.validate_tags(kwargs['tags'])
             
-            for key, value in kwargs.items():
-                if hasattr(transaction, key):
-                    setattr(transaction, key, value)
-            
-            self.session.commit()
+            old_date, old_category_id = transaction.transaction_date, transaction.category_id
+            old_expense = self._expense_delta(transaction, -1)
+            try:
+                if 'tags' in kwargs:
+                    kwargs['tags'] = self._resolve_tags(kwargs['tags'])
+                
+                # Retira os valores antigos do rollup e aplica os novos
+                self._update_rollup(transaction, -1)
+                for key, value in kwargs.items():
+                    if hasattr(transaction, key):
+                        setattr(transaction, key, value)
+                self._update_rollup(transaction, 1)
+                self.session.commit()
+            except Exception:
+                self.session.rollback()
+                raise
             self.session.refresh(transaction)
+            publish_change(TRANSACTION, UPDATED, dates=[old_date, transaction.transaction_date],
+                           category_ids=[old_category_id, transaction.category_id])
+            BudgetAlerts.record(self.session, [old_expense, self._expense_delta(transaction, 1)])
         return transaction
     
     def delete_transaction(self, transaction_id: int) -> bool:
         """Deleta uma transação"""
         transaction = self.get_transaction_by_id(transaction_id)
         if transaction:
-            self.session.delete(transaction)
-            self.session.commit()
+            date, category_id = transaction.transaction_date, transaction.category_id
+            expense = self._expense_delta(transaction, -1)
+            try:
+                self._update_rollup(transaction, -1)
+                self.session.delete(transaction)
+                self.session.commit()
+            except Exception:
+                self.session.rollback()
+                raise
+            publish_change(TRANSACTION, DELETED, dates=[date], category_ids=[category_id])
+            BudgetAlerts.record(self.session, [expense])
             return True
         return False
     
+    def _resolve_tags(self, names: List[str]) -> List[Tag]:
+        """Retorna as tags pelo nome, criando as que ainda não existem"""
+        if not names:
+            return []
+        existing = {tag.name: tag for tag in self.session.query(Tag).filter(Tag.name.in_(names)).all()}
+        tags = []
+        for name in names:
+            tag = existing.get(name)
+            if tag is None:
+                tag = Tag(name=name)
+                self.session.add(tag)
+                existing[name] = tag
+            tags.append(tag)
+        return tags
+    
+    def _update_rollup(self, transaction: Transaction, sign: int):
+        """Aplica (sign=1) ou retira (sign=-1) a transação do rollup mensal"""
+        apply_rollup_delta(
+            self.session,
+            transaction.transaction_date,
+            transaction.category_id,
+            transaction.type,
+            transaction.payment_method,
+            transaction.amount * sign,
+            sign
+        )
+    
+    @staticmethod
+    def _expense_delta(transaction: Transaction, sign: int) -> Optional[Tuple[int, int, int, Any]]:
+        """Variação de gasto (categoria, ano, mês, valor) para BudgetAlerts; None se não for despesa"""
+        if transaction.type != TransactionType.EXPENSE.value:
+            return None
+        date = transaction.transaction_date
+        return transaction.category_id, date.year, date.month, transaction.amount * sign
+    
     def get_monthly_summary(self, month: int, year: int) -> Dict[str, float]:
         """Retorna resumo mensal (total de entradas, saídas e saldo)"""
-        transactions = self.get_transactions_by_period(month, year)
+        income_code = rollup_type_code(TransactionType.INCOME)
+        expense_code = rollup_type_code(TransactionType.EXPENSE)
         
-        income = sum(t.amount for t in transactions if t.type == 'income')
-        expenses = sum(t.amount for t in transactions if t.type == 'expense')
-        balance = income - expenses
+        row = self.session.query(
+            func.sum(case((MonthlyRollup.type == income_code, MonthlyRollup.total), else_=0)).label('income'),
+            func.sum(case((MonthlyRollup.type == expense_code, MonthlyRollup.total), else_=0)).label('expenses'),
+            func.sum(MonthlyRollup.count).label('count')
+        ).filter(rollup_period_filter(month, year)).one()
+        
+        income = row.income or 0
+        expenses = row.expenses or 0
         
         return {
             'income': income,
             'expenses': expenses,
-            'balance': balance,
-            'count': len(transactions)
+            'balance': income - expenses,
+            'count': row.count or 0
         }
     
     def get_expenses_by_category(self, month: int, year: int) -> List[Dict[str, Any]]:
         """Retorna gastos por categoria no período"""
         result = self.session.query(
-            Transaction.category_id,
-            func.sum(Transaction.amount).label('total')
+            MonthlyRollup.category_id,
+            func.sum(MonthlyRollup.total).label('total')
         ).filter(
-            and_(
-                extract('month', Transaction.transaction_date) == month,
-                extract('year', Transaction.transaction_date) == year,
-                Transaction.type == 'expense'
-            )
-        ).group_by(Transaction.category_id).all()
+            rollup_period_filter(month, year),
+            MonthlyRollup.type == rollup_type_code(TransactionType.EXPENSE)
+        ).group_by(MonthlyRollup.category_id).all()
         
         return [{'category_id': r.category_id, 'total': r.total} for r in result]
     
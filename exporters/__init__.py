@@ -0,0 +1,26 @@
+from .csv_exporter import export_transactions_csv
+from typing import Any, Dict, Optional, Tuple
+import os
+
+def export_file(path: str, filters: Optional[Dict[str, Any]] = None,
+                report_period: Optional[Tuple[int, int]] = None) -> int:
+    """Exporta transações para CSV ou XLSX conforme a extensão de `path`
+    
+    As abas de relatório (`report_period`) só existem no XLSX.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return export_transactions_csv(path, filters)
+    if extension == '.xlsx':
+        from .xlsx_exporter import export_transactions_xlsx
+        return export_transactions_xlsx(path, filters, report_period)
+    raise ValueError(f"Formato de exportação não suportado: {extension}")
+
+def __getattr__(name):
+    # O exportador XLSX (openpyxl) só é importado quando usado
+    if name == 'export_transactions_xlsx':
+        from .xlsx_exporter import export_transactions_xlsx
+        return export_transactions_xlsx
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ['export_transactions_csv', 'export_transactions_xlsx', 'export_file']
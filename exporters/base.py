@@ -0,0 +1,38 @@
+from controllers import TransactionController
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List
+
+# Colunas exportadas, na ordem em que aparecem no arquivo
+TRANSACTION_HEADERS = ['Data', 'Descrição', 'Valor', 'Tipo', 'Categoria', 'Método de Pagamento', 'Tags', 'Notas']
+
+TYPE_LABELS = {
+    'income': 'Receita',
+    'expense': 'Despesa',
+    'transfer': 'Transferência',
+}
+
+def signed_amount(transaction: Dict[str, Any]) -> Decimal:
+    """Valor com sinal: despesas negativas, demais positivas"""
+    amount = transaction['amount']
+    return -amount if transaction['type'] == 'expense' else amount
+
+def transaction_values(transaction: Dict[str, Any]) -> List[Any]:
+    """Valores de uma linha exportada, na ordem de TRANSACTION_HEADERS"""
+    return [
+        transaction['transaction_date'],
+        transaction['description'],
+        signed_amount(transaction),
+        TYPE_LABELS.get(transaction['type'], transaction['type']),
+        transaction['category_name'],
+        transaction['payment_method'] or '',
+        transaction['tags'],
+        transaction['notes'],
+    ]
+
+def iter_transactions(controller: TransactionController, filters: Dict[str, Any],
+                      batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Transações filtradas em streaming (ver TransactionController.iter_transactions)
+    
+    `filters` aceita start, end, trans_type, category_id, payment_method e tag.
+    """
+    return controller.iter_transactions(batch_size=batch_size, **(filters or {}))
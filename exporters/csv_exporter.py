@@ -0,0 +1,30 @@
+from controllers import TransactionController
+from .base import TRANSACTION_HEADERS, iter_transactions, transaction_values
+from typing import Any, Dict, Optional
+import csv
+
+def export_transactions_csv(path: str, filters: Optional[Dict[str, Any]] = None,
+                            controller: Optional[TransactionController] = None) -> int:
+    """Exporta transações para CSV no layout brasileiro e retorna o total de linhas
+    
+    Usa ';' como separador, datas DD/MM/AAAA e vírgula decimal, o mesmo
+    formato do preset 'padrao' do importador. A codificação UTF-8 com BOM
+    permite abrir o arquivo direto no Excel.
+    """
+    owns_controller = controller is None
+    controller = controller or TransactionController()
+    count = 0
+    try:
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(TRANSACTION_HEADERS)
+            for transaction in iter_transactions(controller, filters):
+                values = transaction_values(transaction)
+                values[0] = values[0].strftime('%d/%m/%Y')
+                values[2] = f"{values[2]:.2f}".replace('.', ',')
+                writer.writerow(values)
+                count += 1
+    finally:
+        if owns_controller:
+            controller.close()
+    return count
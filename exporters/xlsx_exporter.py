@@ -0,0 +1,91 @@
+from controllers import TransactionController, ReportController
+from .base import TRANSACTION_HEADERS, iter_transactions, transaction_values
+from utils import get_month_name
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from typing import Any, Dict, List, Optional, Tuple
+
+DATE_FORMAT = 'DD/MM/YYYY'
+MONEY_FORMAT = '#,##0.00'
+PERCENT_FORMAT = '0.0"%"'
+
+def export_transactions_xlsx(path: str, filters: Optional[Dict[str, Any]] = None,
+                             report_period: Optional[Tuple[int, int]] = None,
+                             controller: Optional[TransactionController] = None) -> int:
+    """Exporta transações para XLSX e retorna o total de linhas
+    
+    A planilha é gerada em modo write-only do openpyxl e as linhas vêm do
+    banco em lotes, então a memória não cresce com o tamanho do histórico.
+    Com `report_period=(mês, ano)` são adicionadas abas com os relatórios
+    do ReportController para o período.
+    """
+    owns_controller = controller is None
+    controller = controller or TransactionController()
+    workbook = Workbook(write_only=True)
+    count = 0
+    try:
+        sheet = workbook.create_sheet('Transações')
+        sheet.append(TRANSACTION_HEADERS)
+        for transaction in iter_transactions(controller, filters):
+            values = transaction_values(transaction)
+            values[0] = _cell(sheet, values[0], DATE_FORMAT)
+            values[2] = _cell(sheet, values[2], MONEY_FORMAT)
+            sheet.append(values)
+            count += 1
+        
+        if report_period:
+            _append_report_sheets(workbook, *report_period)
+        
+        workbook.save(path)
+    finally:
+        if owns_controller:
+            controller.close()
+    return count
+
+def _cell(sheet, value: Any, number_format: str):
+    """Célula write-only com formato numérico"""
+    cell = WriteOnlyCell(sheet, value=value)
+    cell.number_format = number_format
+    return cell
+
+def _append_sheet(workbook, title: str, headers: List[str], rows: List[List[Any]],
+                  formats: Dict[int, str]):
+    """Cria uma aba com cabeçalho e linhas, aplicando formatos por coluna"""
+    sheet = workbook.create_sheet(title)
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([_cell(sheet, value, formats[i]) if i in formats else value
+                      for i, value in enumerate(row)])
+
+def _append_report_sheets(workbook, month: int, year: int):
+    """Adiciona as abas de relatório do período"""
+    report_controller = ReportController()
+    try:
+        period = f"{get_month_name(month)} {year}"
+        
+        _append_sheet(workbook, 'Categorias', ['Categoria', 'Total', 'Transações', '% das Despesas'], [
+            [c['name'], c['total'], c['count'], round(float(c['percentage']), 1)]
+            for c in report_controller.get_category_breakdown(month, year)
+        ], {1: MONEY_FORMAT, 3: PERCENT_FORMAT})
+        
+        _append_sheet(workbook, 'Métodos de Pagamento', ['Método', 'Total', 'Transações'], [
+            [m['method'], m['total'], m['count']]
+            for m in report_controller.get_payment_method_breakdown(month, year)
+        ], {1: MONEY_FORMAT})
+        
+        _append_sheet(workbook, 'Evolução Mensal', ['Mês', 'Receitas', 'Despesas', 'Saldo'], [
+            [f"{e['month']:02d}/{e['year']}", e['income'], e['expenses'], e['balance']]
+            for e in report_controller.get_monthly_evolution(year, month=month)
+        ], {1: MONEY_FORMAT, 2: MONEY_FORMAT, 3: MONEY_FORMAT})
+        
+        _append_sheet(workbook, 'Maiores Despesas', ['Descrição', 'Categoria', 'Valor', 'Data'], [
+            [t['description'], t['category_name'], t['amount'], t['transaction_date'][:10]]
+            for t in report_controller.get_top_expenses(month, year, limit=10)
+        ], {2: MONEY_FORMAT})
+        
+        summary = report_controller.get_dashboard_metrics(month, year)
+        _append_sheet(workbook, 'Resumo', ['Período', 'Receitas', 'Despesas', 'Saldo', 'Transações'], [
+            [period, summary['income'], summary['expenses'], summary['balance'], summary['transaction_count']]
+        ], {1: MONEY_FORMAT, 2: MONEY_FORMAT, 3: MONEY_FORMAT})
+    finally:
+        report_controller.close()
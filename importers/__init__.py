@@ -0,0 +1,29 @@
+from .base import CategoryMapper, parse_amount, run_import
+from .csv_importer import CSVFormat, CSVImporter, CSV_PRESETS, detect_csv_preset
+from .ofx_importer import OFXImporter
+from typing import Any, Callable, Dict, Optional
+import os
+
+def import_file(path: str, file_format: Optional[str] = None, preset: Optional[str] = None,
+                encoding: Optional[str] = None, default_category: str = 'Outros',
+                batch_size: int = 500, progress: Optional[Callable[[int, int, int], None]] = None) -> Dict[str, Any]:
+    """Importa um extrato OFX ou CSV para o banco
+    
+    O formato é deduzido pela extensão quando `file_format` não é informado
+    e o layout do CSV pelo cabeçalho quando `preset` não é informado.
+    Retorna o resultado de run_import().
+    """
+    file_format = (file_format or os.path.splitext(path)[1].lstrip('.')).lower()
+    mapper = CategoryMapper(default_category)
+    
+    if file_format in ('ofx', 'qfx'):
+        importer = OFXImporter(mapper, encoding)
+    elif file_format in ('csv', 'txt'):
+        importer = CSVImporter(preset or detect_csv_preset(path, encoding), mapper, encoding)
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {file_format}")
+    
+    return run_import(importer.iter_transactions(path), batch_size=batch_size, progress=progress)
+
+__all__ = ['CategoryMapper', 'parse_amount', 'run_import', 'CSVFormat', 'CSVImporter', 'CSV_PRESETS',
+           'detect_csv_preset', 'OFXImporter', 'import_file']
@@ -0,0 +1,53 @@
+"""
+Importação de extratos sem interface gráfica
+
+Uso: python -m importers extrato.ofx
+     python -m importers extrato.csv --preset nubank_cartao
+"""
+
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import init_db
+from importers import import_file, CSV_PRESETS
+
+def parse_args():
+    """Lê os argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(prog='python -m importers',
+                                     description="Importa extratos bancários OFX ou CSV")
+    parser.add_argument('path', help="arquivo .ofx ou .csv")
+    parser.add_argument('--format', choices=['ofx', 'csv'],
+                        help="formato do arquivo (padrão: deduzido pela extensão)")
+    parser.add_argument('--preset', choices=sorted(CSV_PRESETS),
+                        help="layout do CSV (padrão: detectado pelo cabeçalho)")
+    parser.add_argument('--encoding', help="codificação do arquivo (padrão: detectada)")
+    parser.add_argument('--default-category', default='Outros',
+                        help="categoria usada quando nenhuma regra se aplica")
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help="transações gravadas por commit (padrão: %(default)s)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    init_db()
+    
+    def progress(processed, inserted, failed):
+        print(f"\r{processed} linhas processadas, {inserted} importadas, {failed} com erro", end='', flush=True)
+    
+    try:
+        result = import_file(args.path, args.format, args.preset, args.encoding,
+                             args.default_category, args.batch_size, progress)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao importar: {e}")
+        sys.exit(1)
+    
+    print()
+    for failure in result['failed']:
+        print(f"Linha {failure['index'] + 1}: {failure['error']}")
+    print(f"Importação concluída: {result['inserted']} de {result['processed']} transações")
+
+if __name__ == "__main__":
+    main()
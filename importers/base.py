@@ -0,0 +1,178 @@
+from controllers import TransactionController, CategoryRegistry
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import io
+import re
+import unicodedata
+
+# Palavras-chave (sem acento, minúsculas) -> nome da categoria
+DEFAULT_CATEGORY_RULES = {
+    'ifood': 'Alimentação',
+    'restaurante': 'Alimentação',
+    'padaria': 'Alimentação',
+    'mercado': 'Alimentação',
+    'supermercado': 'Alimentação',
+    'uber': 'Transporte',
+    'posto': 'Transporte',
+    'combustivel': 'Transporte',
+    'estacionamento': 'Transporte',
+    'aluguel': 'Moradia',
+    'condominio': 'Moradia',
+    'energia': 'Moradia',
+    'farmacia': 'Saúde',
+    'drogaria': 'Saúde',
+    'hospital': 'Saúde',
+    'escola': 'Educação',
+    'curso': 'Educação',
+    'netflix': 'Lazer',
+    'spotify': 'Lazer',
+    'cinema': 'Lazer',
+    'salario': 'Salário',
+}
+
+# Tamanho da amostra usada para detectar a codificação do arquivo
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+def normalize_text(text: str) -> str:
+    """Minúsculas e sem acentos, para comparar cabeçalhos e palavras-chave"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).strip().lower()
+
+def detect_encoding(path: str) -> str:
+    """Detecta UTF-8 (com ou sem BOM); caso contrário assume Windows-1252"""
+    with open(path, 'rb') as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Um caractere multibyte cortado no fim da amostra não invalida o UTF-8
+        if e.start < len(sample) - 3:
+            return 'cp1252'
+    return 'utf-8-sig'
+
+def open_text(path: str, encoding: Optional[str] = None) -> io.TextIOWrapper:
+    """Abre o arquivo para leitura em streaming (linha a linha)"""
+    return open(path, 'r', encoding=encoding or detect_encoding(path), newline='')
+
+def parse_amount(text: Any, decimal_separator: Optional[str] = None) -> Decimal:
+    """Converte texto de valor ('-1.234,56', 'R$ 10,00', '(5.00)') para Decimal
+    
+    Sem `decimal_separator`, o separador mais à direita é tratado como decimal.
+    """
+    if isinstance(text, Decimal):
+        return text
+    value = str(text or '').strip().replace('R$', '').replace(' ', '').replace('\xa0', '')
+    negative = value.startswith('(') and value.endswith(')')
+    value = value.strip('()')
+    if value.endswith('-'):
+        # Alguns extratos usam o sinal no fim: '150,00-'
+        negative, value = True, value[:-1]
+    
+    if decimal_separator is None:
+        decimal_separator = ',' if value.rfind(',') > value.rfind('.') else '.'
+    thousands_separator = '.' if decimal_separator == ',' else ','
+    value = value.replace(thousands_separator, '').replace(decimal_separator, '.')
+    
+    try:
+        amount = Decimal(value)
+    except InvalidOperation as e:
+        raise ValueError(f"Valor inválido: {text}") from e
+    return -amount if negative else amount
+
+class CategoryMapper:
+    """Resolve a categoria de uma linha importada
+    
+    Ordem: nome de categoria presente no arquivo, palavras-chave na
+    descrição e, por fim, a categoria padrão.
+    """
+    
+    def __init__(self, default_category: str = 'Outros', rules: Optional[Dict[str, str]] = None):
+        self.default_category = default_category
+        self.rules = {normalize_text(k): v for k, v in (rules or DEFAULT_CATEGORY_RULES).items()}
+    
+    def category_id(self, description: str, category_name: Optional[str] = None) -> Optional[int]:
+        """Retorna o ID da categoria (ou None se nem a padrão existir)"""
+        if category_name:
+            category = CategoryRegistry.find_by_name(category_name)
+            if category:
+                return category.id
+        
+        words = set(re.findall(r'\w+', normalize_text(description)))
+        for keyword, name in self.rules.items():
+            if keyword in words:
+                category = CategoryRegistry.find_by_name(name)
+                if category:
+                    return category.id
+        
+        category = CategoryRegistry.find_by_name(self.default_category)
+        return category.id if category else None
+
+def build_transaction(amount: Any, description: str, transaction_date: Any, mapper: CategoryMapper,
+                      payment_method: str = 'Outro', category_name: Optional[str] = None,
+                      notes: str = '') -> Dict[str, Any]:
+    """Monta os dados da transação no formato de TransactionController
+    
+    Valores negativos viram despesas e positivos viram receitas; descrições
+    com "PIX" usam esse método de pagamento. Erros de
+    conversão não são levantados aqui: o valor bruto segue adiante e a
+    linha é rejeitada pelos FinancialValidators na inserção em lote.
+    """
+    description = (description or '').strip()[:200]
+    if 'pix' in re.findall(r'\w+', description.lower()):
+        payment_method = 'PIX'
+    trans_type = 'expense'
+    try:
+        amount = parse_amount(amount) if not isinstance(amount, Decimal) else amount
+        if amount > 0:
+            trans_type = 'income'
+        amount = abs(amount)
+    except ValueError:
+        pass
+    
+    return {
+        'amount': amount,
+        'description': description,
+        'category_id': mapper.category_id(description, category_name),
+        'transaction_date': transaction_date,
+        'type': trans_type,
+        'payment_method': payment_method,
+        'notes': notes
+    }
+
+def run_import(transactions: Iterable[Dict[str, Any]], controller: Optional[TransactionController] = None,
+               batch_size: int = 500, progress: Optional[Callable[[int, int, int], None]] = None) -> Dict[str, Any]:
+    """Grava as transações em lotes via add_transactions_bulk
+    
+    `progress(processadas, inseridas, falhas)` é chamado após cada lote.
+    Retorna {'processed', 'inserted', 'failed'}, com 'failed' indexado pela
+    posição da linha no arquivo (registros de dados, a partir de 0).
+    """
+    owns_controller = controller is None
+    controller = controller or TransactionController()
+    result = {'processed': 0, 'inserted': 0, 'failed': []}
+    
+    try:
+        for chunk in _chunks(transactions, batch_size):
+            batch_result = controller.add_transactions_bulk(chunk, batch_size=len(chunk))
+            for failure in batch_result['failed']:
+                result['failed'].append({'index': result['processed'] + failure['index'],
+                                         'error': failure['error']})
+            result['processed'] += len(chunk)
+            result['inserted'] += batch_result['inserted']
+            if progress:
+                progress(result['processed'], result['inserted'], len(result['failed']))
+    finally:
+        if owns_controller:
+            controller.close()
+    return result
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Agrupa um iterável em listas de até `size` itens sem materializá-lo"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,167 @@
+from .base import CategoryMapper, build_transaction, normalize_text, open_text, parse_amount
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+import csv
+
+# Linhas lidas à procura do cabeçalho (extratos costumam ter linhas de título)
+HEADER_SEARCH_LINES = 50
+
+Column = Union[str, Sequence[str]]
+
+class CSVFormat:
+    """Descrição de um layout de CSV de extrato bancário
+    
+    Colunas são nomes do cabeçalho (sem diferenciar maiúsculas e acentos);
+    uma sequência indica nomes alternativos. Use `amount` para valor com
+    sinal ou `credit`/`debit` para colunas separadas.
+    """
+    
+    def __init__(self, date: Column, description: Column, amount: Optional[Column] = None,
+                 credit: Optional[Column] = None, debit: Optional[Column] = None,
+                 category: Optional[Column] = None, delimiter: str = ';',
+                 date_format: str = '%d/%m/%Y', decimal_separator: str = ',',
+                 invert_sign: bool = False, payment_method: str = 'Outro'):
+        if amount is None and credit is None and debit is None:
+            raise ValueError("Informe a coluna de valor ou as colunas de crédito/débito")
+        self.date = date
+        self.description = description
+        self.amount = amount
+        self.credit = credit
+        self.debit = debit
+        self.category = category
+        self.delimiter = delimiter
+        self.date_format = date_format
+        self.decimal_separator = decimal_separator
+        self.invert_sign = invert_sign
+        self.payment_method = payment_method
+
+CSV_PRESETS: Dict[str, CSVFormat] = {
+    # Layout genérico de bancos brasileiros: Data;Descrição;Valor
+    'padrao': CSVFormat(
+        date=('data', 'data lancamento', 'data do lancamento'),
+        description=('descricao', 'historico', 'lancamento'),
+        amount=('valor', 'valor (r$)'),
+        category='categoria'
+    ),
+    # Colunas separadas de crédito e débito
+    'credito_debito': CSVFormat(
+        date=('data', 'data lancamento'),
+        description=('descricao', 'historico', 'lancamento'),
+        credit=('credito', 'credito (r$)'),
+        debit=('debito', 'debito (r$)')
+    ),
+    # Fatura do cartão Nubank: date,title,amount (compras positivas)
+    'nubank_cartao': CSVFormat(
+        date='date', description='title', amount='amount', category='category',
+        delimiter=',', date_format='%Y-%m-%d', decimal_separator='.',
+        invert_sign=True, payment_method='Cartão de Crédito'
+    ),
+    # Extrato da conta Nubank: Data,Valor,Identificador,Descrição
+    'nubank_conta': CSVFormat(
+        date='data', description='descricao', amount='valor',
+        delimiter=',', decimal_separator='.'
+    ),
+    # Exportação do Controle Financeiro / planilhas em formato internacional
+    'internacional': CSVFormat(
+        date=('date', 'transaction_date'), description='description', amount='amount',
+        category=('category', 'category_name'), delimiter=',', date_format='%Y-%m-%d',
+        decimal_separator='.'
+    ),
+}
+
+def detect_csv_preset(path: str, encoding: Optional[str] = None) -> str:
+    """Retorna o primeiro preset cujo cabeçalho é encontrado no arquivo"""
+    for name, csv_format in CSV_PRESETS.items():
+        importer = CSVImporter(csv_format, encoding=encoding)
+        try:
+            with open_text(path, encoding) as f:
+                importer._find_header(csv.reader(f, delimiter=csv_format.delimiter))
+            return name
+        except ValueError:
+            continue
+    raise ValueError("Formato do CSV não reconhecido; informe o preset")
+
+class CSVImporter:
+    """Lê extratos CSV em streaming, uma linha por vez"""
+    
+    def __init__(self, csv_format: Union[str, CSVFormat] = 'padrao',
+                 mapper: Optional[CategoryMapper] = None, encoding: Optional[str] = None):
+        if isinstance(csv_format, str):
+            if csv_format not in CSV_PRESETS:
+                raise ValueError(f"Formato CSV desconhecido: {csv_format}")
+            csv_format = CSV_PRESETS[csv_format]
+        self.format = csv_format
+        self.mapper = mapper or CategoryMapper()
+        self.encoding = encoding
+    
+    def iter_transactions(self, path: str) -> Iterator[Dict[str, Any]]:
+        """Gera os dados de cada transação do arquivo"""
+        fmt = self.format
+        with open_text(path, self.encoding) as f:
+            reader = csv.reader(f, delimiter=fmt.delimiter)
+            columns = self._find_header(reader)
+            
+            for row in reader:
+                if not any(cell.strip() for cell in row):
+                    continue
+                
+                yield build_transaction(
+                    amount=self._amount(row, columns),
+                    description=self._cell(row, columns.get('description')),
+                    transaction_date=self._date(self._cell(row, columns.get('date'))),
+                    mapper=self.mapper,
+                    payment_method=fmt.payment_method,
+                    category_name=self._cell(row, columns.get('category')) or None
+                )
+    
+    def _find_header(self, reader) -> Dict[str, int]:
+        """Avança o leitor até o cabeçalho e retorna campo -> índice da coluna"""
+        fields = {name: getattr(self.format, name)
+                  for name in ('date', 'description', 'amount', 'credit', 'debit', 'category')
+                  if getattr(self.format, name) is not None}
+        
+        for _ in range(HEADER_SEARCH_LINES):
+            row = next(reader, None)
+            if row is None:
+                break
+            header = [normalize_text(cell) for cell in row]
+            columns = {}
+            for name, aliases in fields.items():
+                aliases = [aliases] if isinstance(aliases, str) else aliases
+                for alias in aliases:
+                    if normalize_text(alias) in header:
+                        columns[name] = header.index(normalize_text(alias))
+                        break
+            if 'date' in columns and 'description' in columns and (
+                    'amount' in columns or 'credit' in columns or 'debit' in columns):
+                return columns
+        
+        raise ValueError("Cabeçalho do CSV não encontrado para o formato selecionado")
+    
+    def _cell(self, row: List[str], index: Optional[int]) -> str:
+        if index is None or index >= len(row):
+            return ''
+        return row[index].strip()
+    
+    def _amount(self, row: List[str], columns: Dict[str, int]) -> Any:
+        """Valor com sinal (negativo = despesa) ou o texto bruto se inválido"""
+        fmt = self.format
+        try:
+            if 'amount' in columns:
+                raw = self._cell(row, columns['amount'])
+                amount = parse_amount(raw, fmt.decimal_separator)
+            else:
+                credit = self._cell(row, columns.get('credit'))
+                debit = self._cell(row, columns.get('debit'))
+                raw = credit or debit
+                amount = abs(parse_amount(credit, fmt.decimal_separator)) if credit else \
+                    -abs(parse_amount(debit, fmt.decimal_separator))
+        except ValueError:
+            return raw
+        return -amount if fmt.invert_sign else amount
+    
+    def _date(self, text: str) -> Any:
+        try:
+            return datetime.strptime(text, self.format.date_format)
+        except ValueError:
+            return text
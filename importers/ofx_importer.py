@@ -0,0 +1,62 @@
+from .base import CategoryMapper, build_transaction, open_text
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+import re
+
+# Funciona para OFX 1.x (SGML, sem tags de fechamento) e 2.x (XML)
+_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+# TRNTYPE do OFX -> método de pagamento
+OFX_PAYMENT_METHODS = {
+    'CASH': 'Dinheiro',
+    'ATM': 'Dinheiro',
+    'POS': 'Cartão de Débito',
+    'XFER': 'Transferência Bancária',
+    'DIRECTDEP': 'Transferência Bancária',
+    'DIRECTDEBIT': 'Transferência Bancária',
+}
+
+class OFXImporter:
+    """Lê extratos OFX em streaming, um bloco <STMTTRN> por vez"""
+    
+    def __init__(self, mapper: Optional[CategoryMapper] = None, encoding: Optional[str] = None):
+        self.mapper = mapper or CategoryMapper()
+        self.encoding = encoding
+    
+    def iter_transactions(self, path: str) -> Iterator[Dict[str, Any]]:
+        """Gera os dados de cada transação do arquivo"""
+        with open_text(path, self.encoding) as f:
+            for fields in self._iter_statement_blocks(f):
+                description = fields.get('MEMO') or fields.get('NAME') or ''
+                yield build_transaction(
+                    amount=fields.get('TRNAMT', ''),
+                    description=description,
+                    transaction_date=self._date(fields.get('DTPOSTED', '')),
+                    mapper=self.mapper,
+                    payment_method=OFX_PAYMENT_METHODS.get(fields.get('TRNTYPE', '').upper(), 'Outro'),
+                    notes=f"OFX FITID {fields['FITID']}" if fields.get('FITID') else ''
+                )
+    
+    def _iter_statement_blocks(self, f) -> Iterator[Dict[str, str]]:
+        """Percorre as linhas e gera os campos de cada <STMTTRN>"""
+        current = None
+        for line in f:
+            for closing, tag, value in _TAG.findall(line):
+                tag = tag.upper()
+                if tag == 'STMTTRN':
+                    if closing:
+                        if current is not None:
+                            yield current
+                        current = None
+                    else:
+                        current = {}
+                elif current is not None and not closing and value.strip():
+                    current[tag] = value.strip()
+    
+    def _date(self, text: str) -> Any:
+        """DTPOSTED no formato AAAAMMDD[HHMMSS[.XXX]][fuso]"""
+        try:
+            return datetime.strptime(text[:8], '%Y%m%d')
+        except ValueError:
+            return text
+
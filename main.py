@@ -4,26 +4,51 @@ Aplicação de Controle Financeiro Pessoal
 Desenvolvida com Python, CustomTkinter e SQLAlchemy
 """
 
+import argparse
 import sys
 import os
 
 # Adicionar diretório raiz ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from models import init_db
-from views import MainWindow
+from utils.startup import StartupProfiler
+
+def parse_args():
+    """Lê os argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(description="Controle Financeiro Pessoal")
+    parser.add_argument('--rebuild-rollup', action='store_true',
+                        help="recalcula os totais mensais (monthly_rollup) e sai")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="mostra o tempo de cada fase da inicialização e das importações")
+    return parser.parse_args()
 
 def main():
     """Função principal da aplicação"""
+    args = parse_args()
+    profiler = StartupProfiler(enabled=args.profile_startup)
     try:
+        with profiler.phase("Importar models"):
+            from models import init_db, rebuild_rollup
+        
         # Inicializar banco de dados
         print("Inicializando banco de dados...")
-        init_db()
+        with profiler.phase("Inicializar banco"):
+            init_db()
         print("Banco de dados inicializado com sucesso!")
         
+        if args.rebuild_rollup:
+            print("Recalculando totais mensais...")
+            rebuild_rollup()
+            print("Totais mensais recalculados com sucesso!")
+            return
+        
         # Criar e executar aplicação
         print("Iniciando aplicação...")
-        app = MainWindow()
+        with profiler.phase("Importar janela principal"):
+            from views import MainWindow
+        with profiler.phase("Criar janela e dashboard"):
+            app = MainWindow()
+        app.after_idle(profiler.finish)
         app.run()
         
     except Exception as e:
@@ -1,6 +1,13 @@
-from .database import Base, get_session, init_db
+from .database import Base, get_session, init_db, rebuild_rollup
 from .categories import Category
 from .transactions import Transaction, TransactionType, PaymentMethod
 from .budgets import Budget
+from .tags import Tag, transaction_tags
+from .rollups import MonthlyRollup
+from .periods import (month_bounds, date_range_filter, period_filter, add_months, bucket_start,
+                      next_bucket, iter_buckets, GRANULARITIES)
 
-__all__ = ['Base', 'get_session', 'init_db', 'Category', 'Transaction', 'TransactionType', 'PaymentMethod', 'Budget']
+__all__ = ['Base', 'get_session', 'init_db', 'rebuild_rollup', 'Category', 'Transaction', 'TransactionType', 'PaymentMethod',
+           'Budget', 'Tag', 'transaction_tags', 'MonthlyRollup',
+           'month_bounds', 'date_range_filter', 'period_filter', 'add_months', 'bucket_start',
+           'next_bucket', 'iter_buckets', 'GRANULARITIES']
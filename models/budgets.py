@@ -2,13 +2,14 @@ from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Boo
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
+from .types import Money
 
 class Budget(Base):
     __tablename__ = 'budgets'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)  # centavos
     month = Column(Integer, nullable=False)  # 1-12
     year = Column(Integer, nullable=False)
     alert_threshold = Column(Float, default=0.8)  # 80% do orçamento
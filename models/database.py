@@ -1,6 +1,9 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from typing import Any, Dict
+import json
 import os
 import sys
 
@@ -14,8 +17,101 @@ else:
     # Script Python: salvar DB no diretório do script
     application_path = os.path.dirname(os.path.dirname(__file__))
 
-DATABASE_PATH = os.path.join(application_path, 'financial_data.db')
-engine = create_engine(f'sqlite:///{DATABASE_PATH}', echo=False)
+# Arquivo opcional de configuração do banco (ao lado do financial_data.db)
+CONFIG_PATH = os.path.join(application_path, 'database.json')
+
+# Perfis de engine: pragmas aplicados a cada nova conexão SQLite
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # WAL + synchronous=NORMAL: commits sem fsync completo e leituras
+    # concorrentes com escritas
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,        # ~64 MB (valor negativo = KiB)
+        'mmap_size': 268435456,      # 256 MB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,        # ms
+        'pool_size': 5,
+        'max_overflow': 5,
+    },
+    # Comportamento original do SQLite (journal de rollback, fsync completo)
+    'safe': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+        'pool_size': 5,
+        'max_overflow': 5,
+    },
+}
+DEFAULT_PROFILE = 'performance'
+
+# Backend dos relatórios: consultas SQL ou o ledger colunar em NumPy (analytics)
+DEFAULT_ANALYTICS_BACKEND = 'sql'
+
+PRAGMA_KEYS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+def load_engine_config() -> Dict[str, Any]:
+    """Carrega a configuração do engine
+    
+    Ordem de precedência: variáveis de ambiente > database.json > padrões.
+    - CONTROLE_FINANCEIRO_DB_PROFILE: nome do perfil ('performance' ou 'safe')
+    - CONTROLE_FINANCEIRO_DB_PATH: caminho alternativo do arquivo do banco
+    - CONTROLE_FINANCEIRO_ANALYTICS: backend dos relatórios ('sql' ou 'numpy')
+    O database.json aceita as chaves 'profile', 'path', 'analytics' e
+    'pragmas' (sobrescritas individuais de qualquer chave do perfil).
+    """
+    file_config: Dict[str, Any] = {}
+    if os.path.exists(CONFIG_PATH):
+        try:
+            with open(CONFIG_PATH, encoding='utf-8') as config_file:
+                file_config = json.load(config_file)
+        except (OSError, ValueError) as e:
+            print(f"Aviso: configuração do banco ignorada ({CONFIG_PATH}): {e}")
+    
+    profile_name = os.environ.get('CONTROLE_FINANCEIRO_DB_PROFILE') or file_config.get('profile') or DEFAULT_PROFILE
+    if profile_name not in ENGINE_PROFILES:
+        print(f"Aviso: perfil de banco desconhecido '{profile_name}', usando '{DEFAULT_PROFILE}'")
+        profile_name = DEFAULT_PROFILE
+    
+    config = dict(ENGINE_PROFILES[profile_name])
+    config.update(file_config.get('pragmas', {}))
+    config['profile'] = profile_name
+    config['path'] = (os.environ.get('CONTROLE_FINANCEIRO_DB_PATH') or file_config.get('path')
+                      or os.path.join(application_path, 'financial_data.db'))
+    config['analytics'] = (os.environ.get('CONTROLE_FINANCEIRO_ANALYTICS') or file_config.get('analytics')
+                           or DEFAULT_ANALYTICS_BACKEND)
+    return config
+
+def create_db_engine(config: Dict[str, Any]):
+    """Cria o engine SQLite aplicando os pragmas do perfil em cada conexão"""
+    db_engine = create_engine(
+        f"sqlite:///{config['path']}",
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=config['pool_size'],
+        max_overflow=config['max_overflow'],
+        connect_args={
+            # Conexões do pool podem ser usadas por threads diferentes
+            'check_same_thread': False,
+            'timeout': config['busy_timeout'] / 1000,
+        },
+    )
+    
+    @event.listens_for(db_engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for key in PRAGMA_KEYS:
+            cursor.execute(f"PRAGMA {key}={config[key]}")
+        cursor.close()
+    
+    return db_engine
+
+ENGINE_CONFIG = load_engine_config()
+DATABASE_PATH = ENGINE_CONFIG['path']
+engine = create_db_engine(ENGINE_CONFIG)
 SessionLocal = sessionmaker(bind=engine)
 
 def get_session():
@@ -23,12 +119,36 @@ def get_session():
     return SessionLocal()
 
 def init_db():
-    """Inicializa o banco de dados criando todas as tabelas"""
+    """Inicializa o banco de dados criando todas as tabelas
+    
+    Um banco já na versão atual (PRAGMA user_version) é usado como está,
+    sem DDL nem consultas; por isso toda tabela ou índice novo precisa de
+    uma migração que avance SCHEMA_VERSION.
+    """
     from .categories import Category
     from .transactions import Transaction
     from .budgets import Budget
+    from .tags import Tag
+    from .rollups import MonthlyRollup
+    from .search import create_search_index
+    from .migrations import SCHEMA_VERSION, get_schema_version, upgrade_schema, set_schema_version
+    
+    with engine.connect() as connection:
+        if get_schema_version(connection) == SCHEMA_VERSION:
+            return
+    
+    # Bancos existentes passam pelas migrações antes de criar tabelas novas
+    with engine.begin() as connection:
+        new_database = not inspect(connection).has_table('transactions')
+        if not new_database:
+            upgrade_schema(connection)
     
     Base.metadata.create_all(bind=engine)
+    _ensure_indexes()
+    
+    # Tabela virtual FTS5 e gatilhos não fazem parte do metadata
+    with engine.begin() as connection:
+        create_search_index(connection)
     
     # Inserir categorias padrão se o banco estiver vazio
     session = get_session()
@@ -47,3 +167,26 @@ def init_db():
         session.add_all(default_categories)
         session.commit()
     session.close()
+    
+    # Bancos novos só recebem a versão depois de completos, para que uma
+    # inicialização interrompida seja refeita na próxima abertura
+    if new_database:
+        with engine.begin() as connection:
+            set_schema_version(connection, SCHEMA_VERSION)
+
+def rebuild_rollup():
+    """Recalcula a tabela monthly_rollup a partir das transações"""
+    from .rollups import rebuild_monthly_rollup
+    
+    with engine.begin() as connection:
+        rebuild_monthly_rollup(connection)
+
+def _ensure_indexes():
+    """Cria índices ausentes em bancos já existentes
+    
+    create_all() só cria índices junto com tabelas novas; bancos criados
+    por versões anteriores precisam receber os índices explicitamente.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -0,0 +1,183 @@
+"""Migrações de esquema de bancos criados por versões anteriores
+
+A versão do esquema é guardada em `PRAGMA user_version`. Bancos novos são
+criados direto na versão atual por create_all(); bancos existentes passam
+pelas migrações pendentes, em ordem, dentro de uma única transação.
+"""
+from sqlalchemy import text
+from typing import Callable, Dict
+from utils.validators import FinancialValidators
+import json
+import sqlite3
+from .transactions import PaymentMethod, TRANSACTION_TYPE_CODES, PAYMENT_METHOD_CODES
+
+def _case_codes(column: str, codes, default: str) -> str:
+    """Monta CASE SQL que converte nome ou valor do enum para o código"""
+    whens = []
+    for member, code in codes:
+        whens.append(f"WHEN '{member.value}' THEN {code}")
+        if member.name != member.value:
+            whens.append(f"WHEN '{member.name}' THEN {code}")
+    return f"CASE {column} {' '.join(whens)} ELSE {default} END"
+
+def _drop_table_indexes(connection, table: str):
+    """Remove índices criados explicitamente (vão com a tabela ao renomear)"""
+    for row in connection.execute(text(f"PRAGMA index_list('{table}')")).fetchall():
+        if row[3] == 'c':
+            connection.execute(text(f'DROP INDEX IF EXISTS "{row[1]}"'))
+
+def _migrate_v1_money_and_codes(connection):
+    """v1: valores em centavos inteiros e type/payment_method como códigos"""
+    other_code = dict(PAYMENT_METHOD_CODES)[PaymentMethod.OTHER]
+    
+    connection.execute(text("ALTER TABLE transactions RENAME TO transactions_legacy"))
+    _drop_table_indexes(connection, 'transactions_legacy')
+    connection.execute(text("""
+        CREATE TABLE transactions (
+            id INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            description VARCHAR(200) NOT NULL,
+            category_id INTEGER NOT NULL,
+            transaction_date DATETIME NOT NULL,
+            type SMALLINT NOT NULL,
+            payment_method SMALLINT,
+            tags JSON,
+            notes VARCHAR(500),
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(category_id) REFERENCES categories (id)
+        )
+    """))
+    type_case = _case_codes('type', TRANSACTION_TYPE_CODES, '2')
+    method_case = _case_codes('payment_method', PAYMENT_METHOD_CODES, str(other_code))
+    connection.execute(text(f"""
+        INSERT INTO transactions (id, amount, description, category_id, transaction_date,
+                                  type, payment_method, tags, notes, created_at, updated_at)
+        SELECT id, CAST(ROUND(amount * 100) AS INTEGER), description, category_id, transaction_date,
+               {type_case},
+               CASE WHEN payment_method IS NULL THEN NULL ELSE {method_case} END,
+               tags, notes, created_at, updated_at
+        FROM transactions_legacy
+    """))
+    connection.execute(text("DROP TABLE transactions_legacy"))
+    
+    connection.execute(text("ALTER TABLE budgets RENAME TO budgets_legacy"))
+    _drop_table_indexes(connection, 'budgets_legacy')
+    connection.execute(text("""
+        CREATE TABLE budgets (
+            id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            alert_threshold FLOAT,
+            is_active BOOLEAN,
+            created_at DATETIME,
+            updated_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(category_id) REFERENCES categories (id)
+        )
+    """))
+    connection.execute(text("""
+        INSERT INTO budgets (id, category_id, amount, month, year, alert_threshold,
+                             is_active, created_at, updated_at)
+        SELECT id, category_id, CAST(ROUND(amount * 100) AS INTEGER), month, year, alert_threshold,
+               is_active, created_at, updated_at
+        FROM budgets_legacy
+    """))
+    connection.execute(text("DROP TABLE budgets_legacy"))
+
+def _migrate_v2_monthly_rollup(connection):
+    """v2: tabela monthly_rollup preenchida a partir das transações existentes"""
+    from .rollups import MonthlyRollup, rebuild_monthly_rollup
+    MonthlyRollup.__table__.create(connection, checkfirst=True)
+    rebuild_monthly_rollup(connection)
+
+def _migrate_v3_normalized_tags(connection):
+    """v3: tags da coluna JSON migradas para tags/transaction_tags"""
+    from .tags import Tag, transaction_tags
+    Tag.__table__.create(connection, checkfirst=True)
+    transaction_tags.create(connection, checkfirst=True)
+    
+    columns = [row[1] for row in connection.execute(text("PRAGMA table_info('transactions')")).fetchall()]
+    if 'tags' not in columns:
+        return
+    
+    tag_ids: Dict[str, int] = {}
+    rows = connection.execute(text("SELECT id, tags FROM transactions WHERE tags IS NOT NULL AND tags != '[]'"))
+    links = []
+    for transaction_id, raw_tags in rows.fetchall():
+        try:
+            names = FinancialValidators.validate_tags(json.loads(raw_tags))
+        except ValueError:
+            continue
+        for name in names:
+            if name not in tag_ids:
+                tag_ids[name] = connection.execute(
+                    text("INSERT INTO tags (name, created_at) VALUES (:name, CURRENT_TIMESTAMP)"), {'name': name}
+                ).lastrowid
+            links.append({'tag_id': tag_ids[name], 'transaction_id': transaction_id})
+    if links:
+        connection.execute(
+            text("INSERT OR IGNORE INTO transaction_tags (tag_id, transaction_id) VALUES (:tag_id, :transaction_id)"),
+            links
+        )
+    
+    # DROP COLUMN só existe a partir do SQLite 3.35; em versões antigas a
+    # coluna fica órfã (é anulável e não é mais lida pelo modelo)
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        connection.execute(text("ALTER TABLE transactions DROP COLUMN tags"))
+
+def _migrate_v4_search_index(connection):
+    """v4: índice de busca FTS5 populado com as transações existentes"""
+    from .search import rebuild_search_index
+    rebuild_search_index(connection)
+
+def _create_transaction_index(connection, name: str):
+    """Cria (se ainda não existir) o índice `name` declarado em Transaction"""
+    from .transactions import Transaction
+    index = next(index for index in Transaction.__table__.indexes if index.name == name)
+    index.create(connection, checkfirst=True)
+
+def _migrate_v5_keyset_index(connection):
+    """v5: índice (transaction_date, id) da listagem paginada por chave"""
+    _create_transaction_index(connection, 'ix_transactions_date_id')
+
+def _migrate_v6_updated_at_index(connection):
+    """v6: índice em updated_at para as leituras incrementais do ledger colunar"""
+    _create_transaction_index(connection, 'ix_transactions_updated_at')
+
+# Versão -> função de migração (aplicadas em ordem crescente)
+MIGRATIONS: Dict[int, Callable] = {
+    1: _migrate_v1_money_and_codes,
+    2: _migrate_v2_monthly_rollup,
+    3: _migrate_v3_normalized_tags,
+    4: _migrate_v4_search_index,
+    5: _migrate_v5_keyset_index,
+    6: _migrate_v6_updated_at_index,
+}
+SCHEMA_VERSION = max(MIGRATIONS)
+
+def get_schema_version(connection) -> int:
+    """Retorna a versão de esquema gravada no banco"""
+    return connection.execute(text("PRAGMA user_version")).scalar() or 0
+
+def set_schema_version(connection, version: int):
+    """Grava a versão de esquema no banco"""
+    connection.execute(text(f"PRAGMA user_version = {int(version)}"))
+
+def upgrade_schema(connection):
+    """Aplica as migrações pendentes em um banco existente"""
+    current = get_schema_version(connection)
+    pending = [version for version in sorted(MIGRATIONS) if version > current]
+    if not pending:
+        return
+    
+    # O pysqlite não abre transação para DDL; abrir explicitamente garante
+    # que uma migração interrompida não deixe o banco pela metade
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+    for version in pending:
+        print(f"Migrando banco de dados para a versão {version}...")
+        MIGRATIONS[version](connection)
+        set_schema_version(connection, version)
@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional, Tuple, Union
+from sqlalchemy import and_, true
+
+DateLike = Union[date, datetime]
+
+def _as_datetime(value: DateLike) -> datetime:
+    """Normaliza date/datetime para datetime (meia-noite para datas)"""
+    if isinstance(value, datetime):
+        return value
+    return datetime(value.year, value.month, value.day)
+
+def month_bounds(month: int, year: int) -> Tuple[datetime, datetime]:
+    """Retorna o intervalo semiaberto [início, fim) de um mês"""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+def date_range_filter(start: Optional[DateLike] = None, end: Optional[DateLike] = None, column=None):
+    """Retorna predicado semiaberto `column >= start AND column < end`
+    
+    Ao contrário de extract('month'/'year'), a comparação direta permite
+    que o SQLite use os índices sobre a coluna de data.
+    """
+    if column is None:
+        from .transactions import Transaction
+        column = Transaction.transaction_date
+    
+    conditions = []
+    if start is not None:
+        conditions.append(column >= _as_datetime(start))
+    if end is not None:
+        conditions.append(column < _as_datetime(end))
+    return and_(*conditions) if conditions else true()
+
+def period_filter(month: int, year: int, column=None):
+    """Retorna predicado de data para um mês/ano"""
+    start, end = month_bounds(month, year)
+    return date_range_filter(start, end, column)
+
+# Granularidades aceitas pela agregação em intervalos de tempo
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+
+def add_months(value: DateLike, months: int) -> datetime:
+    """Desloca `value` em N meses, mantendo o dia 1 (início do mês)"""
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+def is_month_start(value: DateLike) -> bool:
+    """Indica se `value` é o primeiro instante de um mês"""
+    value = _as_datetime(value)
+    return value == datetime(value.year, value.month, 1)
+
+def bucket_start(value: DateLike, granularity: str) -> datetime:
+    """Início do intervalo (dia, semana ISO, mês, trimestre, ano) que contém `value`"""
+    value = _as_datetime(value)
+    day = datetime(value.year, value.month, value.day)
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return datetime(value.year, value.month, 1)
+    if granularity == 'quarter':
+        return datetime(value.year, (value.month - 1) // 3 * 3 + 1, 1)
+    if granularity == 'year':
+        return datetime(value.year, 1, 1)
+    raise ValueError(f"Granularidade inválida: {granularity}")
+
+def next_bucket(start: datetime, granularity: str) -> datetime:
+    """Início do intervalo seguinte a `start` (que deve ser um início de intervalo)"""
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(weeks=1)
+    if granularity == 'month':
+        return add_months(start, 1)
+    if granularity == 'quarter':
+        return add_months(start, 3)
+    if granularity == 'year':
+        return datetime(start.year + 1, 1, 1)
+    raise ValueError(f"Granularidade inválida: {granularity}")
+
+def iter_buckets(start: DateLike, end: DateLike, granularity: str) -> Iterator[datetime]:
+    """Gera o início de cada intervalo que intersecta [start, end)"""
+    end = _as_datetime(end)
+    current = bucket_start(start, granularity)
+    while current < end:
+        yield current
+        current = next_bucket(current, granularity)
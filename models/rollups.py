@@ -0,0 +1,110 @@
+from sqlalchemy import Column, Integer, SmallInteger, and_, delete, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Iterable, Optional, Tuple
+from .database import Base
+from .types import Money
+from .transactions import TransactionTypeCode, PaymentMethodCode
+
+# Código usado na chave quando a transação não tem método de pagamento
+UNKNOWN_PAYMENT_METHOD = 0
+
+class MonthlyRollup(Base):
+    """Totais mensais pré-agregados (soma e contagem) por categoria/tipo/método
+    
+    Mantido transacionalmente pelo TransactionController a cada escrita, de
+    modo que relatórios leiam poucas linhas em vez de varrer transactions.
+    """
+    __tablename__ = 'monthly_rollup'
+    
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    type = Column(SmallInteger, primary_key=True)  # código de TransactionType
+    payment_method = Column(SmallInteger, primary_key=True)  # código de PaymentMethod (0 = desconhecido)
+    total = Column(Money, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<MonthlyRollup({self.year}-{self.month:02d}, category_id={self.category_id}, total={self.total})>"
+
+def rollup_type_code(trans_type) -> int:
+    """Código de tipo usado nas chaves do rollup"""
+    return TransactionTypeCode.code_for(trans_type)
+
+def rollup_method_code(payment_method) -> int:
+    """Código de método de pagamento usado nas chaves do rollup"""
+    if payment_method is None:
+        return UNKNOWN_PAYMENT_METHOD
+    return PaymentMethodCode.code_for(payment_method)
+
+def rollup_method_value(code: int) -> Optional[str]:
+    """Converte código do rollup de volta para o valor do método de pagamento"""
+    if code == UNKNOWN_PAYMENT_METHOD:
+        return None
+    return PaymentMethodCode.value_for(code)
+
+def rollup_period_filter(month: int, year: int):
+    """Predicado do rollup para um mês/ano"""
+    return and_(MonthlyRollup.year == year, MonthlyRollup.month == month)
+
+def rollup_month_index():
+    """Expressão year * 12 + (month - 1), útil para filtrar intervalos de meses"""
+    return MonthlyRollup.year * 12 + (MonthlyRollup.month - 1)
+
+def apply_rollup_delta(session, transaction_date: datetime, category_id: int, trans_type,
+                       payment_method, amount: Decimal, count: int):
+    """Soma (ou subtrai) um valor na linha de rollup correspondente
+    
+    Executa na transação corrente da sessão; o commit fica a cargo do
+    chamador para que transação e rollup sejam gravados juntos.
+    """
+    apply_rollup_deltas(session, [(transaction_date, category_id, trans_type, payment_method, amount, count)])
+
+def apply_rollup_deltas(session, deltas: Iterable[Tuple[datetime, int, Any, Any, Decimal, int]]):
+    """Aplica várias variações (data, categoria, tipo, método, valor, contagem) no rollup
+    
+    Todas as linhas vão em um único upsert executado com executemany, em vez
+    de uma instrução por chave. Mesmas regras de transação de
+    apply_rollup_delta.
+    """
+    params = [{
+        'year': transaction_date.year,
+        'month': transaction_date.month,
+        'category_id': category_id,
+        'type': rollup_type_code(trans_type),
+        'payment_method': rollup_method_code(payment_method),
+        'total': amount,
+        'count': count,
+    } for transaction_date, category_id, trans_type, payment_method, amount, count in deltas]
+    if not params:
+        return
+    
+    table = MonthlyRollup.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['year', 'month', 'category_id', 'type', 'payment_method'],
+        set_={
+            'total': table.c.total + stmt.excluded.total,
+            'count': table.c.count + stmt.excluded.count,
+        }
+    )
+    session.execute(stmt, params)
+    
+    if any(row['count'] < 0 for row in params):
+        # Remove linhas que ficaram vazias para manter o rollup enxuto
+        session.execute(delete(table).where(table.c.count <= 0))
+
+def rebuild_monthly_rollup(connection):
+    """Recalcula todo o rollup a partir da tabela de transações"""
+    connection.execute(text("DELETE FROM monthly_rollup"))
+    connection.execute(text(f"""
+        INSERT INTO monthly_rollup (year, month, category_id, type, payment_method, total, count)
+        SELECT CAST(strftime('%Y', transaction_date) AS INTEGER),
+               CAST(strftime('%m', transaction_date) AS INTEGER),
+               category_id, type, COALESCE(payment_method, {UNKNOWN_PAYMENT_METHOD}),
+               SUM(amount), COUNT(*)
+        FROM transactions
+        GROUP BY 1, 2, 3, 4, 5
+    """))
@@ -0,0 +1,119 @@
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from typing import List, Optional, Tuple
+import re
+
+# Índice FTS5 com cópia própria de descrição, notas e nome da categoria.
+# rowid = transactions.id; mantido pelos gatilhos abaixo, de modo que
+# qualquer caminho de escrita (ORM, inserção em lote, SQL) fica coberto.
+SEARCH_TABLE_DDL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description, notes, category_name,
+        tokenize = 'unicode61 remove_diacritics 1',
+        prefix = '2 3'
+    )
+"""
+
+_CATEGORY_NAME = "COALESCE((SELECT name FROM categories WHERE id = new.category_id), '')"
+
+SEARCH_TRIGGERS_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts (rowid, description, notes, category_name)
+        VALUES (new.id, new.description, COALESCE(new.notes, ''), {_CATEGORY_NAME});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_update
+    AFTER UPDATE OF description, notes, category_id ON transactions BEGIN
+        UPDATE transactions_fts
+        SET description = new.description,
+            notes = COALESCE(new.notes, ''),
+            category_name = {_CATEGORY_NAME}
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+        DELETE FROM transactions_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS categories_fts_update AFTER UPDATE OF name ON categories BEGIN
+        UPDATE transactions_fts SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM transactions WHERE category_id = new.id);
+    END
+    """,
+]
+
+# Pesos do BM25 por coluna: descrição, notas, categoria
+BM25_WEIGHTS = (3.0, 1.0, 2.0)
+
+_search_available: Optional[bool] = None
+
+def fts5_available(connection) -> bool:
+    """Indica se o SQLite em uso foi compilado com FTS5"""
+    global _search_available
+    if _search_available is None:
+        try:
+            connection.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)"))
+            connection.execute(text("DROP TABLE temp.fts5_probe"))
+            _search_available = True
+        except OperationalError:
+            print("Aviso: SQLite sem suporte a FTS5; busca usará LIKE")
+            _search_available = False
+    return _search_available
+
+def create_search_index(connection) -> bool:
+    """Cria a tabela FTS5 e os gatilhos de sincronização (idempotente)"""
+    if not fts5_available(connection):
+        return False
+    connection.execute(text(SEARCH_TABLE_DDL))
+    for ddl in SEARCH_TRIGGERS_DDL:
+        connection.execute(text(ddl))
+    return True
+
+def rebuild_search_index(connection):
+    """Recria o conteúdo do índice de busca a partir das transações"""
+    if not create_search_index(connection):
+        return
+    connection.execute(text("DELETE FROM transactions_fts"))
+    connection.execute(text("""
+        INSERT INTO transactions_fts (rowid, description, notes, category_name)
+        SELECT t.id, t.description, COALESCE(t.notes, ''), COALESCE(c.name, '')
+        FROM transactions t LEFT JOIN categories c ON c.id = t.category_id
+    """))
+
+def build_match_query(query: str) -> str:
+    """Converte texto livre em consulta FTS5 (todos os termos, com prefixo)"""
+    terms = re.findall(r'\w+', query or '', re.UNICODE)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search_transaction_ids(connection, query: str, limit: int,
+                           after: Optional[Tuple[float, int]] = None) -> List[Tuple[int, float]]:
+    """Retorna (id, score) ordenados por relevância BM25 (menor = melhor)
+    
+    `after` é o último (score, id) da página anterior (paginação por chave).
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+    
+    params = {'match': match, 'limit': limit}
+    seek = ""
+    if after is not None:
+        seek = "AND (score > :score OR (score = :score AND id > :last_id))"
+        params['score'], params['last_id'] = after
+    
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    rows = connection.execute(text(f"""
+        SELECT id, score FROM (
+            SELECT rowid AS id, bm25(transactions_fts, {weights}) AS score
+            FROM transactions_fts
+            WHERE transactions_fts MATCH :match
+        )
+        WHERE 1 = 1 {seek}
+        ORDER BY score, id
+        LIMIT :limit
+    """), params).fetchall()
+    return [(row[0], row[1]) for row in rows]
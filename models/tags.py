@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from .database import Base
+
+# Associação N:N transação <-> tag; a PK (tag_id, transaction_id) serve de
+# índice invertido tag -> transações e o índice extra cobre o caminho inverso
+transaction_tags = Table(
+    'transaction_tags',
+    Base.metadata,
+    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True),
+    Column('transaction_id', Integer, ForeignKey('transactions.id'), primary_key=True),
+    Index('ix_transaction_tags_transaction', 'transaction_id'),
+)
+
+class Tag(Base):
+    __tablename__ = 'tags'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False, unique=True)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    # Relacionamento com transações
+    transactions = relationship('Transaction', secondary=transaction_tags, back_populates='tags')
+    
+    def __repr__(self):
+        return f"<Tag(id={self.id}, name='{self.name}')>"
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
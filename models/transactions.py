@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, Enum, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
+from .types import Money, CodedEnum
 import enum
 
 class TransactionType(enum.Enum):
@@ -17,27 +18,60 @@ class PaymentMethod(enum.Enum):
     BANK_TRANSFER = 'Transferência Bancária'
     OTHER = 'Outro'
 
+# Códigos persistidos no banco (não reordenar: os valores já gravados dependem deles)
+TRANSACTION_TYPE_CODES = (
+    (TransactionType.INCOME, 1),
+    (TransactionType.EXPENSE, 2),
+    (TransactionType.TRANSFER, 3),
+)
+
+PAYMENT_METHOD_CODES = (
+    (PaymentMethod.CASH, 1),
+    (PaymentMethod.DEBIT_CARD, 2),
+    (PaymentMethod.CREDIT_CARD, 3),
+    (PaymentMethod.PIX, 4),
+    (PaymentMethod.BANK_TRANSFER, 5),
+    (PaymentMethod.OTHER, 6),
+)
+
+TransactionTypeCode = CodedEnum(TransactionType, TRANSACTION_TYPE_CODES)
+PaymentMethodCode = CodedEnum(PaymentMethod, PAYMENT_METHOD_CODES)
+
 class Transaction(Base):
     __tablename__ = 'transactions'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)  # centavos
     description = Column(String(200), nullable=False)
     category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
     transaction_date = Column(DateTime, nullable=False, default=datetime.now)
-    type = Column(String(20), nullable=False, default='expense')
-    payment_method = Column(String(50), default='Dinheiro')
-    tags = Column(JSON, default=list)
+    type = Column(TransactionTypeCode, nullable=False, default='expense')
+    payment_method = Column(PaymentMethodCode, default='Dinheiro')
     notes = Column(String(500))
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
     # Relacionamento
     category = relationship('Category', back_populates='transactions')
+    tags = relationship('Tag', secondary='transaction_tags', back_populates='transactions')
+    
+    # Índices compostos para consultas por período e paginação por chave;
+    # updated_at é a marca d'água do ledger colunar (analytics)
+    __table_args__ = (
+        Index('ix_transactions_date_type_category', 'transaction_date', 'type', 'category_id'),
+        Index('ix_transactions_category_date', 'category_id', 'transaction_date'),
+        Index('ix_transactions_date_id', 'transaction_date', 'id'),
+        Index('ix_transactions_updated_at', 'updated_at'),
+    )
     
     def __repr__(self):
         return f"<Transaction(id={self.id}, amount={self.amount}, description='{self.description}')>"
     
+    @property
+    def tag_names(self):
+        """Nomes das tags da transação"""
+        return [tag.name for tag in self.tags]
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -48,7 +82,7 @@ class Transaction(Base):
             'transaction_date': self.transaction_date.isoformat() if self.transaction_date else None,
             'type': self.type,
             'payment_method': self.payment_method,
-            'tags': self.tags or [],
+            'tags': self.tag_names,
             'notes': self.notes,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -0,0 +1,82 @@
+from sqlalchemy import Integer, SmallInteger
+from sqlalchemy.types import TypeDecorator
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Optional, Tuple
+import enum
+
+CENT = Decimal('0.01')
+
+def to_cents(value: Any) -> int:
+    """Converte valor monetário (Decimal, float, int ou str) para centavos"""
+    if isinstance(value, float):
+        # str() evita herdar o erro binário do float (ex: 0.1 + 0.2)
+        value = str(value)
+    amount = Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+    return int(amount * 100)
+
+def from_cents(cents: int) -> Decimal:
+    """Converte centavos para Decimal com duas casas"""
+    return (Decimal(int(cents)) / 100).quantize(CENT)
+
+class Money(TypeDecorator):
+    """Valor monetário armazenado como inteiro em centavos
+    
+    No Python os valores são Decimal com duas casas; no SQLite são inteiros,
+    de modo que SUM() e comparações são exatos.
+    """
+    impl = Integer
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_cents(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return from_cents(value)
+
+class CodedEnum(TypeDecorator):
+    """Enum armazenado como código inteiro pequeno
+    
+    Aceita o membro do enum, seu valor ou seu nome ao gravar e devolve o
+    valor (str) do membro ao ler, mantendo compatibilidade com o código que
+    compara `type == 'expense'` ou `payment_method == 'PIX'`.
+    """
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class, codes: Tuple[Tuple[enum.Enum, int], ...]):
+        super().__init__()
+        self.enum_class = enum_class
+        self.codes = codes
+        self._by_member = dict(codes)
+        self._by_code = {code: member for member, code in codes}
+    
+    def member_for(self, value: Any) -> enum.Enum:
+        """Resolve membro do enum a partir do membro, valor ou nome"""
+        if isinstance(value, self.enum_class):
+            return value
+        for member in self.enum_class:
+            if value == member.value or value == member.name:
+                return member
+        raise ValueError(f"Valor inválido para {self.enum_class.__name__}: {value}")
+    
+    def code_for(self, value: Any) -> Optional[int]:
+        """Retorna o código inteiro de um valor"""
+        if value is None:
+            return None
+        return self._by_member[self.member_for(value)]
+    
+    def value_for(self, code: Optional[int]) -> Optional[str]:
+        """Retorna o valor (str) do membro para um código"""
+        if code is None:
+            return None
+        return self._by_code[code].value
+    
+    def process_bind_param(self, value, dialect):
+        return self.code_for(value)
+    
+    def process_result_value(self, value, dialect):
+        return self.value_for(value)
@@ -0,0 +1,14 @@
+import os
+import shutil
+import sys
+import tempfile
+
+# Banco temporário: precisa ser definido antes de qualquer import de models,
+# que lê o caminho do banco na importação
+_TEMP_DIR = tempfile.mkdtemp(prefix='controle-financeiro-tests-')
+os.environ['CONTROLE_FINANCEIRO_DB_PATH'] = os.path.join(_TEMP_DIR, 'test.db')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TEMP_DIR, ignore_errors=True)
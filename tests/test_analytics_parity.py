@@ -0,0 +1,156 @@
+"""Paridade entre os backends de relatórios 'sql' e 'numpy' (analytics)"""
+import pytest
+
+pytest.importorskip('numpy')
+
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta
+import analytics
+from controllers import ReportController, TransactionController, report_cache
+from models import get_session, init_db, GRANULARITIES, PaymentMethod
+
+SEED = 20240601
+ROW_COUNT = 4000
+
+# Histórico gerado: de HISTORY_START até HISTORY_START + HISTORY_DAYS
+HISTORY_START = datetime(2023, 1, 1)
+HISTORY_DAYS = 900
+
+PERIODS = [(1, 2023), (2, 2024), (7, 2024), (12, 2024), (6, 2025), (1, 2026)]
+
+# Intervalos de meses inteiros (rollup), quebrados (transactions) e com
+# limites no meio do dia
+RANGES = [
+    (datetime(2023, 1, 1), datetime(2025, 7, 1)),
+    (datetime(2023, 3, 15), datetime(2024, 11, 10)),
+    (datetime(2023, 3, 15, 12, 30), datetime(2024, 11, 10, 18, 45)),
+]
+
+def _random_rows(rng: random.Random, count: int):
+    methods = [method.value for method in PaymentMethod]
+    for i in range(count):
+        yield {
+            'amount': rng.randint(100, 500000) / 100,
+            'description': f"Lançamento {i}",
+            'category_id': rng.randint(1, 9),
+            'transaction_date': HISTORY_START + timedelta(days=rng.randrange(HISTORY_DAYS),
+                                                          minutes=rng.randrange(24 * 60)),
+            'type': rng.choice(['expense', 'expense', 'expense', 'income']),
+            'payment_method': rng.choice(methods),
+        }
+
+@pytest.fixture(scope='module')
+def session():
+    init_db()
+    session = get_session()
+    result = TransactionController(session).add_transactions_bulk(_random_rows(random.Random(SEED), ROW_COUNT))
+    assert result['inserted'] == ROW_COUNT
+    yield session
+    session.close()
+    analytics._backend = None
+    report_cache.clear()
+
+def _reports(session, backend: str) -> dict:
+    """Resultado de cada relatório com o backend `backend`"""
+    analytics._backend = backend
+    report_cache.clear()
+    reports = ReportController(session)
+    
+    results = {}
+    for month, year in PERIODS:
+        results['dashboard', month, year] = reports.get_dashboard_metrics(month, year)
+        results['categories', month, year] = reports.get_category_breakdown(month, year)
+        results['methods', month, year] = reports.get_payment_method_breakdown(month, year)
+        results['top', month, year] = reports.get_top_expenses(month, year, limit=10)
+    
+    for start, end in RANGES:
+        for granularity in GRANULARITIES:
+            for by_category in (False, True):
+                results['series', start, end, granularity, by_category] = reports.get_time_series(
+                    start, end, granularity, by_category)
+        for trans_type in ('expense', 'income'):
+            results['percentiles', start, end, trans_type] = reports.get_amount_percentiles(
+                start, end, (0, 25, 50, 90, 99, 100), trans_type)
+            for window in (1, 7, 30):
+                results['moving', start, end, trans_type, window] = reports.get_moving_average(
+                    start, end, window, trans_type)
+    return results
+
+def assert_parity(session):
+    expected = _reports(session, 'sql')
+    actual = _reports(session, 'numpy')
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        assert actual[key] == value, key
+
+def test_parity(session):
+    assert_parity(session)
+
+def test_parity_after_add(session):
+    controller = TransactionController(session)
+    controller.add_transaction({
+        'amount': 12345.67,
+        'description': 'Compra grande',
+        'category_id': 3,
+        'transaction_date': datetime(2024, 7, 15, 10, 0),
+        'type': 'expense',
+        'payment_method': 'Pix',
+    })
+    assert_parity(session)
+
+def test_parity_after_update(session):
+    controller = TransactionController(session)
+    transaction = controller.get_all_transactions(limit=1)[0]
+    controller.update_transaction(transaction.id, amount=999.99, category_id=5,
+                                  transaction_date=datetime(2024, 2, 10, 8, 0))
+    assert_parity(session)
+
+def test_parity_after_delete(session):
+    controller = TransactionController(session)
+    for transaction in controller.get_all_transactions(limit=3):
+        assert controller.delete_transaction(transaction.id)
+    assert_parity(session)
+
+def test_parity_time_of_day_bounds(session):
+    controller = TransactionController(session)
+    for hour, amount in ((8, 100.00), (20, 50.00)):
+        controller.add_transaction({
+            'amount': amount,
+            'description': 'Meio do dia',
+            'category_id': 2,
+            'transaction_date': datetime(2026, 3, 10, hour, 0),
+            'type': 'expense',
+            'payment_method': 'Pix',
+        })
+    start, end = datetime(2026, 3, 10, 12, 0), datetime(2026, 3, 11)
+    for backend in ('sql', 'numpy'):
+        analytics._backend = backend
+        report_cache.clear()
+        reports = ReportController(session)
+        assert [item['expenses'] for item in reports.get_time_series(start, end, 'day')] == [50], backend
+        assert reports.get_amount_percentiles(start, end, (100,)) == {100: 50}, backend
+    assert_parity(session)
+
+# Grava como outro processo (por exemplo, `python -m importers`): os eventos
+# de transação ficam nele e não chegam ao ledger deste
+OTHER_PROCESS_WRITES = """
+from datetime import datetime
+from controllers import TransactionController
+from models import get_session
+controller = TransactionController(get_session())
+controller.add_transaction({'amount': 777.77, 'description': 'Importado', 'category_id': 4,
+                            'transaction_date': datetime(2024, 5, 20, 9, 30),
+                            'type': 'expense', 'payment_method': 'Pix'})
+first = controller.get_all_transactions(limit=2)
+controller.update_transaction(first[0].id, amount=4321.00)
+controller.delete_transaction(first[1].id)
+"""
+
+def test_parity_after_other_process_write(session):
+    assert_parity(session)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', OTHER_PROCESS_WRITES], cwd=root, check=True)
+    assert_parity(session)
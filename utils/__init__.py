@@ -1,6 +1,9 @@
 from .validators import FinancialValidators
 from .formatters import CurrencyFormatter, DateFormatter
-from .helpers import ColorScheme, get_month_name, get_current_month_year
+from .helpers import ColorScheme, get_month_name, get_current_month_year, encode_cursor, decode_cursor
+from .tasks import BackgroundTasks, thread_session, shutdown_tasks
+from .startup import StartupProfiler
+from .events import ChangeEvent, DirtyTracker, event_bus, publish_change
 
 __all__ = [
     'FinancialValidators',
@@ -8,5 +11,15 @@ __all__ = [
     'DateFormatter',
     'ColorScheme',
     'get_month_name',
-    'get_current_month_year'
+    'get_current_month_year',
+    'encode_cursor',
+    'decode_cursor',
+    'BackgroundTasks',
+    'thread_session',
+    'shutdown_tasks',
+    'StartupProfiler',
+    'ChangeEvent',
+    'DirtyTracker',
+    'event_bus',
+    'publish_change'
 ]
@@ -0,0 +1,172 @@
+from datetime import datetime
+from typing import Callable, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+import queue
+import threading
+
+# Entidades alteradas
+TRANSACTION = 'transaction'
+BUDGET = 'budget'
+CATEGORY = 'category'
+ALERT = 'alert'  # alerta de orçamento (controllers.budget_alerts)
+
+# Ações
+ADDED = 'added'
+UPDATED = 'updated'
+DELETED = 'deleted'
+THRESHOLD_REACHED = 'threshold_reached'  # gasto atingiu o limite de alerta
+EXCEEDED = 'exceeded'  # gasto passou do valor orçado
+
+# Intervalo (ms) de entrega na thread do Tk de eventos publicados em outras threads
+DISPATCH_INTERVAL = 100
+
+# Espera (ms) para agrupar uma rajada de eventos em uma única recarga
+COALESCE_DELAY = 150
+
+class ChangeEvent(NamedTuple):
+    """Alteração gravada no banco, publicada pelos controladores após o commit"""
+    entity: str
+    action: str
+    periods: FrozenSet[Tuple[int, int]] = frozenset()  # (ano, mês) afetados
+    category_ids: FrozenSet[int] = frozenset()
+    
+    def touches_period(self, year: int, month: int) -> bool:
+        return (year, month) in self.periods
+    
+    def touches_any_period(self, periods: Iterable[Tuple[int, int]]) -> bool:
+        return not self.periods.isdisjoint(periods)
+
+class EventBus:
+    """Barramento de eventos em processo
+    
+    Os assinantes sempre rodam na thread do Tk: eventos publicados em outra
+    thread (importação, tarefas em segundo plano) ficam em fila até a
+    próxima verificação do widget registrado em attach(). Sem widget
+    registrado (linha de comando), os eventos são entregues na hora.
+    """
+    
+    def __init__(self):
+        self._subscribers: List[Callable[[ChangeEvent], None]] = []
+        self._queue: queue.Queue = queue.Queue()
+        self._widget = None
+    
+    def subscribe(self, callback: Callable[[ChangeEvent], None], first: bool = False) -> Callable[[], None]:
+        """Registra `callback`; retorna a função que cancela o registro
+        
+        `first` coloca o assinante antes dos já registrados: dados derivados
+        (como o ledger colunar) precisam ser marcados antes dos caches que
+        são calculados a partir deles.
+        """
+        if first:
+            self._subscribers.insert(0, callback)
+        else:
+            self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+    
+    def publish(self, event: ChangeEvent):
+        if self._widget is not None and threading.current_thread() is not threading.main_thread():
+            self._queue.put(event)
+        else:
+            self._dispatch(event)
+    
+    def attach(self, widget):
+        """Passa a entregar na thread do Tk os eventos vindos de outras threads"""
+        self._widget = widget
+        widget.after(DISPATCH_INTERVAL, self._drain)
+    
+    def detach(self):
+        self._widget = None
+    
+    def _drain(self):
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._dispatch(event)
+        
+        if self._widget is not None and self._widget.winfo_exists():
+            self._widget.after(DISPATCH_INTERVAL, self._drain)
+    
+    def _dispatch(self, event: ChangeEvent):
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Erro ao processar evento {event.entity}/{event.action}: {e}")
+
+event_bus = EventBus()
+
+def publish_change(entity: str, action: str, dates: Iterable[datetime] = (),
+                   category_ids: Iterable[Optional[int]] = (),
+                   periods: Iterable[Tuple[int, int]] = ()):
+    """Publica uma alteração; `dates` são convertidas nos períodos (ano, mês)"""
+    affected = set(periods)
+    affected.update((date.year, date.month) for date in dates if date is not None)
+    event_bus.publish(ChangeEvent(
+        entity=entity,
+        action=action,
+        periods=frozenset(affected),
+        category_ids=frozenset(cid for cid in category_ids if cid is not None)
+    ))
+
+class DirtyTracker:
+    """Controla quando uma view precisa recarregar seus dados
+    
+    `matches(evento)` diz se o evento afeta o que a view exibe. Eventos
+    relevantes apenas marcam a view como desatualizada; ela só recarrega
+    ao ser exibida (show) ou, se já estiver visível, uma única vez após
+    COALESCE_DELAY ms, agrupando rajadas de eventos. Exibir uma view
+    atualizada não faz nenhuma consulta.
+    """
+    
+    def __init__(self, widget, matches: Callable[[ChangeEvent], bool],
+                 refresh: Callable[[], None], delay: int = COALESCE_DELAY):
+        self.widget = widget
+        self.matches = matches
+        self.refresh = refresh
+        self.delay = delay
+        self.dirty = True  # ainda não carregada
+        self.visible = False
+        self._scheduled = None
+        self._unsubscribe = event_bus.subscribe(self._on_event)
+    
+    def show(self):
+        """A view foi exibida: recarrega se estiver desatualizada"""
+        self.visible = True
+        if self.dirty:
+            self._reload()
+    
+    def hide(self, discarded: bool = False):
+        """A view foi ocultada; `discarded` indica uma carga interrompida"""
+        self.visible = False
+        if discarded:
+            self.dirty = True
+        if self._scheduled is not None:
+            self.widget.after_cancel(self._scheduled)
+            self._scheduled = None
+    
+    def mark_dirty(self):
+        """Força a recarga na próxima exibição (ou em breve, se visível)"""
+        self.dirty = True
+        self._schedule()
+    
+    def close(self):
+        self.hide()
+        self._unsubscribe()
+    
+    def _on_event(self, event: ChangeEvent):
+        if self.matches(event):
+            self.mark_dirty()
+    
+    def _schedule(self):
+        if self.visible and self._scheduled is None:
+            self._scheduled = self.widget.after(self.delay, self._flush)
+    
+    def _flush(self):
+        self._scheduled = None
+        if self.visible and self.dirty:
+            self._reload()
+    
+    def _reload(self):
+        self.dirty = False
+        self.refresh()
@@ -1,5 +1,7 @@
 from datetime import datetime
-from typing import Tuple
+from typing import Any, List, Sequence, Tuple
+import base64
+import json
 
 class ColorScheme:
     """Esquema de cores da aplicação"""
@@ -35,3 +37,15 @@ def get_previous_month_year(month: int, year: int) -> Tuple[int, int]:
     if month == 1:
         return 12, year - 1
     return month - 1, year
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Codifica a chave de paginação em um cursor opaco"""
+    raw = json.dumps(list(values), separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decodifica um cursor gerado por encode_cursor"""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+
+class StartupProfiler:
+    """Mede fases da inicialização e o tempo de cada importação
+    
+    Ativado por `main.py --profile-startup`. As importações são medidas
+    substituindo builtins.__import__ na thread principal: o tempo
+    acumulado inclui os módulos importados por ele, o próprio não.
+    """
+    
+    def __init__(self, enabled: bool = False, top: int = 20):
+        self.enabled = enabled
+        self.top = top
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: Dict[str, List[float]] = {}  # módulo -> [acumulado, próprio]
+        self._stack: List[List[float]] = []
+        self._original_import = None
+        if enabled:
+            self._install()
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Mede o bloco como uma fase da inicialização"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.phases.append((name, time.perf_counter() - start))
+    
+    def finish(self, name: str = "Janela exibida"):
+        """Encerra a medição e imprime o relatório"""
+        if not self.enabled:
+            return
+        self.phases.append((name, time.perf_counter() - self.started))
+        self._uninstall()
+        print(self.report())
+        self.enabled = False
+    
+    def report(self) -> str:
+        lines = ["", "Perfil de inicialização", "  Fases (ms):"]
+        for name, seconds in self.phases[:-1]:
+            lines.append(f"    {name:<48}{seconds * 1000:>10.1f}")
+        if self.phases:
+            name, seconds = self.phases[-1]
+            lines.append(f"    {name + ' (total)':<48}{seconds * 1000:>10.1f}")
+        
+        lines.append("  Importações mais lentas (ms, acumulado / próprio):")
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+        for module, (cumulative, own) in slowest[:self.top]:
+            lines.append(f"    {module:<48}{cumulative * 1000:>10.1f}{own * 1000:>10.1f}")
+        return "\n".join(lines)
+    
+    def _install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+    
+    def _uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+    
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if threading.current_thread() is not threading.main_thread():
+            return original(name, globals, locals, fromlist, level)
+        
+        module = name
+        if level:
+            package = (globals or {}).get('__package__') or ''
+            try:
+                module = importlib.util.resolve_name('.' * level + name, package)
+            except (ImportError, ValueError):
+                pass
+        # Já carregado (e, em "from x import y", y não é um submódulo novo)
+        loaded = sys.modules.get(module)
+        if loaded is not None and all(hasattr(loaded, item) for item in (fromlist or ()) if item != '*'):
+            return original(name, globals, locals, fromlist, level)
+        
+        children = [0.0]
+        self._stack.append(children)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += elapsed
+            entry = self.imports.setdefault(module, [0.0, 0.0])
+            entry[0] += elapsed
+            entry[1] += elapsed - children[0]
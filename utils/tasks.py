@@ -0,0 +1,123 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+import queue
+import threading
+
+# Threads de consulta ao banco compartilhadas por todas as views
+MAX_WORKERS = 2
+
+# Intervalo (ms) de verificação dos resultados na thread do Tk
+POLL_INTERVAL = 50
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='db-worker')
+        return _pool
+
+def thread_session():
+    """Sessão do banco exclusiva da thread de trabalho atual"""
+    if getattr(_local, 'session', None) is None:
+        from models import get_session
+        _local.session = get_session()
+    return _local.session
+
+def _run_job(job: Callable[[Any], Any]) -> Any:
+    session = thread_session()
+    try:
+        return job(session)
+    finally:
+        # Encerra a transação de leitura e desanexa os objetos carregados
+        session.close()
+
+def shutdown_tasks():
+    """Encerra o pool de threads (chamado ao fechar a aplicação)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+class BackgroundTasks:
+    """Executa consultas fora da thread do Tk e entrega os resultados nela
+    
+    `job(session)` roda em uma thread de trabalho com sessão própria e deve
+    retornar dados simples (dicts, listas, números), nunca objetos ORM.
+    `on_success(resultado)` e `on_error(exceção)` rodam na thread do Tk via
+    after(). Cada chave guarda só a submissão mais recente: resultados de
+    submissões anteriores ou canceladas são descartados.
+    """
+    
+    def __init__(self, widget):
+        self.widget = widget
+        self._generations: Dict[str, int] = {}
+        self._waiting: Set[str] = set()
+        self._results: queue.Queue = queue.Queue()
+        self._pending = 0
+        self._polling = False
+    
+    def submit(self, key: str, job: Callable[[Any], Any], on_success: Callable[[Any], None],
+               on_error: Optional[Callable[[Exception], None]] = None):
+        """Agenda `job`, substituindo qualquer submissão pendente com a mesma chave"""
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        self._waiting.add(key)
+        self._pending += 1
+        
+        future = _get_pool().submit(_run_job, job)
+        future.add_done_callback(
+            lambda f: self._results.put((key, generation, f, on_success, on_error))
+        )
+        if not self._polling:
+            self._polling = True
+            self.widget.after(POLL_INTERVAL, self._poll)
+    
+    def cancel(self, key: Optional[str] = None) -> bool:
+        """Descarta os resultados pendentes de uma chave (ou de todas)
+        
+        Retorna True se algum resultado ainda esperado foi descartado.
+        """
+        keys = [key] if key is not None else list(self._generations)
+        discarded = False
+        for k in keys:
+            self._generations[k] = self._generations.get(k, 0) + 1
+            if k in self._waiting:
+                self._waiting.discard(k)
+                discarded = True
+        return discarded
+    
+    def is_current(self, key: str, generation: int) -> bool:
+        return self._generations.get(key) == generation
+    
+    def _poll(self):
+        while True:
+            try:
+                key, generation, future, on_success, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if self.is_current(key, generation):
+                self._waiting.discard(key)
+                self._deliver(future, on_success, on_error)
+        
+        if self._pending > 0 and self.widget.winfo_exists():
+            self.widget.after(POLL_INTERVAL, self._poll)
+        else:
+            self._polling = False
+    
+    def _deliver(self, future: Future, on_success: Callable[[Any], None],
+                 on_error: Optional[Callable[[Exception], None]]):
+        try:
+            result = future.result()
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            else:
+                print(f"Erro em tarefa em segundo plano: {e}")
+            return
+        on_success(result)
@@ -1,18 +1,20 @@
 from datetime import datetime
-from typing import Any
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, List
 
 class FinancialValidators:
     """Validadores para dados financeiros"""
     
     @staticmethod
-    def validate_amount(amount: Any) -> float:
-        """Valida e converte valor monetário"""
+    def validate_amount(amount: Any) -> Decimal:
+        """Valida e converte valor monetário (Decimal com 2 casas)"""
         try:
-            value = float(amount)
+            # str() evita herdar o erro binário de valores float
+            value = Decimal(str(amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
             if value <= 0:
                 raise ValueError("Valor deve ser positivo")
-            return round(value, 2)
-        except (TypeError, ValueError) as e:
+            return value
+        except (TypeError, ValueError, InvalidOperation) as e:
             raise ValueError(f"Valor inválido: {amount}") from e
     
     @staticmethod
@@ -54,3 +56,24 @@ class FinancialValidators:
             return cat_id
         except (TypeError, ValueError) as e:
             raise ValueError(f"ID de categoria inválido: {category_id}") from e
+    
+    @staticmethod
+    def validate_tags(tags: Any, max_length: int = 50) -> List[str]:
+        """Valida e normaliza tags (lista ou texto separado por vírgulas)"""
+        if tags is None:
+            return []
+        if isinstance(tags, str):
+            tags = tags.split(',')
+        if not isinstance(tags, (list, tuple, set)):
+            raise ValueError(f"Tags inválidas: {tags}")
+        
+        normalized = []
+        for tag in tags:
+            name = str(tag).strip().lower()
+            if not name:
+                continue
+            if len(name) > max_length:
+                raise ValueError(f"Tag muito longa (máximo {max_length} caracteres): {name}")
+            if name not in normalized:
+                normalized.append(name)
+        return normalized
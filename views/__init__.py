@@ -1,7 +1,23 @@
-from .main_window import MainWindow
-from .dashboard_view import DashboardView
-from .transactions_view import TransactionsView
-from .reports_view import ReportsView
-from .budgets_view import BudgetsView
+"""Telas da aplicação
+
+As views são importadas sob demanda (PEP 562): `from views import
+MainWindow` não carrega as telas que ainda não foram abertas.
+"""
+import importlib
+
+_VIEW_MODULES = {
+    'MainWindow': '.main_window',
+    'DashboardView': '.dashboard_view',
+    'TransactionsView': '.transactions_view',
+    'ReportsView': '.reports_view',
+    'BudgetsView': '.budgets_view',
+}
+
+def __getattr__(name):
+    if name not in _VIEW_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_VIEW_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
 
 __all__ = ['MainWindow', 'DashboardView', 'TransactionsView', 'ReportsView', 'BudgetsView']
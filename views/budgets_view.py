@@ -1,7 +1,8 @@
 import customtkinter as ctk
-from controllers import BudgetController, MainController
-from views.components import BudgetProgressBar, ToastNotification, CurrencyEntry
-from utils import get_current_month_year, get_month_name
+from controllers import BudgetController, MainController, CategoryRegistry
+from views.components import BudgetProgressBar, ToastNotification, CurrencyEntry, show_message
+from utils import get_current_month_year, get_month_name, BackgroundTasks, DirtyTracker
+from utils.events import TRANSACTION, BUDGET, CATEGORY
 
 class BudgetsView(ctk.CTkFrame):
     """View de gerenciamento de orçamentos"""
@@ -11,6 +12,7 @@ class BudgetsView(ctk.CTkFrame):
         
         self.budget_controller = BudgetController()
         self.main_controller = MainController()
+        self.tasks = BackgroundTasks(self)
         self.current_month, self.current_year = get_current_month_year()
         
         self.configure(fg_color='#F8F9FA')
@@ -19,7 +21,7 @@ class BudgetsView(ctk.CTkFrame):
         self.grid_rowconfigure(0, weight=1)
         
         self._create_widgets()
-        self.load_budgets()
+        self.refresh_tracker = DirtyTracker(self, self._affected_by, self.load_budgets)
     
     def _create_widgets(self):
         """Cria widgets da interface"""
@@ -133,15 +135,20 @@ class BudgetsView(ctk.CTkFrame):
         # Carregar categorias
         self._load_categories()
         
+        show_message(self.budgets_container, "Carregando...")
+        month, year = self.current_month, self.current_year
+        self.tasks.submit('budgets',
+                          lambda session: BudgetController(session).get_all_budget_status(month, year),
+                          self._show_budgets,
+                          on_error=lambda e: print(f"Erro ao carregar orçamentos: {e}"))
+    
+    def _show_budgets(self, budgets):
+        """Exibe os orçamentos carregados (executa na thread da interface)"""
         # Limpar container
         for widget in self.budgets_container.winfo_children():
             widget.destroy()
         
         try:
-            budgets = self.budget_controller.get_all_budget_status(
-                self.current_month, self.current_year
-            )
-            
             if budgets:
                 for budget in budgets:
                     progress = BudgetProgressBar(
@@ -173,10 +180,17 @@ class BudgetsView(ctk.CTkFrame):
         except Exception as e:
             print(f"Erro ao carregar orçamentos: {e}")
     
+    def _affected_by(self, event) -> bool:
+        """Orçamentos e gastos do período exibido, ou qualquer categoria"""
+        if event.entity == CATEGORY:
+            return True
+        return event.entity in (TRANSACTION, BUDGET) and \
+            event.touches_period(self.current_year, self.current_month)
+    
     def _load_categories(self):
         """Carrega categorias disponíveis"""
         try:
-            categories = self.main_controller.get_all_categories()
+            categories = CategoryRegistry.get_all()
             cat_names = [f"{cat.icon} {cat.name}" for cat in categories]
             self.category_combo.configure(values=cat_names)
             if cat_names:
@@ -225,7 +239,8 @@ class BudgetsView(ctk.CTkFrame):
             )
             
             ToastNotification(self, "Orçamento salvo com sucesso!", type='success')
-            self.load_budgets()
+            # O período do formulário pode não ser o exibido; recarrega com o evento
+            self.refresh_tracker.mark_dirty()
             
         except Exception as e:
             ToastNotification(self, f"Erro ao salvar: {str(e)}", type='error')
@@ -233,5 +248,6 @@ class BudgetsView(ctk.CTkFrame):
     
     def cleanup(self):
         """Limpa recursos"""
+        self.refresh_tracker.hide(discarded=self.tasks.cancel())
         self.budget_controller.close()
         self.main_controller.close()
@@ -1,9 +1,13 @@
-from .charts import ChartGenerator
+from .charts import ChartGenerator, ChartSlot, ChartRenderCache, chart_cache
 from .forms import CurrencyEntry, DatePickerEntry, CategoryComboBox, FormField, ToastNotification
-from .widgets import MetricCard, TransactionListItem, BudgetProgressBar
+from .widgets import MetricCard, TransactionListItem, BudgetProgressBar, show_message
+from .virtual_list import VirtualTransactionList
 
 __all__ = [
     'ChartGenerator',
+    'ChartSlot',
+    'ChartRenderCache',
+    'chart_cache',
     'CurrencyEntry',
     'DatePickerEntry',
     'CategoryComboBox',
@@ -11,5 +15,7 @@ __all__ = [
     'ToastNotification',
     'MetricCard',
     'TransactionListItem',
-    'BudgetProgressBar'
+    'BudgetProgressBar',
+    'VirtualTransactionList',
+    'show_message'
 ]
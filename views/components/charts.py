@@ -1,24 +1,103 @@
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from typing import List, Dict, Any
-import matplotlib
-matplotlib.use('Agg')
+import customtkinter as ctk
+import tkinter as tk
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+import hashlib
+import json
+
+# matplotlib e PIL são importados no primeiro gráfico desenhado, não na
+# abertura da aplicação (a importação do matplotlib é a mais lenta)
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# Resolução das figuras (mesmo valor padrão do matplotlib)
+CHART_DPI = 100
+
+# Máximo de rótulos no eixo X do gráfico de linha
+MAX_LINE_TICKS = 12
+
+def _currency_axis():
+    """Formatador do eixo Y em reais"""
+    from matplotlib.ticker import FuncFormatter
+    return FuncFormatter(lambda x, p: f'R$ {x:,.0f}')
+
+# Limites do cache de gráficos renderizados
+CHART_CACHE_MAX_ENTRIES = 24
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+class ChartRenderCache:
+    """Cache LRU de gráficos já renderizados (pixels RGBA)
+    
+    A chave é uma impressão digital do tipo, tamanho, título e dados do
+    gráfico, de modo que dados diferentes nunca reaproveitam uma imagem
+    antiga. Entradas são descartadas pela menos usada quando o número de
+    entradas ou o total de bytes passa dos limites.
+    """
+    
+    def __init__(self, max_entries: int = CHART_CACHE_MAX_ENTRIES,
+                 max_bytes: int = CHART_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: 'OrderedDict[str, Tuple[int, int, bytes]]' = OrderedDict()
+    
+    @staticmethod
+    def fingerprint(kind: str, size: Tuple[int, int], title: str,
+                    data: List[Dict[str, Any]]) -> str:
+        payload = json.dumps([kind, list(size), title, data], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[int, int, bytes]]:
+        """Retorna (largura, altura, pixels) e marca a entrada como recente"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def put(self, key: str, width: int, height: int, pixels: bytes):
+        if len(pixels) > self.max_bytes:
+            return
+        if key in self._entries:
+            self.total_bytes -= len(self._entries.pop(key)[2])
+        self._entries[key] = (width, height, pixels)
+        self.total_bytes += len(pixels)
+        
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, _, old_pixels) = self._entries.popitem(last=False)
+            self.total_bytes -= len(old_pixels)
+    
+    def clear(self):
+        """Descarta todas as imagens (ex.: após alteração dos dados)"""
+        self._entries.clear()
+        self.total_bytes = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+chart_cache = ChartRenderCache()
 
 class ChartGenerator:
-    """Gerador de gráficos para relatórios"""
+    """Gerador de gráficos para relatórios
+    
+    Usa matplotlib.figure.Figure diretamente (sem pyplot), de modo que as
+    figuras não ficam registradas em um gerenciador global e são liberadas
+    junto com o objeto. Os métodos draw_* desenham em eixos existentes e
+    são usados pelo ChartSlot para atualizar gráficos no lugar.
+    """
     
     @staticmethod
-    def create_pie_chart(data: List[Dict[str, Any]], title: str = "Distribuição por Categoria") -> Figure:
-        """Cria gráfico de pizza para categorias"""
-        fig, ax = plt.subplots(figsize=(8, 6))
+    def draw_pie_chart(ax, data: List[Dict[str, Any]], title: str = "Distribuição por Categoria"):
+        """Desenha gráfico de pizza para categorias (recria as fatias)"""
+        ax.clear()
         
         if not data:
             ax.text(0.5, 0.5, 'Sem dados disponíveis', ha='center', va='center')
-            return fig
+            ax.set_axis_off()
+            return
         
         labels = [item['name'] for item in data]
-        sizes = [item['total'] for item in data]
+        sizes = [float(item['total']) for item in data]
         colors = [item.get('color', '#2E86AB') for item in data]
         
         # Criar gráfico
@@ -39,55 +118,86 @@ class ChartGenerator:
             autotext.set_fontsize(9)
         
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        plt.tight_layout()
-        
-        return fig
     
     @staticmethod
-    def create_line_chart(data: List[Dict[str, Any]], title: str = "Evolução Mensal") -> Figure:
-        """Cria gráfico de linha para evolução temporal"""
-        fig, ax = plt.subplots(figsize=(10, 6))
+    def draw_line_chart(ax, data: List[Dict[str, Any]], title: str = "Evolução Mensal"):
+        """Desenha gráfico de linha; reaproveita as linhas existentes com set_data
         
-        if not data:
-            ax.text(0.5, 0.5, 'Sem dados disponíveis', ha='center', va='center')
-            return fig
+        Itens com 'projected' (previsão de fluxo de caixa) formam linhas
+        tracejadas; um mês em aberto pode trazer 'projected_income' e
+        'projected_expenses' (previsão do fim do mês), por onde a projeção
+        passa. Sem eles, ela continua a partir do último ponto realizado.
+        """
+        labels = [item.get('label') or item['month_name'] for item in data]
+        positions = list(range(len(labels)))
         
-        months = [item['month_name'] for item in data]
-        income = [item['income'] for item in data]
-        expenses = [item['expenses'] for item in data]
+        actual, projected = [], []
+        for i, item in enumerate(data):
+            if item.get('projected'):
+                projected.append((i, item['income'], item['expenses']))
+                continue
+            actual.append((i, item['income'], item['expenses']))
+            if 'projected_income' in item:
+                projected.append((i, item['projected_income'], item['projected_expenses']))
+        if projected and actual and projected[0][0] > actual[-1][0]:
+            projected.insert(0, actual[-1])
         
-        # Plotar linhas
-        ax.plot(months, income, marker='o', linewidth=2, label='Entradas', color='#27AE60')
-        ax.plot(months, expenses, marker='s', linewidth=2, label='Saídas', color='#E74C3C')
+        series = {}
+        for suffix, points in (('', actual), (' (projeção)', projected)):
+            indexes = [i for i, _, _ in points]
+            series['Entradas' + suffix] = (indexes, [float(income) for _, income, _ in points])
+            series['Saídas' + suffix] = (indexes, [float(expenses) for _, _, expenses in points])
         
-        # Estilização
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        ax.set_xlabel('Mês', fontsize=11)
-        ax.set_ylabel('Valor (R$)', fontsize=11)
-        ax.legend(loc='best', fontsize=10)
-        ax.grid(True, alpha=0.3)
-        
-        # Formatar eixo Y como moeda
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'R$ {x:,.0f}'))
+        lines = {line.get_label(): line for line in ax.get_lines()}
+        if all(label in lines for label in series):
+            for label, (indexes, values) in series.items():
+                lines[label].set_data(indexes, values)
+        else:
+            ax.clear()
+            # Plotar linhas
+            styles = {
+                'Entradas': {'marker': 'o', 'color': '#27AE60'},
+                'Saídas': {'marker': 's', 'color': '#E74C3C'},
+                'Entradas (projeção)': {'marker': 'o', 'color': '#27AE60', 'linestyle': '--', 'alpha': 0.6},
+                'Saídas (projeção)': {'marker': 's', 'color': '#E74C3C', 'linestyle': '--', 'alpha': 0.6},
+            }
+            for label, (indexes, values) in series.items():
+                ax.plot(indexes, values, linewidth=2, label=label, **styles[label])
+            
+            # Estilização
+            ax.set_xlabel('Período', fontsize=11)
+            ax.set_ylabel('Valor (R$)', fontsize=11)
+            ax.grid(True, alpha=0.3)
+            
+            # Formatar eixo Y como moeda
+            ax.yaxis.set_major_formatter(_currency_axis())
         
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        return fig
+        # Legenda só com as linhas que têm pontos (sem projeção, só as realizadas)
+        ax.legend(handles=[line for line in ax.get_lines() if len(line.get_xdata())],
+                  loc='best', fontsize=10)
+        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+        # Séries longas (anos de histórico) exibem só parte dos rótulos
+        step = max(1, -(-len(labels) // MAX_LINE_TICKS))
+        ax.set_xticks(positions[::step])
+        ax.set_xticklabels(labels[::step], rotation=45)
+        ax.relim()
+        ax.autoscale_view()
     
     @staticmethod
-    def create_bar_chart(data: List[Dict[str, Any]], title: str = "Comparativo") -> Figure:
-        """Cria gráfico de barras"""
-        fig, ax = plt.subplots(figsize=(10, 6))
+    def draw_bar_chart(ax, data: List[Dict[str, Any]], title: str = "Comparativo"):
+        """Desenha gráfico de barras (recria as barras)"""
+        ax.clear()
         
         if not data:
             ax.text(0.5, 0.5, 'Sem dados disponíveis', ha='center', va='center')
-            return fig
+            ax.set_axis_off()
+            return
         
         categories = [item['name'] for item in data]
-        values = [item['total'] for item in data]
+        values = [float(item['total']) for item in data]
         colors = [item.get('color', '#2E86AB') for item in data]
         
+        ax.set_axis_on()
         bars = ax.bar(categories, values, color=colors)
         
         # Adicionar valores nas barras
@@ -99,16 +209,166 @@ class ChartGenerator:
         
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         ax.set_ylabel('Valor (R$)', fontsize=11)
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'R$ {x:,.0f}'))
-        
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        
+        ax.yaxis.set_major_formatter(_currency_axis())
+        ax.tick_params(axis='x', labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment('right')
+    
+    @staticmethod
+    def create_pie_chart(data: List[Dict[str, Any]], title: str = "Distribuição por Categoria") -> 'Figure':
+        """Cria gráfico de pizza para categorias"""
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(8, 6), dpi=CHART_DPI)
+        ChartGenerator.draw_pie_chart(fig.add_subplot(), data, title)
+        fig.tight_layout()
         return fig
     
     @staticmethod
-    def embed_chart(parent, figure: Figure):
+    def create_line_chart(data: List[Dict[str, Any]], title: str = "Evolução Mensal") -> 'Figure':
+        """Cria gráfico de linha para evolução temporal"""
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(10, 6), dpi=CHART_DPI)
+        ChartGenerator.draw_line_chart(fig.add_subplot(), data, title)
+        fig.tight_layout()
+        return fig
+    
+    @staticmethod
+    def create_bar_chart(data: List[Dict[str, Any]], title: str = "Comparativo") -> 'Figure':
+        """Cria gráfico de barras"""
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(10, 6), dpi=CHART_DPI)
+        ChartGenerator.draw_bar_chart(fig.add_subplot(), data, title)
+        fig.tight_layout()
+        return fig
+    
+    @staticmethod
+    def embed_chart(parent, figure: 'Figure'):
         """Incorpora gráfico em widget Tkinter"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
         canvas = FigureCanvasTkAgg(figure, master=parent)
         canvas.draw()
         return canvas.get_tk_widget()
+
+class ChartSlot:
+    """Espaço de gráfico com uma única Figure e um único canvas
+    
+    update() redesenha os artistas na mesma figura, em vez de criar figura
+    e canvas novos a cada atualização, e guarda o resultado em chart_cache.
+    Se os mesmos dados já foram renderizados no mesmo tamanho, a imagem do
+    cache é exibida sem passar pelo matplotlib. show_message() oculta o
+    gráfico e exibe um texto (carregando, sem dados). release() libera
+    figura, canvas e imagem; o próximo update() os recria.
+    """
+    
+    DRAWERS = {
+        'pie': ChartGenerator.draw_pie_chart,
+        'line': ChartGenerator.draw_line_chart,
+        'bar': ChartGenerator.draw_bar_chart,
+    }
+    
+    def __init__(self, parent, kind: str, figsize: Tuple[float, float] = (8, 6)):
+        if kind not in self.DRAWERS:
+            raise ValueError(f"Tipo de gráfico inválido: {kind}")
+        self.parent = parent
+        self.kind = kind
+        self.figsize = figsize
+        self.figure: Optional['Figure'] = None
+        self.canvas: Optional['FigureCanvasTkAgg'] = None
+        self.key: Optional[str] = None
+        self._canvas_key: Optional[str] = None
+        self._image_key: Optional[str] = None
+        self._photo = None
+        self.message_label = ctk.CTkLabel(parent, text='',
+                                         font=('Segoe UI', 12),
+                                         text_color='#7F8C8D')
+        self.image_label = tk.Label(parent, bd=0, bg='white')
+    
+    def update(self, data: List[Dict[str, Any]], title: str) -> str:
+        """Atualiza o gráfico com novos dados e retorna a chave no cache"""
+        key = chart_cache.fingerprint(self.kind, self._pixel_size(), title, data)
+        if self.show_cached(key):
+            return key
+        
+        if self.figure is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.figure = Figure(figsize=self.figsize, dpi=CHART_DPI)
+            self.figure.add_subplot()
+            self.canvas = FigureCanvasTkAgg(self.figure, master=self.parent)
+        
+        self.DRAWERS[self.kind](self.figure.axes[0], data, title)
+        self.figure.tight_layout()
+        
+        # Desenho síncrono para que os pixels possam ir para o cache
+        self.canvas.draw()
+        width, height = self.canvas.get_width_height()
+        chart_cache.put(key, width, height, bytes(self.canvas.buffer_rgba()))
+        
+        self._canvas_key = key
+        self.key = key
+        self._show(self.canvas.get_tk_widget())
+        return key
+    
+    def show_cached(self, key: Optional[str]) -> bool:
+        """Exibe o gráfico `key` se ele já estiver renderizado"""
+        if key is None:
+            return False
+        if key == self._canvas_key and self.canvas is not None:
+            widget = self.canvas.get_tk_widget()
+        elif key == self._image_key:
+            widget = self.image_label
+        else:
+            entry = chart_cache.get(key)
+            if entry is None:
+                return False
+            from PIL import Image, ImageTk
+            width, height, pixels = entry
+            image = Image.frombuffer('RGBA', (width, height), pixels, 'raw', 'RGBA', 0, 1)
+            self._photo = ImageTk.PhotoImage(image)
+            self.image_label.configure(image=self._photo)
+            self._image_key = key
+            widget = self.image_label
+        
+        self.key = key
+        self._show(widget)
+        return True
+    
+    def show_message(self, text: str):
+        """Oculta o gráfico e exibe uma mensagem no lugar"""
+        self.key = None
+        self.message_label.configure(text=text)
+        self._show(self.message_label, pady=40)
+    
+    def release(self):
+        """Libera figura, canvas e imagem (ex.: quando a view é ocultada)"""
+        if self.canvas is not None:
+            self.canvas.get_tk_widget().destroy()
+            self.canvas = None
+        if self.figure is not None:
+            self.figure.clear()
+            self.figure = None
+        self.image_label.configure(image='')
+        self._photo = None
+        self._canvas_key = None
+        self._image_key = None
+    
+    def _show(self, widget, **pack_options):
+        """Exibe apenas `widget` entre canvas, imagem e mensagem"""
+        widgets = [self.message_label, self.image_label]
+        if self.canvas is not None:
+            widgets.append(self.canvas.get_tk_widget())
+        for other in widgets:
+            if other is not widget:
+                other.pack_forget()
+        if not widget.winfo_ismapped():
+            if pack_options:
+                widget.pack(**pack_options)
+            else:
+                widget.pack(fill='both', expand=True)
+    
+    def _pixel_size(self) -> Tuple[int, int]:
+        if self.figure is not None:
+            width, height = self.figure.bbox.size
+        else:
+            width, height = self.figsize[0] * CHART_DPI, self.figsize[1] * CHART_DPI
+        return int(width), int(height)
@@ -1,7 +1,6 @@
 import customtkinter as ctk
 from datetime import datetime
 from typing import Callable, Optional, List
-from tkcalendar import Calendar
 from utils import CurrencyFormatter
 
 class CurrencyEntry(ctk.CTkEntry):
@@ -54,6 +53,8 @@ class DatePickerEntry(ctk.CTkEntry):
         top.transient(self.master)
         top.grab_set()
         
+        # tkcalendar só é carregado quando o seletor é aberto
+        from tkcalendar import Calendar
         cal = Calendar(top, selectmode='day', date_pattern='dd/mm/yyyy',
                       year=self.selected_date.year,
                       month=self.selected_date.month,
@@ -0,0 +1,247 @@
+import customtkinter as ctk
+from .widgets import TransactionListItem
+from typing import Any, Callable, Dict, List, Optional
+
+# Altura estimada de um item (com espaçamento) até a primeira medição real
+DEFAULT_ROW_HEIGHT = 62
+
+# Distância (em páginas) além da janela carregada a partir da qual a
+# rolagem salta direto para a posição com seek_page, em vez de buscar
+# página por página até lá
+SEEK_DISTANCE_PAGES = 3
+
+class VirtualTransactionList(ctk.CTkFrame):
+    """Lista de transações virtualizada
+    
+    Mantém apenas os itens que cabem na área visível e os reaproveita
+    (update_data) conforme a rolagem. Os dados vêm em páginas de
+    `fetch_page(cursor)`, que deve retornar {'items', 'next_cursor',
+    'prev_cursor'} como TransactionController.list_transactions; só
+    `max_pages` páginas ficam em memória, de modo que percorrer todo o
+    histórico usa memória constante.
+    
+    Com `seek_page(posição)` (como TransactionController.seek_transactions,
+    que devolve também 'offset'), saltos longos da barra de rolagem
+    substituem a janela por uma única busca na posição de destino.
+    """
+    
+    def __init__(self, master, on_edit: Optional[Callable] = None,
+                 on_delete: Optional[Callable] = None, max_pages: int = 5, **kwargs):
+        kwargs.setdefault('fg_color', 'transparent')
+        super().__init__(master, **kwargs)
+        
+        self.on_edit = on_edit
+        self.on_delete = on_delete
+        self.max_pages = max_pages
+        
+        self.fetch_page: Optional[Callable[[Optional[str]], Dict[str, Any]]] = None
+        self.seek_page: Optional[Callable[[int], Dict[str, Any]]] = None
+        self.total: Optional[int] = None
+        self.pages: List[Dict[str, Any]] = []
+        self.window_start = 0
+        self.top = 0
+        self.row_height = DEFAULT_ROW_HEIGHT
+        self.rows: List[TransactionListItem] = []
+        
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        
+        self.body = ctk.CTkFrame(self, fg_color='transparent')
+        self.body.grid(row=0, column=0, sticky='nsew')
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        
+        self.empty_label = ctk.CTkLabel(self.body, text='',
+                                       font=('Segoe UI', 12),
+                                       text_color='#7F8C8D')
+        
+        self.bind('<Configure>', lambda event: self._resize_pool())
+        self._wheel_bindings = [
+            (sequence, self.bind_all(sequence, self._on_mousewheel, add='+'))
+            for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>')
+        ]
+    
+    def destroy(self):
+        # unbind_all removeria também os handlers de outros widgets: retira
+        # só as linhas deste, como Misc.unbind faz com um funcid
+        for sequence, funcid in self._wheel_bindings:
+            script = self.tk.call('bind', 'all', sequence)
+            kept = '\n'.join(line for line in script.split('\n') if funcid not in line)
+            self.tk.call('bind', 'all', sequence, kept)
+            self.deletecommand(funcid)
+        self._wheel_bindings = []
+        super().destroy()
+    
+    def load(self, fetch_page: Callable[[Optional[str]], Dict[str, Any]],
+             total: Optional[int] = None, empty_message: str = "Nenhuma transação encontrada",
+             first_page: Optional[Dict[str, Any]] = None,
+             seek_page: Optional[Callable[[int], Dict[str, Any]]] = None):
+        """Carrega uma nova fonte de dados a partir do início
+        
+        `first_page` evita a busca inicial quando a primeira página já foi
+        obtida em segundo plano.
+        """
+        self.fetch_page = fetch_page
+        self.seek_page = seek_page
+        self.total = total
+        self.pages = [first_page if first_page is not None else fetch_page(None)]
+        self.window_start = 0
+        self.top = 0
+        self.empty_label.configure(text=empty_message)
+        self._resize_pool()
+    
+    def show_loading(self, text: str = "Carregando..."):
+        """Esvazia a lista e exibe uma mensagem até o próximo load()"""
+        self.pages = []
+        for row in self.rows:
+            row.pack_forget()
+        self.empty_label.configure(text=text)
+        self.empty_label.pack(pady=40)
+        self.scrollbar.set(0, 1)
+    
+    # Janela de páginas carregadas
+    
+    def _window_rows(self) -> List[Dict[str, Any]]:
+        return [item for page in self.pages for item in page['items']]
+    
+    def _window_end(self) -> int:
+        return self.window_start + sum(len(page['items']) for page in self.pages)
+    
+    def _row_count(self) -> int:
+        """Total de linhas (estimado se a fonte não informou o total)"""
+        if self.total is not None:
+            return self.total
+        has_more = bool(self.pages and self.pages[-1].get('next_cursor'))
+        return self._window_end() + (1 if has_more else 0)
+    
+    def _load_next_page(self) -> bool:
+        cursor = self.pages[-1].get('next_cursor') if self.pages else None
+        if not cursor:
+            return False
+        page = self.fetch_page(cursor)
+        if not page['items']:
+            self.pages[-1]['next_cursor'] = None
+            return False
+        self.pages.append(page)
+        # Descarta a primeira página só se for possível buscá-la de volta
+        if len(self.pages) > self.max_pages and self.pages[1].get('prev_cursor'):
+            self.window_start += len(self.pages.pop(0)['items'])
+        return True
+    
+    def _load_prev_page(self) -> bool:
+        cursor = self.pages[0].get('prev_cursor') if self.pages else None
+        if not cursor:
+            return False
+        page = self.fetch_page(cursor)
+        if not page['items']:
+            self.pages[0]['prev_cursor'] = None
+            return False
+        self.pages.insert(0, page)
+        self.window_start -= len(page['items'])
+        if len(self.pages) > self.max_pages:
+            self.pages.pop()
+        return True
+    
+    # Rolagem e desenho
+    
+    def scroll_to(self, index: int):
+        """Posiciona a primeira linha visível em `index` (posição absoluta)"""
+        if not self.pages:
+            return
+        visible = len(self.rows)
+        index = max(0, index)
+        
+        if self._is_far(index, visible):
+            page = self.seek_page(index)
+            if page['items']:
+                self.pages = [page]
+                self.window_start = page['offset']
+        
+        while index + visible > self._window_end() and self._load_next_page():
+            pass
+        while index < self.window_start and self._load_prev_page():
+            pass
+        
+        index = min(index, max(self.window_start, self._window_end() - visible))
+        self.top = max(index, self.window_start)
+        self._render()
+    
+    def _is_far(self, index: int, visible: int) -> bool:
+        """Indica se `index` está longe demais da janela para buscar página por página"""
+        if self.seek_page is None:
+            return False
+        distance = SEEK_DISTANCE_PAGES * max(1, len(self.pages[0]['items']))
+        return (index + visible > self._window_end() + distance
+                or index < self.window_start - distance)
+    
+    def _render(self):
+        rows = self._window_rows()
+        if not rows:
+            for row in self.rows:
+                row.pack_forget()
+            self.empty_label.pack(pady=40)
+            self.scrollbar.set(0, 1)
+            return
+        self.empty_label.pack_forget()
+        
+        for i, row in enumerate(self.rows):
+            position = self.top + i - self.window_start
+            if 0 <= position < len(rows):
+                row.update_data(rows[position])
+                if not row.winfo_ismapped():
+                    row.pack(fill='x', pady=5)
+            else:
+                row.pack_forget()
+        
+        total = max(self._row_count(), 1)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + len(self.rows)) / total))
+    
+    def _resize_pool(self):
+        """Ajusta a quantidade de itens reciclados à altura disponível"""
+        if not self.pages:
+            return
+        
+        if self.rows and self.rows[0].winfo_ismapped() and self.rows[0].winfo_height() > 1:
+            self.row_height = self.rows[0].winfo_height() + 10
+        
+        needed = max(1, self.body.winfo_height() // self.row_height)
+        while len(self.rows) < needed:
+            placeholder = {'date': '', 'description': '', 'category': '', 'amount': 0}
+            self.rows.append(TransactionListItem(self.body, placeholder,
+                                                 on_edit=self.on_edit,
+                                                 on_delete=self.on_delete))
+        while len(self.rows) > needed:
+            self.rows.pop().destroy()
+        
+        self.scroll_to(self.top)
+    
+    def _on_scrollbar(self, *args):
+        """Recebe 'moveto fração' ou 'scroll n units|pages' da barra"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self._row_count()))
+        elif args[0] == 'scroll':
+            step = len(self.rows) if args[2] == 'pages' else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+    
+    def _on_mousewheel(self, event):
+        if not self._is_under_pointer(event):
+            return
+        if getattr(event, 'num', None) == 4:
+            delta = -1
+        elif getattr(event, 'num', None) == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self.top + delta * 3)
+    
+    def _is_under_pointer(self, event) -> bool:
+        """Indica se o evento de rolagem ocorreu sobre esta lista"""
+        if not self.winfo_exists() or not self.winfo_ismapped():
+            return False
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        while widget is not None:
+            if widget is self:
+                return True
+            widget = widget.master
+        return False
@@ -1,6 +1,17 @@
 import customtkinter as ctk
 from typing import Callable, Optional
 
+def show_message(container, text: str):
+    """Limpa o container e exibe uma mensagem (carregando, sem dados etc.)"""
+    for widget in container.winfo_children():
+        widget.destroy()
+    
+    label = ctk.CTkLabel(container, text=text,
+                        font=('Segoe UI', 12),
+                        text_color='#7F8C8D')
+    label.pack(pady=40)
+    return label
+
 class MetricCard(ctk.CTkFrame):
     """Card de métrica para dashboard"""
     
@@ -47,7 +58,11 @@ class MetricCard(ctk.CTkFrame):
             self.subtitle_label.configure(text=subtitle)
 
 class TransactionListItem(ctk.CTkFrame):
-    """Item de lista de transação"""
+    """Item de lista de transação
+    
+    Pode ser reaproveitado para outra transação com update_data(), o que
+    permite à VirtualTransactionList reciclar um conjunto fixo de itens.
+    """
     
     def __init__(self, master, transaction_data: dict, 
                  on_edit: Optional[Callable] = None,
@@ -62,42 +77,35 @@ class TransactionListItem(ctk.CTkFrame):
         self.grid_columnconfigure(1, weight=1)
         
         # Data
-        date_label = ctk.CTkLabel(self, text=transaction_data.get('date', ''),
-                                 font=('Segoe UI', 10),
-                                 text_color='#7F8C8D',
-                                 width=80)
-        date_label.grid(row=0, column=0, padx=10, pady=10, sticky='w')
+        self.date_label = ctk.CTkLabel(self, text='',
+                                      font=('Segoe UI', 10),
+                                      text_color='#7F8C8D',
+                                      width=80)
+        self.date_label.grid(row=0, column=0, padx=10, pady=10, sticky='w')
         
         # Descrição e categoria
         desc_frame = ctk.CTkFrame(self, fg_color='transparent')
         desc_frame.grid(row=0, column=1, sticky='ew', padx=10, pady=10)
         
-        desc_label = ctk.CTkLabel(desc_frame, 
-                                 text=transaction_data.get('description', ''),
-                                 font=('Segoe UI', 12, 'bold'),
-                                 anchor='w')
-        desc_label.pack(anchor='w')
+        self.desc_label = ctk.CTkLabel(desc_frame, 
+                                      text='',
+                                      font=('Segoe UI', 12, 'bold'),
+                                      anchor='w')
+        self.desc_label.pack(anchor='w')
         
-        cat_label = ctk.CTkLabel(desc_frame,
-                                text=f"{transaction_data.get('category_icon', '📁')} {transaction_data.get('category', '')}",
-                                font=('Segoe UI', 10),
-                                text_color='#95A5A6',
-                                anchor='w')
-        cat_label.pack(anchor='w')
+        self.cat_label = ctk.CTkLabel(desc_frame,
+                                     text='',
+                                     font=('Segoe UI', 10),
+                                     text_color='#95A5A6',
+                                     anchor='w')
+        self.cat_label.pack(anchor='w')
         
         # Valor
-        amount = transaction_data.get('amount', 0)
-        trans_type = transaction_data.get('type', 'expense')
-        
-        color = '#27AE60' if trans_type == 'income' else '#E74C3C'
-        prefix = '+' if trans_type == 'income' else '-'
-        
-        amount_label = ctk.CTkLabel(self, 
-                                   text=f"{prefix} R$ {amount:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.'),
-                                   font=('Segoe UI', 14, 'bold'),
-                                   text_color=color,
-                                   width=120)
-        amount_label.grid(row=0, column=2, padx=10, pady=10)
+        self.amount_label = ctk.CTkLabel(self, 
+                                        text='',
+                                        font=('Segoe UI', 14, 'bold'),
+                                        width=120)
+        self.amount_label.grid(row=0, column=2, padx=10, pady=10)
         
         # Botões de ação
         if on_edit or on_delete:
@@ -106,15 +114,33 @@ class TransactionListItem(ctk.CTkFrame):
             
             if on_edit:
                 edit_btn = ctk.CTkButton(action_frame, text="✏️", width=40,
-                                        command=lambda: on_edit(transaction_data))
+                                        command=lambda: self.on_edit(self.transaction_data))
                 edit_btn.pack(side='left', padx=2)
             
             if on_delete:
                 delete_btn = ctk.CTkButton(action_frame, text="🗑️", width=40,
                                           fg_color='#E74C3C',
                                           hover_color='#C0392B',
-                                          command=lambda: on_delete(transaction_data))
+                                          command=lambda: self.on_delete(self.transaction_data))
                 delete_btn.pack(side='left', padx=2)
+        
+        self.update_data(transaction_data)
+    
+    def update_data(self, transaction_data: dict):
+        """Exibe outra transação reaproveitando os widgets existentes"""
+        self.transaction_data = transaction_data
+        
+        amount = transaction_data.get('amount', 0)
+        trans_type = transaction_data.get('type', 'expense')
+        
+        color = '#27AE60' if trans_type == 'income' else '#E74C3C'
+        prefix = '+' if trans_type == 'income' else '-'
+        
+        self.date_label.configure(text=transaction_data.get('date', ''))
+        self.desc_label.configure(text=transaction_data.get('description', ''))
+        self.cat_label.configure(text=f"{transaction_data.get('category_icon', '📁')} {transaction_data.get('category', '')}")
+        self.amount_label.configure(text=f"{prefix} R$ {amount:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.'),
+                                    text_color=color)
 
 class BudgetProgressBar(ctk.CTkFrame):
     """Barra de progresso para orçamento"""
@@ -1,8 +1,9 @@
 import customtkinter as ctk
-from controllers import TransactionController, MainController, ReportController
-from views.components import (MetricCard, TransactionListItem, ChartGenerator, 
-                              ToastNotification)
-from utils import CurrencyFormatter, get_current_month_year, get_month_name
+from controllers import TransactionController, MainController, ReportController, CategoryRegistry
+from views.components import (MetricCard, TransactionListItem, ChartSlot, 
+                              ToastNotification, show_message)
+from utils import CurrencyFormatter, get_current_month_year, get_month_name, BackgroundTasks, DirtyTracker
+from utils.events import TRANSACTION, CATEGORY
 from typing import Optional
 
 class DashboardView(ctk.CTkScrollableFrame):
@@ -11,15 +12,16 @@ class DashboardView(ctk.CTkScrollableFrame):
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
         
-        self.transaction_controller = TransactionController()
-        self.report_controller = ReportController()
+        self.tasks = BackgroundTasks(self)
         self.current_month, self.current_year = get_current_month_year()
+        self._chart_key = None
         
         self.configure(fg_color='#F8F9FA')
         self.grid_columnconfigure(0, weight=1)
         
         self._create_widgets()
-        self.load_data()
+        # A primeira carga acontece quando a MainWindow exibe a view
+        self.refresh_tracker = DirtyTracker(self, self._affected_by, self.load_data)
     
     def _create_widgets(self):
         """Cria os widgets da interface"""
@@ -41,7 +43,7 @@ class DashboardView(ctk.CTkScrollableFrame):
         # Cards de métricas
         metrics_frame = ctk.CTkFrame(self, fg_color='transparent')
         metrics_frame.grid(row=1, column=0, sticky='ew', padx=20, pady=(0, 20))
-        metrics_frame.grid_columnconfigure((0, 1, 2), weight=1)
+        metrics_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
         
         self.income_card = MetricCard(metrics_frame, "Entradas", "R$ 0,00", "💰", "#27AE60")
         self.income_card.grid(row=0, column=0, padx=10, sticky='ew')
@@ -52,6 +54,10 @@ class DashboardView(ctk.CTkScrollableFrame):
         self.balance_card = MetricCard(metrics_frame, "Saldo", "R$ 0,00", "📊", "#2E86AB")
         self.balance_card.grid(row=0, column=2, padx=10, sticky='ew')
         
+        self.forecast_card = MetricCard(metrics_frame, "Saldo Projetado", "R$ 0,00", "🔮", "#8E44AD",
+                                        subtitle="Previsão para o fim do mês")
+        self.forecast_card.grid(row=0, column=3, padx=10, sticky='ew')
+        
         # Gráfico de categorias
         chart_frame = ctk.CTkFrame(self, fg_color='white', corner_radius=10)
         chart_frame.grid(row=2, column=0, sticky='ew', padx=20, pady=(0, 20))
@@ -62,6 +68,7 @@ class DashboardView(ctk.CTkScrollableFrame):
         
         self.chart_container = ctk.CTkFrame(chart_frame, fg_color='transparent')
         self.chart_container.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        self.chart_slot = ChartSlot(self.chart_container, 'pie', figsize=(8, 6))
         
         # Transações recentes
         recent_frame = ctk.CTkFrame(self, fg_color='white', corner_radius=10)
@@ -75,12 +82,35 @@ class DashboardView(ctk.CTkScrollableFrame):
         self.transactions_container.pack(fill='both', expand=True, padx=20, pady=(0, 20))
     
     def load_data(self):
-        """Carrega dados do dashboard"""
+        """Carrega dados do dashboard em segundo plano"""
+        self._show_loading()
+        month, year = self.current_month, self.current_year
+        
+        def job(session):
+            report_controller = ReportController(session)
+            transactions = TransactionController(session).get_all_transactions(limit=5)
+            return {
+                'metrics': report_controller.get_dashboard_metrics(month, year),
+                'categories': report_controller.get_category_breakdown(month, year),
+                'forecast': report_controller.get_cash_flow_forecast(month, year),
+                'recent': [self._to_row_data(trans) for trans in transactions]
+            }
+        
+        self.tasks.submit('dashboard', job, self._show_data,
+                          on_error=lambda e: print(f"Erro ao carregar dashboard: {e}"))
+    
+    def _show_loading(self):
+        """Exibe o estado de carregamento enquanto a consulta roda"""
+        for card in (self.income_card, self.expense_card, self.balance_card, self.forecast_card):
+            card.update_value("...")
+        if not self.chart_slot.show_cached(self._chart_key):
+            self.chart_slot.show_message("Carregando...")
+        show_message(self.transactions_container, "Carregando...")
+    
+    def _show_data(self, data):
+        """Exibe os dados carregados (executa na thread da interface)"""
         try:
-            # Métricas
-            metrics = self.report_controller.get_dashboard_metrics(
-                self.current_month, self.current_year
-            )
+            metrics = data['metrics']
             
             # Atualizar cards
             self.income_card.update_value(
@@ -102,72 +132,87 @@ class DashboardView(ctk.CTkScrollableFrame):
                 CurrencyFormatter.format(metrics['balance'])
             )
             
+            self._load_forecast(data['forecast'])
+            
             # Gráfico de categorias
-            self._load_chart()
+            self._load_chart(data['categories'])
+            self._chart_key = self.chart_slot.key
             
             # Transações recentes
-            self._load_recent_transactions()
+            self._load_recent_transactions(data['recent'])
             
         except Exception as e:
             print(f"Erro ao carregar dashboard: {e}")
     
-    def _load_chart(self):
+    def _load_forecast(self, forecast):
+        """Atualiza o card de saldo projetado para o fim do mês"""
+        if forecast is None:
+            self.forecast_card.update_value("—", "Previsão indisponível (requer NumPy)")
+            return
+        
+        pending = forecast['balance'] - forecast['actual_balance']
+        self.forecast_card.configure(fg_color='#8E44AD' if forecast['balance'] >= 0 else '#C0392B')
+        self.forecast_card.update_value(
+            CurrencyFormatter.format(forecast['balance']),
+            f"{'+' if pending >= 0 else '-'} {CurrencyFormatter.format(abs(pending))} até o fim do mês"
+        )
+    
+    def _load_chart(self, data):
         """Carrega gráfico de categorias"""
-        # Limpar container
-        for widget in self.chart_container.winfo_children():
-            widget.destroy()
-        
         try:
-            data = self.report_controller.get_category_breakdown(
-                self.current_month, self.current_year
-            )
-            
             if data:
-                figure = ChartGenerator.create_pie_chart(data)
-                chart_widget = ChartGenerator.embed_chart(self.chart_container, figure)
-                chart_widget.pack(fill='both', expand=True)
+                self.chart_slot.update(data, "Distribuição por Categoria")
             else:
-                no_data = ctk.CTkLabel(self.chart_container, 
-                                      text="Nenhum gasto registrado neste mês",
-                                      font=('Segoe UI', 12),
-                                      text_color='#7F8C8D')
-                no_data.pack(pady=40)
+                self.chart_slot.show_message("Nenhum gasto registrado neste mês")
         except Exception as e:
             print(f"Erro ao carregar gráfico: {e}")
     
-    def _load_recent_transactions(self):
+    def _load_recent_transactions(self, transactions):
         """Carrega transações recentes"""
         # Limpar container
         for widget in self.transactions_container.winfo_children():
             widget.destroy()
         
         try:
-            transactions = self.transaction_controller.get_all_transactions(limit=5)
-            
             if transactions:
-                for trans in transactions:
-                    trans_data = {
-                        'id': trans.id,
-                        'date': trans.transaction_date.strftime('%d/%m/%Y'),
-                        'description': trans.description,
-                        'category': trans.category.name if trans.category else 'Sem categoria',
-                        'category_icon': trans.category.icon if trans.category else '📁',
-                        'amount': trans.amount,
-                        'type': trans.type if isinstance(trans.type, str) else (trans.type.value if trans.type else 'expense')
-                    }
-                    
+                for trans_data in transactions:
                     item = TransactionListItem(self.transactions_container, trans_data)
                     item.pack(fill='x', pady=5)
             else:
-                no_trans = ctk.CTkLabel(self.transactions_container,
-                                       text="Nenhuma transação registrada",
-                                       font=('Segoe UI', 12),
-                                       text_color='#7F8C8D')
-                no_trans.pack(pady=40)
+                show_message(self.transactions_container, "Nenhuma transação registrada")
         except Exception as e:
             print(f"Erro ao carregar transações: {e}")
     
+    def _affected_by(self, event) -> bool:
+        """Métricas e transações recentes mudam com qualquer transação ou categoria"""
+        if event.entity not in (TRANSACTION, CATEGORY):
+            return False
+        self._chart_key = None
+        return True
+    
+    @staticmethod
+    def _to_row_data(trans) -> dict:
+        """Converte a transação nos dados exibidos por TransactionListItem"""
+        category = CategoryRegistry.get(trans.category_id)
+        return {
+            'id': trans.id,
+            'date': trans.transaction_date.strftime('%d/%m/%Y'),
+            'description': trans.description,
+            'category': category.name,
+            'category_icon': category.icon,
+            'amount': trans.amount,
+            'type': trans.type if isinstance(trans.type, str) else (trans.type.value if trans.type else 'expense')
+        }
+    
     def cleanup(self):
-        """Limpa recursos"""
-        self.transaction_controller.close()
-        self.report_controller.close()
+        """Limpa recursos (a view foi ocultada)
+        
+        O gráfico continua montado: ao voltar para uma view atualizada,
+        nenhuma recarga acontece e ele é exibido como estava.
+        """
+        self.refresh_tracker.hide(discarded=self.tasks.cancel())
+    
+    def destroy(self):
+        self.refresh_tracker.close()
+        self.chart_slot.release()
+        super().destroy()
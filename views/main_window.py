@@ -1,8 +1,19 @@
 import customtkinter as ctk
-from views.dashboard_view import DashboardView
-from views.transactions_view import TransactionsView
-from views.reports_view import ReportsView
-from views.budgets_view import BudgetsView
+from controllers import CategoryRegistry
+from analytics import save_snapshot
+from utils import shutdown_tasks, event_bus
+from utils.events import ALERT, EXCEEDED
+from views.components import ToastNotification
+import importlib
+
+# Visualização -> (módulo, classe); cada módulo é importado na primeira
+# vez que a visualização é aberta
+VIEW_CLASSES = {
+    'dashboard': ('views.dashboard_view', 'DashboardView'),
+    'transactions': ('views.transactions_view', 'TransactionsView'),
+    'reports': ('views.reports_view', 'ReportsView'),
+    'budgets': ('views.budgets_view', 'BudgetsView'),
+}
 
 class MainWindow(ctk.CTk):
     """Janela principal da aplicação"""
@@ -35,6 +46,14 @@ class MainWindow(ctk.CTk):
         self.views = {}
         self.current_view = None
         
+        # Eventos de alteração publicados fora da thread do Tk
+        event_bus.attach(self)
+        
+        # Alertas de orçamento: toast na hora e contador no menu até abrir Orçamentos
+        self._pending_alerts = []
+        self._unread_alerts = 0
+        event_bus.subscribe(self._on_change)
+        
         # Mostrar dashboard por padrão
         self.show_view('dashboard')
     
@@ -60,6 +79,7 @@ class MainWindow(ctk.CTk):
         
         # Botões de navegação
         self.nav_buttons = {}
+        self.nav_texts = {}
         
         nav_items = [
             ('dashboard', '📊 Dashboard', 1),
@@ -82,6 +102,7 @@ class MainWindow(ctk.CTk):
             )
             btn.grid(row=row, column=0, sticky='ew', padx=10, pady=5)
             self.nav_buttons[view_id] = btn
+            self.nav_texts[view_id] = text
         
         # Informações do rodapé
         footer = ctk.CTkFrame(sidebar, fg_color='#1F2D3D')
@@ -107,31 +128,62 @@ class MainWindow(ctk.CTk):
         # Destacar botão ativo
         if view_id in self.nav_buttons:
             self.nav_buttons[view_id].configure(fg_color='#34495E')
+        if view_id == 'budgets':
+            self._set_alert_badge(0)
         
         # Criar ou mostrar visualização
-        if view_id not in self.views:
-            if view_id == 'dashboard':
-                self.views[view_id] = DashboardView(self.content_container)
-            elif view_id == 'transactions':
-                self.views[view_id] = TransactionsView(self.content_container)
-            elif view_id == 'reports':
-                self.views[view_id] = ReportsView(self.content_container)
-            elif view_id == 'budgets':
-                self.views[view_id] = BudgetsView(self.content_container)
+        if view_id not in self.views and view_id in VIEW_CLASSES:
+            module_name, class_name = VIEW_CLASSES[view_id]
+            view_class = getattr(importlib.import_module(module_name), class_name)
+            self.views[view_id] = view_class(self.content_container)
         
         # Mostrar visualização
         if view_id in self.views:
             self.current_view = self.views[view_id]
             self.current_view.grid(row=0, column=0, sticky='nsew')
             
-            # Recarregar dados se tiver método load_data
-            if hasattr(self.current_view, 'load_data'):
-                self.current_view.load_data()
-            elif hasattr(self.current_view, 'load_reports'):
-                self.current_view.load_reports()
-            elif hasattr(self.current_view, 'load_budgets'):
-                self.current_view.load_budgets()
+            # Recarregar dados só se algo exibido mudou desde a última carga
+            self.current_view.refresh_tracker.show()
+    
+    def _on_change(self, event):
+        """Agrupa os alertas de orçamento de uma mesma gravação em um só toast"""
+        if event.entity != ALERT:
+            return
+        if not self._pending_alerts:
+            self.after_idle(self._show_alerts)
+        self._pending_alerts.append(event)
+    
+    def _show_alerts(self):
+        alerts, self._pending_alerts = self._pending_alerts, []
+        if not alerts:
+            return
+        if self.current_view is not self.views.get('budgets'):
+            self._set_alert_badge(self._unread_alerts + len(alerts))
+        
+        exceeded = any(alert.action == EXCEEDED for alert in alerts)
+        if len(alerts) == 1:
+            alert = alerts[0]
+            category = CategoryRegistry.get(next(iter(alert.category_ids), None))
+            year, month = next(iter(alert.periods))
+            if exceeded:
+                message = f"🚨 Orçamento de {category.name} ultrapassado ({month:02d}/{year})"
+            else:
+                message = f"⚠️ {category.name} atingiu o limite de alerta do orçamento ({month:02d}/{year})"
+        else:
+            message = f"⚠️ {len(alerts)} novos alertas de orçamento"
+        ToastNotification(self, message, duration=4000, type='error' if exceeded else 'warning')
+    
+    def _set_alert_badge(self, count: int):
+        """Exibe no botão de Orçamentos quantos alertas ainda não foram vistos"""
+        self._unread_alerts = count
+        text = self.nav_texts['budgets']
+        self.nav_buttons['budgets'].configure(text=f"{text} ({count})" if count else text)
     
     def run(self):
         """Inicia a aplicação"""
-        self.mainloop()
+        try:
+            self.mainloop()
+        finally:
+            event_bus.detach()
+            shutdown_tasks()
+            save_snapshot()
@@ -1,23 +1,45 @@
 import customtkinter as ctk
 from controllers import ReportController
-from views.components import ChartGenerator
-from utils import get_current_month_year, get_month_name
+from models import month_bounds, add_months, iter_buckets
+from views.components import ChartSlot, ToastNotification, show_message
+from utils import get_current_month_year, get_month_name, BackgroundTasks, DirtyTracker
+from utils.events import TRANSACTION, CATEGORY
+from exporters import export_file
+from tkinter import filedialog
 from datetime import datetime
 
+# Janelas do gráfico de evolução: rótulo -> (meses, granularidade)
+EVOLUTION_RANGES = {
+    '6 meses': (6, 'month'),
+    '12 meses': (12, 'month'),
+    '2 anos': (24, 'month'),
+    '5 anos': (60, 'quarter'),
+    '10 anos': (120, 'quarter'),
+    '20 anos': (240, 'year'),
+}
+
+# Meses projetados após o mês atual no gráfico de evolução mensal
+FORECAST_MONTHS = 3
+
 class ReportsView(ctk.CTkScrollableFrame):
     """View de relatórios e análises"""
     
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
         
-        self.report_controller = ReportController()
+        self.tasks = BackgroundTasks(self)
         self.current_month, self.current_year = get_current_month_year()
+        self.evolution_range = '6 meses'
+        # Chaves dos gráficos (chart_cache) exibidos em cada período
+        self._chart_keys = {}
+        # Meses (ano, mês) cobertos pelos relatórios exibidos
+        self._shown_periods = set()
         
         self.configure(fg_color='#F8F9FA')
         self.grid_columnconfigure(0, weight=1)
         
         self._create_widgets()
-        self.load_reports()
+        self.refresh_tracker = DirtyTracker(self, self._affected_by, self.load_reports)
     
     def _create_widgets(self):
         """Cria widgets da interface"""
@@ -38,7 +60,7 @@ class ReportsView(ctk.CTkScrollableFrame):
         self.month_combo.set(get_month_name(self.current_month))
         self.month_combo.pack(side='left', padx=5)
         
-        years = [str(y) for y in range(datetime.now().year - 2, datetime.now().year + 2)]
+        years = [str(y) for y in range(datetime.now().year - 10, datetime.now().year + 2)]
         self.year_combo = ctk.CTkComboBox(period_frame, values=years, width=100)
         self.year_combo.set(str(self.current_year))
         self.year_combo.pack(side='left', padx=5)
@@ -47,6 +69,10 @@ class ReportsView(ctk.CTkScrollableFrame):
                                   command=self._update_period)
         update_btn.pack(side='left', padx=5)
         
+        self.export_btn = ctk.CTkButton(period_frame, text="📤 Exportar", width=100,
+                                       command=self.export_reports)
+        self.export_btn.pack(side='left', padx=5)
+        
         # Container de gráficos
         charts_container = ctk.CTkFrame(self, fg_color='transparent')
         charts_container.grid(row=1, column=0, sticky='ew', padx=20, pady=(0, 20))
@@ -62,6 +88,7 @@ class ReportsView(ctk.CTkScrollableFrame):
         
         self.pie_container = ctk.CTkFrame(self.pie_frame, fg_color='transparent', height=400)
         self.pie_container.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        self.pie_slot = ChartSlot(self.pie_container, 'pie', figsize=(8, 6))
         
         # Gráfico de barras - Métodos de pagamento
         self.bar_frame = ctk.CTkFrame(charts_container, fg_color='white', corner_radius=10)
@@ -73,17 +100,27 @@ class ReportsView(ctk.CTkScrollableFrame):
         
         self.bar_container = ctk.CTkFrame(self.bar_frame, fg_color='transparent', height=400)
         self.bar_container.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        self.bar_slot = ChartSlot(self.bar_container, 'bar', figsize=(10, 6))
         
         # Gráfico de evolução mensal
         self.evolution_frame = ctk.CTkFrame(self, fg_color='white', corner_radius=10)
         self.evolution_frame.grid(row=2, column=0, sticky='ew', padx=20, pady=(0, 20))
         
-        evo_title = ctk.CTkLabel(self.evolution_frame, text="Evolução Mensal (Últimos 6 meses)",
-                                font=('Segoe UI', 16, 'bold'))
-        evo_title.pack(pady=15)
+        evo_header = ctk.CTkFrame(self.evolution_frame, fg_color='transparent')
+        evo_header.pack(fill='x', padx=20, pady=15)
+        
+        self.evo_title = ctk.CTkLabel(evo_header, text=self._evolution_title(),
+                                     font=('Segoe UI', 16, 'bold'))
+        self.evo_title.pack(side='left')
+        
+        self.range_combo = ctk.CTkComboBox(evo_header, values=list(EVOLUTION_RANGES), width=120,
+                                          command=self._update_range)
+        self.range_combo.set(self.evolution_range)
+        self.range_combo.pack(side='right')
         
         self.evolution_container = ctk.CTkFrame(self.evolution_frame, fg_color='transparent')
         self.evolution_container.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        self.evolution_slot = ChartSlot(self.evolution_container, 'line', figsize=(10, 6))
         
         # Maiores despesas
         self.top_expenses_frame = ctk.CTkFrame(self, fg_color='white', corner_radius=10)
@@ -98,6 +135,9 @@ class ReportsView(ctk.CTkScrollableFrame):
                                                     height=200)
         self.top_container.pack(fill='both', expand=True, padx=20, pady=(0, 20))
     
+    def _chart_slots(self):
+        return (self.pie_slot, self.bar_slot, self.evolution_slot)
+    
     def _update_period(self):
         """Atualiza período selecionado"""
         month_name = self.month_combo.get()
@@ -106,48 +146,93 @@ class ReportsView(ctk.CTkScrollableFrame):
         self.current_year = int(self.year_combo.get())
         self.load_reports()
     
+    def _update_range(self, choice: str):
+        """Atualiza a janela do gráfico de evolução"""
+        self.evolution_range = choice
+        self.evo_title.configure(text=self._evolution_title())
+        self.load_reports()
+    
+    def _evolution_title(self) -> str:
+        return f"Evolução (Últimos {self.evolution_range})"
+    
+    def _evolution_window(self, month: int, year: int):
+        """Início, fim e granularidade da janela de evolução terminada em month/year"""
+        months, granularity = EVOLUTION_RANGES[self.evolution_range]
+        end = month_bounds(month, year)[1]
+        return add_months(end, -months), end, granularity
+    
     def load_reports(self):
-        """Carrega todos os relatórios"""
-        self._load_category_pie()
-        self._load_payment_method_bar()
-        self._load_evolution()
-        self._load_top_expenses()
+        """Carrega todos os relatórios em segundo plano"""
+        month, year = self.current_month, self.current_year
+        start, end, granularity = self._evolution_window(month, year)
+        # A previsão só continua a série mensal que termina no mês atual
+        with_forecast = granularity == 'month' and (month, year) == get_current_month_year()
+        
+        # Período já visitado: exibe os gráficos do cache enquanto a consulta roda
+        keys = self._chart_keys.get((month, year, self.evolution_range), (None, None, None))
+        for slot, key in zip(self._chart_slots(), keys):
+            if not slot.show_cached(key):
+                slot.show_message("Carregando...")
+        show_message(self.top_container, "Carregando...")
+        
+        def job(session):
+            report_controller = ReportController(session)
+            evolution = report_controller.get_time_series(start, end, granularity)
+            if with_forecast:
+                evolution = self._append_forecast(
+                    evolution, report_controller.get_cash_flow_forecast(month, year, FORECAST_MONTHS))
+            return {
+                'categories': report_controller.get_category_breakdown(month, year),
+                'payment_methods': report_controller.get_payment_method_breakdown(month, year),
+                'evolution': evolution,
+                'top_expenses': report_controller.get_top_expenses(month, year, limit=10)
+            }
+        
+        self.tasks.submit('reports', job, self._show_reports,
+                          on_error=lambda e: print(f"Erro ao carregar relatórios: {e}"))
+    
+    def _show_reports(self, data):
+        """Exibe os relatórios carregados (executa na thread da interface)"""
+        self._load_category_pie(data['categories'])
+        self._load_payment_method_bar(data['payment_methods'])
+        self._load_evolution(data['evolution'])
+        self._load_top_expenses(data['top_expenses'])
+        self._chart_keys[(self.current_month, self.current_year, self.evolution_range)] = tuple(
+            slot.key for slot in self._chart_slots())
+        start, end, _ = self._evolution_window(self.current_month, self.current_year)
+        self._shown_periods = {(m.year, m.month) for m in iter_buckets(start, end, 'month')}
+    
+    @staticmethod
+    def _append_forecast(evolution, forecast):
+        """Acrescenta à evolução a previsão do fim do mês atual e dos meses seguintes"""
+        if not forecast or not evolution:
+            return evolution
+        current = dict(evolution[-1], projected_income=forecast['income'],
+                       projected_expenses=forecast['expenses'])
+        return evolution[:-1] + [current] + forecast['months']
     
-    def _load_category_pie(self):
+    def _affected_by(self, event) -> bool:
+        """Categorias ou transações dos meses exibidos desatualizam os relatórios"""
+        if event.entity == CATEGORY or (event.entity == TRANSACTION
+                                        and event.touches_any_period(self._shown_periods)):
+            # Gráficos guardados por período podem estar desatualizados
+            self._chart_keys.clear()
+            return True
+        return False
+    
+    def _load_category_pie(self, data):
         """Carrega gráfico de pizza de categorias"""
-        # Limpar
-        for widget in self.pie_container.winfo_children():
-            widget.destroy()
-        
         try:
-            data = self.report_controller.get_category_breakdown(
-                self.current_month, self.current_year
-            )
-            
             if data:
-                figure = ChartGenerator.create_pie_chart(data, "Distribuição por Categoria")
-                chart = ChartGenerator.embed_chart(self.pie_container, figure)
-                chart.pack(fill='both', expand=True)
+                self.pie_slot.update(data, "Distribuição por Categoria")
             else:
-                no_data = ctk.CTkLabel(self.pie_container, 
-                                      text="Sem dados disponíveis",
-                                      font=('Segoe UI', 12),
-                                      text_color='#7F8C8D')
-                no_data.pack(pady=40)
+                self.pie_slot.show_message("Sem dados disponíveis")
         except Exception as e:
             print(f"Erro ao carregar gráfico de categorias: {e}")
     
-    def _load_payment_method_bar(self):
+    def _load_payment_method_bar(self, data):
         """Carrega gráfico de barras de métodos de pagamento"""
-        # Limpar
-        for widget in self.bar_container.winfo_children():
-            widget.destroy()
-        
         try:
-            data = self.report_controller.get_payment_method_breakdown(
-                self.current_month, self.current_year
-            )
-            
             if data:
                 # Converter para formato do gráfico
                 chart_data = [
@@ -155,51 +240,29 @@ class ReportsView(ctk.CTkScrollableFrame):
                     for item in data
                 ]
                 
-                figure = ChartGenerator.create_bar_chart(chart_data, "Por Método de Pagamento")
-                chart = ChartGenerator.embed_chart(self.bar_container, figure)
-                chart.pack(fill='both', expand=True)
+                self.bar_slot.update(chart_data, "Por Método de Pagamento")
             else:
-                no_data = ctk.CTkLabel(self.bar_container,
-                                      text="Sem dados disponíveis",
-                                      font=('Segoe UI', 12),
-                                      text_color='#7F8C8D')
-                no_data.pack(pady=40)
+                self.bar_slot.show_message("Sem dados disponíveis")
         except Exception as e:
             print(f"Erro ao carregar gráfico de métodos: {e}")
     
-    def _load_evolution(self):
+    def _load_evolution(self, data):
         """Carrega gráfico de evolução mensal"""
-        # Limpar
-        for widget in self.evolution_container.winfo_children():
-            widget.destroy()
-        
         try:
-            data = self.report_controller.get_monthly_evolution(self.current_year, months=6)
-            
             if data:
-                figure = ChartGenerator.create_line_chart(data, "Evolução Mensal")
-                chart = ChartGenerator.embed_chart(self.evolution_container, figure)
-                chart.pack(fill='both', expand=True)
+                self.evolution_slot.update(data, "Evolução")
             else:
-                no_data = ctk.CTkLabel(self.evolution_container,
-                                      text="Sem dados disponíveis",
-                                      font=('Segoe UI', 12),
-                                      text_color='#7F8C8D')
-                no_data.pack(pady=40)
+                self.evolution_slot.show_message("Sem dados disponíveis")
         except Exception as e:
             print(f"Erro ao carregar evolução: {e}")
     
-    def _load_top_expenses(self):
+    def _load_top_expenses(self, expenses):
         """Carrega maiores despesas"""
         # Limpar
         for widget in self.top_container.winfo_children():
             widget.destroy()
         
         try:
-            expenses = self.report_controller.get_top_expenses(
-                self.current_month, self.current_year, limit=10
-            )
-            
             if expenses:
                 for idx, exp in enumerate(expenses, 1):
                     item_frame = ctk.CTkFrame(self.top_container, fg_color='#ECF0F1', 
@@ -242,6 +305,44 @@ class ReportsView(ctk.CTkScrollableFrame):
         except Exception as e:
             print(f"Erro ao carregar top despesas: {e}")
     
+    def export_reports(self):
+        """Exporta transações e relatórios do período em segundo plano"""
+        path = filedialog.asksaveasfilename(
+            title="Exportar relatório",
+            defaultextension='.xlsx',
+            initialfile=f"relatorio_{self.current_year}_{self.current_month:02d}.xlsx",
+            filetypes=[("Planilha Excel", "*.xlsx"), ("CSV (somente transações)", "*.csv")]
+        )
+        if not path:
+            return
+        
+        start, end = month_bounds(self.current_month, self.current_year)
+        filters = {'start': start, 'end': end}
+        period = (self.current_month, self.current_year)
+        
+        self.export_btn.configure(state='disabled', text="⏳")
+        self.tasks.submit('export', lambda session: export_file(path, filters, period),
+                          self._export_finished, on_error=self._export_failed)
+    
+    def _export_finished(self, count: int):
+        self.export_btn.configure(state='normal', text="📤 Exportar")
+        ToastNotification(self, f"Relatório exportado ({count} transações)", type='success')
+    
+    def _export_failed(self, error: Exception):
+        self.export_btn.configure(state='normal', text="📤 Exportar")
+        print(f"Erro ao exportar relatório: {error}")
+        ToastNotification(self, f"Erro ao exportar: {error}", type='error')
+    
     def cleanup(self):
-        """Limpa recursos"""
-        self.report_controller.close()
+        """Limpa recursos (a view foi ocultada)
+        
+        Os gráficos continuam montados: ao voltar para uma view atualizada,
+        nenhuma recarga acontece e eles são exibidos como estavam.
+        """
+        self.refresh_tracker.hide(discarded=self.tasks.cancel('reports'))
+    
+    def destroy(self):
+        self.refresh_tracker.close()
+        for slot in self._chart_slots():
+            slot.release()
+        super().destroy()
@@ -1,10 +1,20 @@
 import customtkinter as ctk
-from controllers import TransactionController, MainController
+from controllers import TransactionController, MainController, CategoryRegistry
 from models import TransactionType, PaymentMethod
 from views.components import (DatePickerEntry, CurrencyEntry, CategoryComboBox, 
-                              FormField, ToastNotification, TransactionListItem)
+                              FormField, ToastNotification, VirtualTransactionList)
+from importers import import_file
+from exporters import export_file
+from utils import BackgroundTasks, DirtyTracker
+from utils.events import TRANSACTION, CATEGORY
+from tkinter import filedialog
 from datetime import datetime
 from typing import Optional
+import queue
+import threading
+
+# Transações buscadas por página na lista
+PAGE_SIZE = 50
 
 class TransactionsView(ctk.CTkFrame):
     """View de gerenciamento de transações"""
@@ -14,8 +24,10 @@ class TransactionsView(ctk.CTkFrame):
         
         self.transaction_controller = TransactionController()
         self.main_controller = MainController()
+        self.tasks = BackgroundTasks(self)
         self.categories = []
         self.editing_id: Optional[int] = None
+        self.import_queue: Optional[queue.Queue] = None
         
         self.configure(fg_color='#F8F9FA')
         self.grid_columnconfigure(0, weight=2)
@@ -23,8 +35,8 @@ class TransactionsView(ctk.CTkFrame):
         self.grid_rowconfigure(0, weight=1)
         
         self._create_widgets()
-        self.load_categories()
-        self.load_transactions()
+        # Salvar, excluir e importar publicam eventos que recarregam a lista
+        self.refresh_tracker = DirtyTracker(self, self._affected_by, self.refresh)
     
     def _create_widgets(self):
         """Cria widgets da interface"""
@@ -119,57 +131,183 @@ class TransactionsView(ctk.CTkFrame):
         list_title.pack(side='left')
         
         refresh_btn = ctk.CTkButton(list_header, text="🔄", width=40,
-                                   command=self.load_transactions)
+                                   command=self.clear_search)
         refresh_btn.pack(side='right')
         
-        # Container scrollable para transações
-        self.transactions_list = ctk.CTkScrollableFrame(list_panel, fg_color='transparent')
+        self.import_btn = ctk.CTkButton(list_header, text="📥 Importar", width=100,
+                                       command=self.import_statement)
+        self.import_btn.pack(side='right', padx=(0, 5))
+        
+        self.export_btn = ctk.CTkButton(list_header, text="📤 Exportar", width=100,
+                                       command=self.export_transactions)
+        self.export_btn.pack(side='right', padx=(0, 5))
+        
+        # Busca textual (descrição, notas e categoria)
+        search_btn = ctk.CTkButton(list_header, text="🔍", width=40,
+                                  command=self.search_transactions)
+        search_btn.pack(side='right', padx=(0, 5))
+        
+        self.search_entry = ctk.CTkEntry(list_header, width=220,
+                                        placeholder_text="Buscar transações...")
+        self.search_entry.pack(side='right', padx=5)
+        self.search_entry.bind('<Return>', lambda event: self.search_transactions())
+        self.search_entry.bind('<Escape>', lambda event: self.clear_search())
+        
+        # Lista virtualizada: reaproveita os itens e busca páginas sob demanda
+        self.transactions_list = VirtualTransactionList(list_panel,
+                                                        on_edit=self.edit_transaction,
+                                                        on_delete=self.delete_transaction)
         self.transactions_list.pack(fill='both', expand=True, padx=20, pady=(0, 20))
     
     def load_categories(self):
         """Carrega categorias disponíveis"""
         try:
-            self.categories = self.main_controller.get_all_categories()
+            self.categories = CategoryRegistry.get_all()
             self.category_combo.update_categories(self.categories)
         except Exception as e:
             print(f"Erro ao carregar categorias: {e}")
     
+    def refresh(self):
+        """Recarrega categorias e a lista atual (completa ou busca)"""
+        self.load_categories()
+        self.search_transactions()
+    
+    def _affected_by(self, event) -> bool:
+        return event.entity in (TRANSACTION, CATEGORY)
+    
     def load_transactions(self):
-        """Carrega lista de transações"""
-        # Limpar lista
-        for widget in self.transactions_list.winfo_children():
-            widget.destroy()
+        """Carrega lista de transações (primeira página em segundo plano)"""
+        def fetch_page(cursor, controller=None):
+            controller = controller or self.transaction_controller
+            page = controller.list_transactions(cursor=cursor, page_size=PAGE_SIZE)
+            page['items'] = [self._to_row_data(trans) for trans in page['items']]
+            return page
         
-        try:
-            transactions = self.transaction_controller.get_all_transactions(limit=50)
+        def job(session):
+            controller = TransactionController(session)
+            return fetch_page(None, controller), controller.count_transactions()
+        
+        def show(result):
+            first_page, total = result
             
-            if transactions:
-                for trans in transactions:
-                    trans_data = {
-                        'id': trans.id,
-                        'date': trans.transaction_date.strftime('%d/%m/%Y'),
-                        'description': trans.description,
-                        'category': trans.category.name if trans.category else 'Sem categoria',
-                        'category_icon': trans.category.icon if trans.category else '📁',
-                        'amount': trans.amount,
-                        'type': trans.type if isinstance(trans.type, str) else (trans.type.value if trans.type else 'expense')
-                    }
-                    
-                    item = TransactionListItem(
-                        self.transactions_list, 
-                        trans_data,
-                        on_edit=self.edit_transaction,
-                        on_delete=self.delete_transaction
-                    )
-                    item.pack(fill='x', pady=5)
-            else:
-                no_trans = ctk.CTkLabel(self.transactions_list,
-                                       text="Nenhuma transação encontrada",
-                                       font=('Segoe UI', 12),
-                                       text_color='#7F8C8D')
-                no_trans.pack(pady=40)
+            def seek_page(index):
+                page = self.transaction_controller.seek_transactions(index, page_size=PAGE_SIZE, total=total)
+                page['items'] = [self._to_row_data(trans) for trans in page['items']]
+                return page
+            
+            self.transactions_list.load(fetch_page, total=total, first_page=first_page, seek_page=seek_page)
+        
+        self.transactions_list.show_loading()
+        self.tasks.submit('list', job, show,
+                          on_error=lambda e: print(f"Erro ao carregar transações: {e}"))
+    
+    def search_transactions(self):
+        """Busca transações pelo texto digitado"""
+        query = self.search_entry.get().strip()
+        if not query:
+            self.load_transactions()
+            return
+        
+        def fetch_page(cursor, controller=None):
+            controller = controller or self.transaction_controller
+            page = controller.search(query, limit=PAGE_SIZE, cursor=cursor)
+            page['items'] = [self._to_row_data(trans) for trans in page['items']]
+            return page
+        
+        def show(first_page):
+            self.transactions_list.load(fetch_page, empty_message=f"Nenhum resultado para \"{query}\"",
+                                        first_page=first_page)
+        
+        self.transactions_list.show_loading("Buscando...")
+        self.tasks.submit('list', lambda session: fetch_page(None, TransactionController(session)), show,
+                          on_error=lambda e: print(f"Erro ao buscar transações: {e}"))
+    
+    def clear_search(self):
+        """Limpa a busca e volta à lista completa"""
+        self.search_entry.delete(0, 'end')
+        self.load_transactions()
+    
+    def import_statement(self):
+        """Importa um extrato OFX/CSV em segundo plano"""
+        path = filedialog.askopenfilename(
+            title="Importar extrato",
+            filetypes=[("Extratos bancários", "*.ofx *.qfx *.csv"), ("Todos os arquivos", "*.*")]
+        )
+        if not path:
+            return
+        
+        self.import_btn.configure(state='disabled', text="⏳ 0")
+        self.import_queue = queue.Queue()
+        threading.Thread(target=self._run_import, args=(path, self.import_queue), daemon=True).start()
+        self.after(100, self._poll_import)
+    
+    def _run_import(self, path: str, results: queue.Queue):
+        """Executa a importação fora da thread da interface"""
+        try:
+            result = import_file(path, progress=lambda processed, inserted, failed: results.put(('progress', processed)))
+            results.put(('done', result))
         except Exception as e:
-            print(f"Erro ao carregar transações: {e}")
+            results.put(('error', e))
+    
+    def _poll_import(self):
+        """Atualiza o progresso da importação (executa na thread da interface)"""
+        try:
+            while True:
+                kind, payload = self.import_queue.get_nowait()
+                if kind == 'progress':
+                    self.import_btn.configure(text=f"⏳ {payload}")
+                    continue
+                
+                self.import_btn.configure(state='normal', text="📥 Importar")
+                if kind == 'error':
+                    print(f"Erro ao importar extrato: {payload}")
+                    ToastNotification(self, f"Erro ao importar: {payload}", type='error')
+                else:
+                    failed = len(payload['failed'])
+                    message = f"{payload['inserted']} transações importadas"
+                    if failed:
+                        message += f" ({failed} com erro)"
+                    ToastNotification(self, message, type='warning' if failed else 'success')
+                return
+        except queue.Empty:
+            pass
+        self.after(100, self._poll_import)
+    
+    def export_transactions(self):
+        """Exporta todas as transações para CSV ou XLSX em segundo plano"""
+        path = filedialog.asksaveasfilename(
+            title="Exportar transações",
+            defaultextension='.xlsx',
+            filetypes=[("Planilha Excel", "*.xlsx"), ("CSV", "*.csv")]
+        )
+        if not path:
+            return
+        
+        self.export_btn.configure(state='disabled', text="⏳")
+        self.tasks.submit('export', lambda session: export_file(path),
+                          self._export_finished, on_error=self._export_failed)
+    
+    def _export_finished(self, count: int):
+        self.export_btn.configure(state='normal', text="📤 Exportar")
+        ToastNotification(self, f"{count} transações exportadas", type='success')
+    
+    def _export_failed(self, error: Exception):
+        self.export_btn.configure(state='normal', text="📤 Exportar")
+        print(f"Erro ao exportar transações: {error}")
+        ToastNotification(self, f"Erro ao exportar: {error}", type='error')
+    
+    def _to_row_data(self, trans) -> dict:
+        """Converte a transação nos dados exibidos por TransactionListItem"""
+        category = CategoryRegistry.get(trans.category_id)
+        return {
+            'id': trans.id,
+            'date': trans.transaction_date.strftime('%d/%m/%Y'),
+            'description': trans.description,
+            'category': category.name,
+            'category_icon': category.icon,
+            'amount': trans.amount,
+            'type': trans.type if isinstance(trans.type, str) else (trans.type.value if trans.type else 'expense')
+        }
     
     def save_transaction(self):
         """Salva nova transação ou atualiza existente"""
@@ -227,9 +365,8 @@ class TransactionsView(ctk.CTkFrame):
                 self.transaction_controller.add_transaction(transaction_data)
                 ToastNotification(self, "Transação adicionada com sucesso!", type='success')
             
-            # Limpar e recarregar
+            # A lista é recarregada pelo evento publicado no commit
             self.clear_form()
-            self.load_transactions()
             
         except ValueError as e:
             ToastNotification(self, str(e), type='error')
@@ -290,7 +427,6 @@ class TransactionsView(ctk.CTkFrame):
         # Confirmação simples
         if self.transaction_controller.delete_transaction(trans_data['id']):
             ToastNotification(self, "Transação excluída", type='success')
-            self.load_transactions()
     
     def clear_form(self):
         """Limpa o formulário"""
@@ -308,5 +444,6 @@ class TransactionsView(ctk.CTkFrame):
     
     def cleanup(self):
         """Limpa recursos"""
+        self.refresh_tracker.hide(discarded=self.tasks.cancel('list'))
         self.transaction_controller.close()
         self.main_controller.close()